@@ -0,0 +1,54 @@
+"""embedding_cache table (content-addressed embeddings)
+
+Revision ID: a8d3e6f2c915
+Revises: f2c6b8d1e47a
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a8d3e6f2c915"
+down_revision: Union[str, Sequence[str], None] = "f2c6b8d1e47a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create embedding_cache.
+
+    One row per (embedding model, dimension, sha256 of the input text);
+    the vector is stored as raw float32 bytes. last_used_at drives the
+    size-bounded LRU eviction.
+    """
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS public.embedding_cache (
+            model text NOT NULL,
+            dim integer NOT NULL,
+            text_hash bytea NOT NULL,
+            embedding bytea NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            last_used_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (model, dim, text_hash)
+        );
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_embedding_cache_last_used_at
+        ON public.embedding_cache (last_used_at);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop embedding_cache."""
+    op.execute(
+        """
+        DROP TABLE IF EXISTS public.embedding_cache;
+        """
+    )
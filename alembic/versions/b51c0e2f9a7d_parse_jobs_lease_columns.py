@@ -0,0 +1,55 @@
+"""parse_jobs lease columns for multi-replica claiming
+
+Revision ID: b51c0e2f9a7d
+Revises: 7e4af545d2c1
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b51c0e2f9a7d"
+down_revision: Union[str, Sequence[str], None] = "7e4af545d2c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add lease_owner / lease_expires_at to parse_jobs.
+
+    A worker claims a job by setting itself as lease owner with an expiry
+    that it keeps extending via heartbeats; the reaper requeues jobs whose
+    lease has expired.
+    """
+    op.execute(
+        """
+        ALTER TABLE public.parse_jobs
+        ADD COLUMN IF NOT EXISTS lease_owner text,
+        ADD COLUMN IF NOT EXISTS lease_expires_at timestamptz;
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_parse_jobs_status_lease_expires_at
+        ON public.parse_jobs (status, lease_expires_at);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop parse_jobs lease columns."""
+    op.execute(
+        """
+        DROP INDEX IF EXISTS public.ix_parse_jobs_status_lease_expires_at;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.parse_jobs
+        DROP COLUMN IF EXISTS lease_expires_at,
+        DROP COLUMN IF EXISTS lease_owner;
+        """
+    )
@@ -0,0 +1,41 @@
+"""workspaces.query_mode (per-workspace LightRAG query mode override)
+
+Revision ID: b7e2d9c4a613
+Revises: a8d3e6f2c915
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e2d9c4a613"
+down_revision: Union[str, Sequence[str], None] = "a8d3e6f2c915"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add query_mode to workspaces.
+
+    NULL lets the query router pick the mode per question; otherwise one of
+    naive / local / global / hybrid / mix is used for every question.
+    """
+    op.execute(
+        """
+        ALTER TABLE public.workspaces
+        ADD COLUMN IF NOT EXISTS query_mode text;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop workspaces.query_mode."""
+    op.execute(
+        """
+        ALTER TABLE public.workspaces
+        DROP COLUMN IF EXISTS query_mode;
+        """
+    )
@@ -0,0 +1,82 @@
+"""ocr_cache.builder_version and ocr_cache.docai_raw_r2_key
+
+Revision ID: c3f1a7e9d254
+Revises: b7e2d9c4a613
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3f1a7e9d254"
+down_revision: Union[str, Sequence[str], None] = "b7e2d9c4a613"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Key ocr_cache by layout-builder version and keep the raw archive key.
+
+    Existing entries were built by an unversioned builder and get
+    builder_version '0', so they are never served again. docai_raw_r2_key
+    points to the docai-raw archive of the document that filled the entry;
+    cache hits copy it to documents.docai_raw_r2_key.
+    """
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            ADD COLUMN IF NOT EXISTS builder_version text NOT NULL DEFAULT '0',
+            ADD COLUMN IF NOT EXISTS docai_raw_r2_key text;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            ALTER COLUMN builder_version DROP DEFAULT;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            DROP CONSTRAINT IF EXISTS uq_ocr_cache_checksum_parser_version;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            ADD CONSTRAINT uq_ocr_cache_checksum_parser_version_builder
+            UNIQUE (checksum, parser_type, processor_version, builder_version);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop ocr_cache.builder_version / docai_raw_r2_key (keeps the newest builder's entries)."""
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            DROP CONSTRAINT IF EXISTS uq_ocr_cache_checksum_parser_version_builder;
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM public.ocr_cache a
+        USING public.ocr_cache b
+        WHERE a.checksum = b.checksum
+          AND a.parser_type = b.parser_type
+          AND a.processor_version = b.processor_version
+          AND (a.created_at, a.id) < (b.created_at, b.id);
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            DROP COLUMN IF EXISTS builder_version,
+            DROP COLUMN IF EXISTS docai_raw_r2_key,
+            ADD CONSTRAINT uq_ocr_cache_checksum_parser_version
+            UNIQUE (checksum, parser_type, processor_version);
+        """
+    )
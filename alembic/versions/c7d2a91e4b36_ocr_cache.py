@@ -0,0 +1,48 @@
+"""ocr_cache table for content-addressed OCR results
+
+Revision ID: c7d2a91e4b36
+Revises: b51c0e2f9a7d
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2a91e4b36"
+down_revision: Union[str, Sequence[str], None] = "b51c0e2f9a7d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create ocr_cache keyed by (checksum, parser_type, processor_version).
+
+    Entries are not tied to a document: re-uploads of the same bytes (in any
+    workspace) reuse the stored full_text instead of calling OCR again.
+    """
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS public.ocr_cache (
+            id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+            checksum text NOT NULL,
+            parser_type text NOT NULL,
+            processor_version text NOT NULL,
+            full_text text NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            CONSTRAINT uq_ocr_cache_checksum_parser_version
+                UNIQUE (checksum, parser_type, processor_version)
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop ocr_cache table (if exists)."""
+    op.execute(
+        """
+        DROP TABLE IF EXISTS public.ocr_cache;
+        """
+    )
@@ -0,0 +1,58 @@
+"""document_pages page offset index + ocr_cache.page_ranges
+
+Revision ID: d4e8f1a3b592
+Revises: c7d2a91e4b36
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e8f1a3b592"
+down_revision: Union[str, Sequence[str], None] = "c7d2a91e4b36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create document_pages and add page_ranges to ocr_cache.
+
+    document_pages only stores char offsets into documents.docai_full_text
+    (no duplicated text); page text is read with substr(). ocr_cache keeps
+    the same offsets so cache hits can rebuild the page index.
+    """
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS public.document_pages (
+            document_id uuid NOT NULL REFERENCES public.documents(id),
+            page_idx integer NOT NULL,
+            char_start integer NOT NULL,
+            char_end integer NOT NULL,
+            PRIMARY KEY (document_id, page_idx)
+        );
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            ADD COLUMN IF NOT EXISTS page_ranges jsonb;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop document_pages and ocr_cache.page_ranges (if exist)."""
+    op.execute(
+        """
+        ALTER TABLE public.ocr_cache
+            DROP COLUMN IF EXISTS page_ranges;
+        """
+    )
+    op.execute(
+        """
+        DROP TABLE IF EXISTS public.document_pages;
+        """
+    )
@@ -0,0 +1,41 @@
+"""parse_jobs.bypass_ocr_cache (reparse re-runs OCR)
+
+Revision ID: d9a4b2e7c361
+Revises: c3f1a7e9d254
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a4b2e7c361"
+down_revision: Union[str, Sequence[str], None] = "c3f1a7e9d254"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add bypass_ocr_cache to parse_jobs.
+
+    Jobs created by the reparse endpoint skip the ocr_cache lookup and
+    overwrite the cached entry with the fresh OCR result.
+    """
+    op.execute(
+        """
+        ALTER TABLE public.parse_jobs
+        ADD COLUMN IF NOT EXISTS bypass_ocr_cache boolean NOT NULL DEFAULT false;
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop parse_jobs.bypass_ocr_cache."""
+    op.execute(
+        """
+        ALTER TABLE public.parse_jobs
+        DROP COLUMN IF EXISTS bypass_ocr_cache;
+        """
+    )
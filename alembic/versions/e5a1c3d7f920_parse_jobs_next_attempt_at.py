@@ -0,0 +1,52 @@
+"""parse_jobs.next_attempt_at for delayed retries
+
+Revision ID: e5a1c3d7f920
+Revises: d4e8f1a3b592
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a1c3d7f920"
+down_revision: Union[str, Sequence[str], None] = "d4e8f1a3b592"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add next_attempt_at to parse_jobs.
+
+    A requeued job is only claimed again once next_attempt_at has passed
+    (exponential backoff with jitter); NULL means due immediately.
+    """
+    op.execute(
+        """
+        ALTER TABLE public.parse_jobs
+        ADD COLUMN IF NOT EXISTS next_attempt_at timestamptz;
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_parse_jobs_status_next_attempt_at
+        ON public.parse_jobs (status, next_attempt_at);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop parse_jobs.next_attempt_at."""
+    op.execute(
+        """
+        DROP INDEX IF EXISTS public.ix_parse_jobs_status_next_attempt_at;
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE public.parse_jobs
+        DROP COLUMN IF EXISTS next_attempt_at;
+        """
+    )
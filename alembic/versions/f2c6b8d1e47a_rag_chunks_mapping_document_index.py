@@ -0,0 +1,40 @@
+"""rag_chunks_mapping index on document_id
+
+Revision ID: f2c6b8d1e47a
+Revises: e5a1c3d7f920
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c6b8d1e47a"
+down_revision: Union[str, Sequence[str], None] = "e5a1c3d7f920"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index rag_chunks_mapping by document_id.
+
+    The ingest worker now replaces a document's mappings on every ingest and
+    the delete cascades remove them per document (design 9.1, section 4.1).
+    """
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_rag_chunks_mapping_document_id
+        ON public.rag_chunks_mapping (document_id);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the rag_chunks_mapping document_id index."""
+    op.execute(
+        """
+        DROP INDEX IF EXISTS public.ix_rag_chunks_mapping_document_id;
+        """
+    )
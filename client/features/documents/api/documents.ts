@@ -17,6 +17,9 @@ export interface DocumentRawTextResponse {
   workspace_id: string;
   status: string;
   text: string;
+  page_count?: number | null;
+  page_from?: number | null;
+  page_to?: number | null;
 }
 
 export async function fetchDocuments(workspaceId: string): Promise<Document[]> {
@@ -50,3 +53,11 @@ export async function fetchDocumentRawText(workspaceId: string, documentId: stri
   const url = `${API_ENDPOINTS.documents(workspaceId)}/${documentId}/raw-text`;
   return apiFetch<DocumentRawTextResponse>(url);
 }
+
+export async function reparseDocument(workspaceId: string, documentId: string): Promise<void> {
+  // POST /api/workspaces/{workspaceId}/documents/{documentId}/reparse (202, re-ingest is incremental)
+  const url = `${API_ENDPOINTS.documents(workspaceId)}/${documentId}/reparse`;
+  await apiFetch(url, {
+    method: "POST",
+  });
+}
@@ -57,6 +57,25 @@ export function useRealtimeEventHandler() {
         }
 
         // --- MESSAGES ---
+        case 'message.delta': {
+            // Streaming answer chunk for a pending AI message. `offset` is the
+            // content length before this delta: stale/duplicate deltas are
+            // dropped, and a gap is healed by the final message.status_updated.
+            const { conversation_id, message_id, delta, offset } = payload;
+            queryClient.setQueryData(conversationKeys.messages(conversation_id), (oldData: any) => {
+                if (!Array.isArray(oldData)) return oldData;
+                const idx = oldData.findIndex((m: any) => m.id === message_id);
+                if (idx === -1) return oldData;
+                const current = oldData[idx];
+                const content: string = current.content || '';
+                if (current.status !== 'pending' || offset > content.length) return oldData;
+                const newItems = [...oldData];
+                newItems[idx] = { ...current, content: content.slice(0, offset) + delta };
+                return newItems;
+            });
+            break;
+        }
+
         case 'message.created':
         case 'message.status_updated': {
             const { conversation_id, message, workspace_id, status, content, metadata } = payload;
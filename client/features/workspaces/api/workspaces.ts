@@ -5,9 +5,19 @@ export interface Workspace {
   id: string;
   name: string;
   description?: string | null;
+  // Pinned LightRAG query mode; null = routed per question.
+  query_mode?: WorkspaceQueryMode | null;
   created_at?: string;
 }
 
+export type WorkspaceQueryMode = "auto" | "naive" | "local" | "global" | "hybrid" | "mix";
+
+export interface WorkspaceUpdatePayload {
+  name?: string;
+  description?: string | null;
+  query_mode?: WorkspaceQueryMode | null;
+}
+
 export interface WorkspaceCreatePayload {
   name: string;
   description?: string | null;
@@ -24,6 +34,16 @@ export async function createWorkspace(payload: WorkspaceCreatePayload): Promise<
   });
 }
 
+export async function updateWorkspace(
+  workspaceId: string,
+  payload: WorkspaceUpdatePayload,
+): Promise<Workspace> {
+  return apiFetch<Workspace>(API_ENDPOINTS.workspaceDetail(workspaceId), {
+    method: "PATCH",
+    body: JSON.stringify(payload),
+  });
+}
+
 export async function deleteWorkspace(workspaceId: string): Promise<void> {
   return apiFetch(API_ENDPOINTS.workspaceDetail(workspaceId), {
     method: "DELETE",
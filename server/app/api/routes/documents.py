@@ -1,7 +1,7 @@
 import hashlib
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.app.core.constants import (
@@ -9,7 +9,10 @@ from server.app.core.constants import (
     DOCUMENT_STATUS_PARSED,
     DOCUMENT_STATUS_PENDING,
     PARSE_JOB_STATUS_QUEUED,
+    PARSER_TYPE_DOCX,
     PARSER_TYPE_GCP_DOCAI,
+    PARSER_TYPE_HTML,
+    PARSER_TYPE_PDF_TEXT,
     PARSER_TYPE_RAW_TEXT,
 )
 from server.app.core.event_bus import notify_parse_job_created
@@ -26,6 +29,7 @@ from server.app.schemas.documents import (
     UploadResponse,
     UploadResponseItem,
 )
+from server.app.services.answer_cache import invalidate_workspace_answers
 from server.app.services.rag_engine import RagEngineService
 from server.app.services import storage_r2
 from server.app.utils.ids import new_uuid
@@ -42,7 +46,10 @@ def _detect_parser_type(original_filename: str, mime_type: str | None) -> str:
 
     - For plain text / markdown / JSON / CSV / TSV: use raw_text parser
       to avoid unnecessary OCR and preserve existing text structure.
-    - For everything else: fall back to gcp_docai (current default).
+    - For PDF: try the text layer locally (pdf_text); the pipeline falls
+      back to OCR when a page has no text.
+    - For DOCX / HTML: local parsers (docx / html).
+    - For everything else (images, ...): gcp_docai.
     """
     ext = Path(original_filename).suffix.lower()
     mt = (mime_type or "").lower()
@@ -65,6 +72,12 @@ def _detect_parser_type(original_filename: str, mime_type: str | None) -> str:
 
     if ext in text_exts or mt in text_mimes:
         return PARSER_TYPE_RAW_TEXT
+    if ext == ".pdf" or mt == "application/pdf":
+        return PARSER_TYPE_PDF_TEXT
+    if ext == ".docx" or mt == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+        return PARSER_TYPE_DOCX
+    if ext in {".html", ".htm"} or mt in {"text/html", "application/xhtml+xml"}:
+        return PARSER_TYPE_HTML
     return PARSER_TYPE_GCP_DOCAI
 
 
@@ -183,7 +196,7 @@ async def get_document_detail(
     session: AsyncSession = Depends(get_db_session),
 ):
     await _ensure_workspace(session, workspace_id, current_user.id)
-    doc_row = await repo.get_document(session, document_id=document_id, workspace_id=workspace_id)
+    doc_row = await repo.get_document_summary(session, document_id=document_id, workspace_id=workspace_id)
     if not doc_row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
 
@@ -200,11 +213,18 @@ async def get_document_detail(
 async def get_document_raw_text(
     workspace_id: str,
     document_id: str,
+    page_from: int | None = Query(default=None, ge=0),
+    page_to: int | None = Query(default=None, ge=0),
     current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_db_session),
 ) -> DocumentRawTextResponse:
+    """Return OCR text of a document, optionally only pages [page_from, page_to] (0-based, inclusive).
+
+    Page ranges are served from the `document_pages` offset index, so only
+    the requested slice of docai_full_text is read from the database.
+    """
     await _ensure_workspace(session, workspace_id, current_user.id)
-    doc_row = await repo.get_document(session, document_id=document_id, workspace_id=workspace_id)
+    doc_row = await repo.get_document_summary(session, document_id=document_id, workspace_id=workspace_id)
     if not doc_row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
 
@@ -215,7 +235,33 @@ async def get_document_raw_text(
             detail="Document is not parsed yet",
         )
 
-    full_text = (doc_row.get("docai_full_text") or "").strip()
+    pages = await repo.list_document_pages(session, document_id=document_id)
+    page_count = len(pages) if pages else None
+
+    if page_from is None and page_to is None:
+        full_doc = await repo.get_document(session, document_id=document_id, workspace_id=workspace_id)
+        full_text = ((full_doc or {}).get("docai_full_text") or "").strip()
+    else:
+        if not pages:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Document has no page index; request the full text instead",
+            )
+        first = page_from if page_from is not None else 0
+        last = page_to if page_to is not None else pages[-1]["page_idx"]
+        selected = [p for p in pages if first <= p["page_idx"] <= last]
+        if not selected:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Page range not found")
+        full_text = (
+            await repo.get_document_text_range(
+                session,
+                document_id=document_id,
+                char_start=selected[0]["char_start"],
+                char_end=selected[-1]["char_end"],
+            )
+        ).strip()
+        page_from, page_to = selected[0]["page_idx"], selected[-1]["page_idx"]
+
     if not full_text:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -227,9 +273,64 @@ async def get_document_raw_text(
         workspace_id=doc_row["workspace_id"],
         status=status_value,
         text=full_text,
+        page_count=page_count,
+        page_from=page_from,
+        page_to=page_to,
     )
 
 
+@router.post("/{document_id}/reparse", response_model=DocumentDetail, status_code=status.HTTP_202_ACCEPTED)
+async def reparse_document(
+    workspace_id: str,
+    document_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+) -> DocumentDetail:
+    """Queue a new parse job for an existing document (e.g. after an OCR fix).
+
+    The new job re-runs OCR instead of reusing the OCR cache, and refreshes
+    the cached entry. Once parsed, the ingest worker re-ingests it
+    incrementally: only chunks whose text changed are embedded / extracted
+    again (see `RagEngineService.ingest_content`).
+    """
+    await _ensure_workspace(session, workspace_id, current_user.id)
+    doc_row = await repo.get_document_summary(session, document_id=document_id, workspace_id=workspace_id)
+    if not doc_row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+
+    # Check + reset + insert run in one transaction (document row locked).
+    parse_job = await repo.create_reparse_job(session, document_id=document_id)
+    if parse_job is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Document is already being parsed")
+
+    try:
+        await send_event_to_user(
+            current_user.id,
+            "document.status_updated",
+            {"workspace_id": workspace_id, "document_id": document_id, "status": DOCUMENT_STATUS_PENDING},
+        )
+        await send_event_to_user(
+            current_user.id,
+            "job.status_updated",
+            {
+                "job_id": str(parse_job["id"]),
+                "job_type": "parse",
+                "workspace_id": workspace_id,
+                "document_id": document_id,
+                "status": PARSE_JOB_STATUS_QUEUED,
+                "retry_count": 0,
+                "error_message": None,
+            },
+        )
+        await notify_parse_job_created(document_id=document_id, job_id=str(parse_job["id"]))
+    except Exception:
+        # Realtime is best-effort; the parse worker also polls.
+        pass
+
+    doc_row = await repo.get_document_summary(session, document_id=document_id, workspace_id=workspace_id)
+    return DocumentDetail(document=_to_document(doc_row), parse_job=ParseJobInfo.model_validate(parse_job))
+
+
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     workspace_id: str,
@@ -257,6 +358,7 @@ async def delete_document(
     # Best-effort call to RAG engine delete (currently a logical no-op).
     rag_engine = RagEngineService()
     await rag_engine.delete_document(workspace_id=str(workspace_id), rag_doc_id=str(document_id))
+    await invalidate_workspace_answers(str(workspace_id))
 
     # Best-effort cleanup of blobs on R2. Failures here should not break the API.
     if file_r2_key:
@@ -266,7 +368,8 @@ async def delete_document(
             # Log inside storage_r2 via its own logger / wrapper if needed.
             pass
 
-    if docai_raw_r2_key:
+    # The raw archive may be shared with other documents via the OCR cache.
+    if docai_raw_r2_key and not await repo.list_referenced_docai_raw_keys(session, [docai_raw_r2_key]):
         try:
             await storage_r2.delete_object(docai_raw_r2_key)
         except Exception:  # noqa: BLE001
@@ -35,22 +35,97 @@ async def _ensure_conversation(session: AsyncSession, conversation_id: str, user
     if not conv:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
     return conv
+
+
+async def _stream_answer_to_user(
+    answer_engine: AnswerEngineService,
+    ai_message_id: str,
+    conversation_id: str,
+    workspace_id: str,
+    user_id: str,
+    question: str,
+    workspace_query_mode: str | None,
+    delta_interval_seconds: float,
+) -> Dict[str, Any]:
+    """Consume `stream_answer`, pushing throttled `message.delta` events.
+
+    Deltas are batched and sent at most every `delta_interval_seconds`;
+    `offset` is the length of the content already sent, so the client can
+    drop duplicated / out-of-order deltas. Whatever is still buffered at the
+    end arrives with the final `message.status_updated` (full content).
+    Returns the final answer result.
+    """
+    loop = asyncio.get_running_loop()
+    result: Dict[str, Any] = {}
+    buffered: list[str] = []
+    sent_chars = 0
+    last_sent_at = 0.0
+    async for event in answer_engine.stream_answer(
+        workspace_id=workspace_id,
+        conversation_id=conversation_id,
+        question=question,
+        workspace_query_mode=workspace_query_mode,
+    ):
+        if "result" in event:
+            result = event["result"]
+            continue
+        buffered.append(event["delta"])
+        now = loop.time()
+        if now - last_sent_at < delta_interval_seconds:
+            continue
+        delta = "".join(buffered)
+        buffered.clear()
+        last_sent_at = now
+        try:
+            await send_event_to_user(
+                user_id,
+                "message.delta",
+                {
+                    "workspace_id": workspace_id,
+                    "conversation_id": conversation_id,
+                    "message_id": ai_message_id,
+                    "delta": delta,
+                    "offset": sent_chars,
+                },
+            )
+        except Exception:
+            # Best-effort realtime; the final event carries the full content.
+            pass
+        sent_chars += len(delta)
+    return result
+
+
 async def _process_ai_message_background(
     ai_message_id: str,
     conversation_id: str,
     workspace_id: str,
     user_id: str,
     question: str,
+    workspace_query_mode: str | None = None,
 ) -> None:
     """Background task: call Answer Engine and update the AI message."""
 
     try:
         answer_engine = AnswerEngineService()
-        result = await answer_engine.answer_question(
-            workspace_id=workspace_id,
-            conversation_id=conversation_id,
-            question=question,
-        )
+        answer_settings = get_settings().answer
+        if answer_settings.stream_enabled:
+            result = await _stream_answer_to_user(
+                answer_engine,
+                ai_message_id=ai_message_id,
+                conversation_id=conversation_id,
+                workspace_id=workspace_id,
+                user_id=user_id,
+                question=question,
+                workspace_query_mode=workspace_query_mode,
+                delta_interval_seconds=answer_settings.stream_delta_interval_seconds,
+            )
+        else:
+            result = await answer_engine.answer_question(
+                workspace_id=workspace_id,
+                conversation_id=conversation_id,
+                question=question,
+                workspace_query_mode=workspace_query_mode,
+            )
 
         answer = result.get("answer") or ""
         llm_usage = result.get("llm_usage")
@@ -64,6 +139,11 @@ async def _process_ai_message_background(
             metadata["citations"] = citations
         if llm_usage:
             metadata["llm_usage"] = llm_usage
+        if result.get("answer_cache"):
+            metadata["answer_cache"] = result["answer_cache"]
+        if result.get("query_mode"):
+            metadata["query_mode"] = result["query_mode"]
+            metadata["query_mode_reason"] = result.get("query_mode_reason")
 
         # Update AI message as done in a fresh DB session.
         async with async_session() as bg_session:  # type: ignore[call-arg]
@@ -139,6 +219,8 @@ async def create_message(
     """Create a new user message and generate an AI response."""
     conv = await _ensure_conversation(session, conversation_id, current_user.id)
     workspace_id = str(conv["workspace_id"])
+    workspace = await repo.get_workspace(session, workspace_id=workspace_id, user_id=current_user.id)
+    workspace_query_mode = workspace.get("query_mode") if workspace else None
 
     # 1. Create User Message (Always Done)
     user_msg = await repo.create_message(
@@ -224,6 +306,7 @@ async def create_message(
             workspace_id=workspace_id,
             user_id=current_user.id,
             question=body.content,
+            workspace_query_mode=workspace_query_mode,
         )
     )
 
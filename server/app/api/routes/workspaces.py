@@ -4,7 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from server.app.core.security import CurrentUser, get_current_user
 from server.app.db import repositories as repo
 from server.app.db.session import get_db_session
-from server.app.schemas.workspaces import Workspace, WorkspaceCreate
+from server.app.schemas.workspaces import Workspace, WorkspaceCreate, WorkspaceUpdate
+from server.app.services.answer_cache import invalidate_workspace_answers
+from server.app.services.query_router import QUERY_MODE_AUTO
 from server.app.services.rag_engine import RagEngineService
 from server.app.services import storage_r2
 
@@ -46,6 +48,25 @@ async def get_workspace_detail(
     return _to_workspace(row)
 
 
+@router.patch("/{workspace_id}", response_model=Workspace)
+async def update_workspace(
+    workspace_id: str,
+    body: WorkspaceUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(get_db_session),
+):
+    """Update workspace fields; `query_mode: "auto"` (or null) re-enables the query router."""
+    values = body.model_dump(exclude_unset=True)
+    if values.get("name") is None:
+        values.pop("name", None)
+    if "query_mode" in values and values["query_mode"] == QUERY_MODE_AUTO:
+        values["query_mode"] = None
+    row = await repo.update_workspace(session, workspace_id=workspace_id, user_id=current_user.id, values=values)
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workspace not found")
+    return _to_workspace(row)
+
+
 @router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_workspace(
     workspace_id: str,
@@ -78,6 +99,8 @@ async def delete_workspace(
         except Exception:  # noqa: BLE001
             # Ignore individual failures; they can be cleaned up later offline.
             pass
+    # Raw archives shared with other workspaces via the OCR cache are kept.
+    raw_keys -= await repo.list_referenced_docai_raw_keys(session, sorted(raw_keys))
     for key in raw_keys:
         try:
             await storage_r2.delete_object(key)
@@ -87,3 +110,4 @@ async def delete_workspace(
     # Best-effort RAG storage cleanup for this workspace.
     rag_engine = RagEngineService()
     await rag_engine.delete_workspace_data(workspace_id=str(workspace_id))
+    await invalidate_workspace_answers(str(workspace_id))
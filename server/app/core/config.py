@@ -27,6 +27,9 @@ class R2Settings(BaseSettings):
     access_key_id: str
     secret_access_key: str
     bucket: str
+    # Streaming downloads/uploads keep up to this many bytes in memory before
+    # spilling to a temp file on disk.
+    spool_max_memory_bytes: int = 8 * 1024 * 1024
 
 
 class AuthSettings(BaseSettings):
@@ -57,6 +60,27 @@ class DocumentAISettings(BaseSettings):
     location: str | None = Field(default=None, alias="GCP_LOCATION")
     ocr_processor_id: str | None = Field(default=None, alias="DOCAI_OCR_PROCESSOR_ID")
     credentials_path: str | None = Field(default=None, alias="GCP_CREDENTIALS_PATH")
+    # Optional pinned processor version; also part of the OCR cache key so a
+    # processor upgrade never serves text produced by an older version.
+    ocr_processor_version: str | None = Field(default=None, alias="DOCAI_OCR_PROCESSOR_VERSION")
+    # Reuse OCR results for files with the same SHA-256 checksum (ocr_cache).
+    ocr_cache_enabled: bool = Field(default=True, alias="DOCAI_OCR_CACHE_ENABLED")
+    # Archival format of docai-raw/*: gzip-compress the JSON, and optionally
+    # trim it to the fields ocr_text_builder uses (drops token/symbol layout).
+    raw_compress: bool = Field(default=True, alias="DOCAI_RAW_COMPRESS")
+    raw_compact: bool = Field(default=False, alias="DOCAI_RAW_COMPACT")
+    # Split PDFs with more pages than this into page-range shards that are
+    # OCR'd in parallel and merged back (0 disables sharding). 15 matches the
+    # online (synchronous) page limit of the Enterprise OCR processor.
+    shard_page_count: int = Field(default=15, alias="DOCAI_SHARD_PAGE_COUNT")
+    # Maximum number of shard requests in flight for a single document.
+    shard_max_concurrency: int = Field(default=4, alias="DOCAI_SHARD_MAX_CONCURRENCY")
+    # Global (Redis token bucket, shared by every worker/replica) limit of
+    # Document AI requests per processor; each shard is one request. 120
+    # matches the default online-processing quota; 0 disables the limiter.
+    rate_limit_per_minute: float = Field(default=120.0, alias="DOCAI_RATE_LIMIT_PER_MINUTE")
+    # Bucket size (max burst); 0 = one second worth of requests.
+    rate_limit_burst: int = Field(default=0, alias="DOCAI_RATE_LIMIT_BURST")
 
 
 class RagSettings(BaseSettings):
@@ -74,6 +98,11 @@ class RagSettings(BaseSettings):
     working_dir: str = "./rag_workspaces"
     # Default query mode for RAG-Anything / LightRAG (e.g. "mix", "hybrid", "local").
     query_mode: str = "mix"
+    # Pick the query mode per question (services/query_router.py): lookups
+    # go to "naive" (no keyword-extraction LLM call), overviews to "global",
+    # entity questions to "local"; everything else uses query_mode. A
+    # workspace's pinned query_mode always wins.
+    query_router_enabled: bool = True
     # Logical model names for LLM and embeddings used by RAG-Anything / LightRAG.
     # These are passed through to the underlying client implementation.
     llm_model: str = "gpt-4o-mini"
@@ -81,6 +110,50 @@ class RagSettings(BaseSettings):
     # Default temperature for the LightRAG LLM calls.
     # Lower values keep answers more deterministic and grounded in retrieved context.
     llm_temperature: float = 0.4
+    # Structural chunker (custom chunks passed to `ainsert_custom_chunks`).
+    # Token budget per chunk, overlap (whole trailing blocks, capped at half
+    # the budget) and the tiktoken model used to count tokens.
+    chunk_max_tokens: int = 1200
+    chunk_overlap_tokens: int = 100
+    chunk_tokenizer_model: str = "gpt-4o-mini"
+    # Content-addressed embedding cache (Postgres `embedding_cache`, keyed by
+    # model + dim + sha256(text)). Least recently used rows beyond
+    # embedding_cache_max_entries are evicted (checked every
+    # embedding_cache_evict_every inserted rows).
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 1_000_000
+    embedding_cache_evict_every: int = 5000
+    # Embedding requests: max tokens per input text (LightRAG
+    # max_token_size), per-request token / item budgets, requests in flight
+    # per process, per-request timeout and retries on 429 / timeout. The
+    # budgets are halved on throttling and grow back after successes.
+    embedding_max_token_size: int = 8192
+    embedding_batch_max_tokens: int = 64000
+    embedding_batch_max_items: int = 256
+    embedding_max_concurrency: int = 4
+    embedding_request_timeout_seconds: float = 60.0
+    embedding_max_retries: int = 5
+    # Process-wide cache of per-workspace LightRAG instances: at most
+    # instance_cache_max_size instances (LRU eviction) and instances idle
+    # for instance_idle_ttl_seconds are released (0 disables the TTL).
+    instance_cache_max_size: int = 32
+    instance_idle_ttl_seconds: float = 1800.0
+    # Size of the single asyncpg pool shared by every workspace's LightRAG
+    # PG storages in one process (sets POSTGRES_MAX_CONNECTIONS unless that
+    # is configured explicitly).
+    pg_pool_max_connections: int = 20
+    # Workspaces (most recent chat activity first) whose LightRAG instance
+    # is built and initialized at API / ingest worker startup; 0 disables.
+    warmup_workspaces: int = 8
+    # Single-flight for `query_answer`: concurrent identical questions
+    # (workspace, mode, normalized question) share one LightRAG query. With
+    # query_single_flight_redis, replicas coalesce through a Redis lock held
+    # for at most query_single_flight_lock_seconds; waiters poll for the
+    # result every query_single_flight_poll_seconds.
+    query_single_flight_enabled: bool = True
+    query_single_flight_redis: bool = True
+    query_single_flight_lock_seconds: float = 120.0
+    query_single_flight_poll_seconds: float = 0.25
 
 
 class AnswerSettings(BaseSettings):
@@ -109,6 +182,23 @@ class AnswerSettings(BaseSettings):
     # Default completion limits.
     max_tokens: int = 2048
     temperature: float = 0.2
+    # Answer cache (Redis), scoped per workspace and invalidated whenever a
+    # document of the workspace is ingested or deleted. The exact layer is
+    # keyed on the normalized question; the optional semantic layer reuses
+    # the answer of a previous question whose embedding has cosine
+    # similarity >= cache_semantic_threshold (among the last
+    # cache_semantic_max_entries questions of the workspace).
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 86400
+    cache_semantic_enabled: bool = False
+    cache_semantic_threshold: float = 0.95
+    cache_semantic_max_entries: int = 128
+    # Stream chat answers as `message.delta` realtime events while LightRAG
+    # generates them (batched, at most one event every
+    # stream_delta_interval_seconds); the AI message row is written once at
+    # the end either way.
+    stream_enabled: bool = True
+    stream_delta_interval_seconds: float = 0.1
 
 
 class RedisSettings(BaseSettings):
@@ -125,6 +215,67 @@ class RedisSettings(BaseSettings):
     url: str = "redis://localhost:6379/0"
 
 
+class ParseWorkerSettings(BaseSettings):
+    """Settings for the parse worker loop (Phase 2 / Phase 5 workers)."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="PARSE_WORKER_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    # Maximum number of parse_jobs processed concurrently by one worker process.
+    # 1 keeps the original sequential behavior; higher values keep several
+    # Document AI requests in flight while the event loop stays responsive.
+    concurrency: int = 1
+    # Sleep when no job was found (seconds); Redis wake-ups cut this short.
+    idle_sleep_seconds: float = 5.0
+    # Sleep between batches in sequential mode (seconds).
+    busy_sleep_seconds: float = 1.0
+    # Lease taken on a claimed job; the owner renews it every
+    # lease_seconds / 3 while processing. Jobs whose lease expires (crashed
+    # or partitioned worker) are requeued by the reaper of any replica.
+    lease_seconds: int = 300
+    # How often each worker runs the expired-lease reaper (seconds).
+    reaper_interval_seconds: float = 60.0
+    # Running jobs without a lease (claimed before leases existed) are
+    # treated as stale after this many seconds.
+    legacy_stale_seconds: int = 600
+    # Failed jobs are retried up to max_retries times. Retry n waits
+    # min(retry_max_seconds, retry_base_seconds * 2^(n-1)) with jitter
+    # (randomized into [d/2, d]) so upstream outages do not burn all
+    # retries within seconds.
+    max_retries: int = 3
+    retry_base_seconds: float = 30.0
+    retry_max_seconds: float = 900.0
+    # Processes for CPU-bound OCR post-processing (protobuf → dict, layout
+    # rebuild, raw JSON serialization). 0 runs it in the thread pool instead.
+    postprocess_processes: int = 2
+
+
+class IngestWorkerSettings(BaseSettings):
+    """Settings for the ingest worker loop (Phase 3 worker)."""
+
+    model_config = SettingsConfigDict(
+        env_prefix="INGEST_WORKER_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+    )
+
+    # Safety-net poll when idle (seconds). Normally the worker is woken up
+    # right away by the parse pipeline's "documents_parsed" Redis signal.
+    idle_sleep_seconds: float = 30.0
+    # Sleep between batches in sequential mode (seconds).
+    busy_sleep_seconds: float = 1.0
+    # Documents ingested concurrently by one worker process (1 = sequential,
+    # original behavior), and at most per_workspace_concurrency of them from
+    # the same workspace. Workspaces are served round-robin.
+    concurrency: int = 1
+    per_workspace_concurrency: int = 1
+
+
 class Settings(BaseSettings):
     database: DatabaseSettings = DatabaseSettings()  # type: ignore[call-arg]
     r2: R2Settings = R2Settings()  # type: ignore[call-arg]
@@ -133,6 +284,8 @@ class Settings(BaseSettings):
     rag: RagSettings = RagSettings()  # type: ignore[call-arg]
     answer: AnswerSettings = AnswerSettings()  # type: ignore[call-arg]
     redis: RedisSettings = RedisSettings()  # type: ignore[call-arg]
+    parse_worker: ParseWorkerSettings = ParseWorkerSettings()  # type: ignore[call-arg]
+    ingest_worker: IngestWorkerSettings = IngestWorkerSettings()  # type: ignore[call-arg]
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
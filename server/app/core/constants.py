@@ -29,6 +29,11 @@ PARSE_JOB_STATUS_FAILED = "failed"
 # Parser types
 PARSER_TYPE_GCP_DOCAI = "gcp_docai"
 PARSER_TYPE_RAW_TEXT = "raw_text"
+# Local parsers for born-digital files (no OCR); pdf_text falls back to
+# gcp_docai when a page has no text layer.
+PARSER_TYPE_PDF_TEXT = "pdf_text"
+PARSER_TYPE_DOCX = "docx"
+PARSER_TYPE_HTML = "html"
 
 # RAG / chat persona
 # System prompt used when querying the RAG engine. It can be refined
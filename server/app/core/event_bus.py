@@ -98,3 +98,16 @@ async def notify_parse_job_created(document_id: str, job_id: str) -> None:
             "Failed to publish parse_jobs wake-up notification via Redis",
             extra={"error": str(exc)},
         )
+
+
+async def notify_document_parsed(document_id: str, workspace_id: str) -> None:
+    """Notify ingest_worker via Redis that a document finished parsing."""
+    payload = {"document_id": document_id, "workspace_id": workspace_id}
+    try:
+        redis = get_redis()
+        await redis.publish("documents_parsed", json.dumps(payload))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "Failed to publish documents_parsed wake-up notification via Redis",
+            extra={"error": str(exc)},
+        )
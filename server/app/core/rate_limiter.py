@@ -0,0 +1,114 @@
+"""Distributed token-bucket rate limiter backed by Redis.
+
+Every worker process / replica that uses the same bucket name shares one
+bucket in Redis, so the configured rate is a global limit (e.g. a Document
+AI per-processor quota). The bucket is refilled and consumed atomically by a
+Lua script using the Redis server clock.
+
+If Redis is unavailable the limiter falls back to an in-process bucket with
+the same parameters, so callers keep making progress (the limit then only
+applies per process).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+
+from server.app.core.logging import get_logger
+from server.app.core.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+# Returns 0 when the tokens were taken, otherwise the wait (ms) until enough
+# tokens will be available. State: hash {tokens, ts} with ts in ms.
+_TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+  tokens = burst
+  ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+local wait_ms = 0
+if tokens >= requested then
+  tokens = tokens - requested
+else
+  wait_ms = math.ceil((requested - tokens) * 1000 / rate)
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', key, math.ceil(burst * 1000 / rate) + 1000)
+return wait_ms
+"""
+
+# Upper bound for a single sleep, so waiters re-check regularly.
+_MAX_SLEEP_SECONDS = 5.0
+
+
+class _LocalTokenBucket:
+    """In-process token bucket used when Redis is unavailable."""
+
+    def __init__(self, rate_per_second: float, burst: float) -> None:
+        self._rate = rate_per_second
+        self._burst = burst
+        self._tokens = burst
+        self._ts = time.monotonic()
+
+    def try_acquire(self, requested: float) -> float:
+        """Take tokens if available; return 0, or the wait in seconds."""
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._ts) * self._rate)
+        self._ts = now
+        if self._tokens >= requested:
+            self._tokens -= requested
+            return 0.0
+        return (requested - self._tokens) / self._rate
+
+
+class TokenBucketRateLimiter:
+    """Token bucket shared through Redis under `ratelimit:<name>`."""
+
+    def __init__(self, name: str, rate_per_second: float, burst: int | None = None) -> None:
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        self._key = f"ratelimit:{name}"
+        self._rate = float(rate_per_second)
+        self._burst = float(burst if burst and burst > 0 else max(1, math.ceil(rate_per_second)))
+        self._local = _LocalTokenBucket(self._rate, self._burst)
+        self._script = None
+        self._redis_failed = False
+
+    async def acquire(self, tokens: int = 1) -> None:
+        """Wait until `tokens` tokens are available and take them."""
+        requested = min(float(tokens), self._burst)
+        while True:
+            wait_seconds = await self._try_acquire(requested)
+            if wait_seconds <= 0:
+                return
+            await asyncio.sleep(min(wait_seconds, _MAX_SLEEP_SECONDS))
+
+    async def _try_acquire(self, requested: float) -> float:
+        try:
+            if self._script is None:
+                self._script = get_redis().register_script(_TOKEN_BUCKET_LUA)
+            wait_ms = await self._script(keys=[self._key], args=[self._rate, self._burst, requested])
+        except Exception as exc:  # noqa: BLE001
+            if not self._redis_failed:
+                logger.warning(
+                    "Rate limiter Redis unavailable; using in-process bucket",
+                    extra={"key": self._key, "error": str(exc)},
+                )
+                self._redis_failed = True
+            return self._local.try_acquire(requested)
+        if self._redis_failed:
+            logger.info("Rate limiter Redis available again", extra={"key": self._key})
+            self._redis_failed = False
+        return int(wait_ms) / 1000.0
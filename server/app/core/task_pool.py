@@ -0,0 +1,84 @@
+"""Bounded pool of background tasks for the worker dispatch loops.
+
+Both the parse worker and the ingest worker run jobs concurrently the same
+way: claim up to `free_slots` jobs, start one task per job, then wait until a
+task finishes, a Redis wake-up arrives, or the poll timeout expires. This
+module holds that shared bookkeeping so the two workers cannot drift apart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Coroutine
+
+from server.app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TaskPool:
+    """At most `max_concurrency` in-flight tasks, keyed by job id.
+
+    Unexpected errors escaping a task are logged and swallowed, so one job
+    (e.g. DB unavailable) cannot kill the pool; the job services handle
+    their own failures before that.
+    """
+
+    def __init__(self, name: str, max_concurrency: int) -> None:
+        self._name = name
+        self._max_concurrency = max(1, int(max_concurrency or 1))
+        self._in_flight: dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    @property
+    def in_flight_count(self) -> int:
+        """Number of started tasks that are not finished yet."""
+        return len(self._in_flight)
+
+    @property
+    def free_slots(self) -> int:
+        """Number of additional tasks the pool can accept right now."""
+        return max(0, self._max_concurrency - len(self._in_flight))
+
+    def in_flight_keys(self) -> list[str]:
+        return list(self._in_flight)
+
+    def start(
+        self,
+        key: str,
+        coro: Coroutine[Any, Any, None],
+        on_done: Callable[[], None] | None = None,
+    ) -> None:
+        """Run `coro` in the background under `key`; `on_done` runs once it finishes."""
+        task = asyncio.create_task(self._run(key, coro))
+        self._in_flight[key] = task
+
+        def _release(_task: asyncio.Task[None]) -> None:
+            self._in_flight.pop(key, None)
+            if on_done is not None:
+                on_done()
+
+        task.add_done_callback(_release)
+
+    async def wait_for_progress(self, wakeup_event: asyncio.Event, timeout: float) -> None:
+        """Wait until a task finishes, a wake-up arrives, or the timeout expires."""
+        waiters: set[asyncio.Future] = set(self._in_flight.values())
+        wakeup_waiter = asyncio.create_task(wakeup_event.wait())
+        waiters.add(wakeup_waiter)
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            wakeup_waiter.cancel()
+        wakeup_event.clear()
+
+    async def _run(self, key: str, coro: Coroutine[Any, Any, None]) -> None:
+        try:
+            await coro
+        except Exception as exc:  # noqa: BLE001
+            logger.error(
+                "Unexpected error in pooled task",
+                extra={"pool": self._name, "key": key, "error": str(exc)},
+            )
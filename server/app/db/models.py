@@ -10,6 +10,8 @@ workspaces = sa.Table(
     sa.Column("user_id", UUID(as_uuid=True), nullable=False),
     sa.Column("name", sa.Text, nullable=False),
     sa.Column("description", sa.Text),
+    # Pinned LightRAG query mode; NULL = chosen per question by the query router.
+    sa.Column("query_mode", sa.Text),
     sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
     sa.Column(
         "updated_at",
@@ -64,6 +66,12 @@ parse_jobs = sa.Table(
     sa.Column("retry_count", sa.Integer, nullable=False, server_default=sa.text("0")),
     sa.Column("started_at", sa.DateTime(timezone=True)),
     sa.Column("finished_at", sa.DateTime(timezone=True)),
+    sa.Column("lease_owner", sa.Text),
+    sa.Column("lease_expires_at", sa.DateTime(timezone=True)),
+    # Requeued jobs are not claimed before this time (retry backoff).
+    sa.Column("next_attempt_at", sa.DateTime(timezone=True)),
+    # Reparse: skip the ocr_cache lookup and overwrite the cached entry.
+    sa.Column("bypass_ocr_cache", sa.Boolean, nullable=False, server_default=sa.text("false")),
 )
 
 rag_documents = sa.Table(
@@ -103,3 +111,61 @@ messages = sa.Table(
     sa.Column("metadata", sa.JSON),
     sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
 )
+
+ocr_cache = sa.Table(
+    "ocr_cache",
+    metadata,
+    sa.Column("id", UUID(as_uuid=True), primary_key=True),
+    sa.Column("checksum", sa.Text, nullable=False),
+    sa.Column("parser_type", sa.Text, nullable=False),
+    sa.Column("processor_version", sa.Text, nullable=False),
+    sa.Column("full_text", sa.Text, nullable=False),
+    # [[page_idx, char_start, char_end], ...] into full_text (see document_pages).
+    sa.Column("page_ranges", sa.JSON),
+    # ocr_text_builder.OCR_TEXT_BUILDER_VERSION that built full_text.
+    sa.Column("builder_version", sa.Text, nullable=False),
+    # docai-raw archive of the document that filled the entry (shared on hits).
+    sa.Column("docai_raw_r2_key", sa.Text),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.UniqueConstraint("checksum", "parser_type", "processor_version", "builder_version"),
+)
+
+# Page offset index into documents.docai_full_text (char ranges, end exclusive).
+document_pages = sa.Table(
+    "document_pages",
+    metadata,
+    sa.Column("document_id", UUID(as_uuid=True), sa.ForeignKey("public.documents.id"), primary_key=True),
+    sa.Column("page_idx", sa.Integer, primary_key=True),
+    sa.Column("char_start", sa.Integer, nullable=False),
+    sa.Column("char_end", sa.Integer, nullable=False),
+)
+
+# LightRAG chunk_id -> document + offsets into docai_full_text (citations).
+rag_chunks_mapping = sa.Table(
+    "rag_chunks_mapping",
+    metadata,
+    sa.Column("id", UUID(as_uuid=True), primary_key=True),
+    sa.Column("workspace_id", UUID(as_uuid=True), sa.ForeignKey("public.workspaces.id"), nullable=False),
+    sa.Column("chunk_id", sa.Text, nullable=False),
+    sa.Column("document_id", UUID(as_uuid=True), sa.ForeignKey("public.documents.id"), nullable=False),
+    sa.Column("page_start", sa.Integer, nullable=False),
+    sa.Column("page_end", sa.Integer, nullable=False),
+    sa.Column("segment_start_index", sa.Integer),
+    sa.Column("segment_end_index", sa.Integer),
+    sa.Column("char_start", sa.Integer),
+    sa.Column("char_end", sa.Integer),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.UniqueConstraint("workspace_id", "chunk_id", name="uq_rag_chunks_mapping_workspace_chunk"),
+)
+
+# Content-addressed embedding cache: float32 vector bytes per (model, dim, sha256(text)).
+embedding_cache = sa.Table(
+    "embedding_cache",
+    metadata,
+    sa.Column("model", sa.Text, primary_key=True),
+    sa.Column("dim", sa.Integer, primary_key=True),
+    sa.Column("text_hash", sa.LargeBinary, primary_key=True),
+    sa.Column("embedding", sa.LargeBinary, nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column("last_used_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+)
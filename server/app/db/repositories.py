@@ -3,6 +3,7 @@
 from typing import Any, Mapping, Sequence
 
 import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from server.app.core.constants import (
@@ -24,6 +25,42 @@ def _row_to_mapping(row: Any) -> Mapping[str, Any]:
     return row._mapping if row is not None else {}
 
 
+def _seconds_interval(seconds: int) -> Any:
+    """Return a Postgres `interval '<n> seconds'` literal expression."""
+    return sa.text(f"interval '{int(seconds)} seconds'")
+
+
+def _parse_job_is_due() -> Any:
+    """Queued parse_jobs whose retry backoff (next_attempt_at) has elapsed."""
+    pj = models.parse_jobs
+    return sa.or_(pj.c.next_attempt_at.is_(None), pj.c.next_attempt_at <= sa.func.now())
+
+
+def _parse_job_owned_by(job_id: str, lease_owner: str) -> Any:
+    """Running job still leased by `lease_owner` (guard for final status writes)."""
+    pj = models.parse_jobs
+    return sa.and_(
+        pj.c.id == job_id,
+        pj.c.status == PARSE_JOB_STATUS_RUNNING,
+        pj.c.lease_owner == lease_owner,
+    )
+
+
+def _retry_backoff_interval(retry_count: Any, base_seconds: float, max_seconds: float) -> Any:
+    """SQL interval for exponential backoff with jitter after `retry_count` failures.
+
+    Same formula as `parser_pipeline.retry_backoff_seconds`:
+    min(max, base * 2^retry_count), randomized into [d/2, d].
+    """
+    delay = sa.func.least(float(max_seconds), float(base_seconds) * sa.func.power(2, retry_count))
+    return _seconds_interval_expr(delay * (0.5 + sa.func.random() * 0.5))
+
+
+def _seconds_interval_expr(seconds: Any) -> Any:
+    """Interval from a (possibly fractional / SQL) number of seconds."""
+    return sa.func.make_interval(0, 0, 0, 0, 0, 0, seconds)
+
+
 # Workspace
 async def create_workspace(session: AsyncSession, user_id: str, name: str, description: str | None = None) -> Mapping[str, Any]:
     workspace_id = new_uuid()
@@ -58,6 +95,30 @@ async def get_workspace(session: AsyncSession, workspace_id: str, user_id: str)
     return _row_to_mapping(row) if row else None
 
 
+async def update_workspace(
+    session: AsyncSession,
+    workspace_id: str,
+    user_id: str,
+    values: Mapping[str, Any],
+) -> Mapping[str, Any] | None:
+    """Update the given columns (None clears a nullable column); None if not found."""
+    if not values:
+        return await get_workspace(session, workspace_id=workspace_id, user_id=user_id)
+    stmt = (
+        sa.update(models.workspaces)
+        .where(
+            models.workspaces.c.id == workspace_id,
+            models.workspaces.c.user_id == user_id,
+        )
+        .values(**values, updated_at=sa.func.now())
+        .returning(models.workspaces)
+    )
+    result = await session.execute(stmt)
+    await session.commit()
+    row = result.fetchone()
+    return _row_to_mapping(row) if row else None
+
+
 async def get_workspace_owner_id(session: AsyncSession, workspace_id: str) -> str | None:
     """Return user_id (owner) for a given workspace_id, or None if not found."""
     stmt = sa.select(models.workspaces.c.user_id).where(models.workspaces.c.id == workspace_id)
@@ -88,9 +149,13 @@ async def create_document(session: AsyncSession, workspace_id: str, title: str,
     return _row_to_mapping(row)
 
 
+# Document columns without the (potentially huge) OCR text.
+_DOCUMENT_SUMMARY_COLUMNS = [c for c in models.documents.c if c.name != "docai_full_text"]
+
+
 async def list_documents(session: AsyncSession, workspace_id: str) -> Sequence[Mapping[str, Any]]:
     stmt = (
-        sa.select(models.documents)
+        sa.select(*_DOCUMENT_SUMMARY_COLUMNS)
         .where(models.documents.c.workspace_id == workspace_id)
         .order_by(models.documents.c.created_at.desc())
     )
@@ -108,6 +173,19 @@ async def get_document(session: AsyncSession, document_id: str, workspace_id: st
     return _row_to_mapping(row) if row else None
 
 
+async def get_document_summary(
+    session: AsyncSession, document_id: str, workspace_id: str
+) -> Mapping[str, Any] | None:
+    """Like `get_document` but without loading docai_full_text."""
+    stmt = sa.select(*_DOCUMENT_SUMMARY_COLUMNS).where(
+        models.documents.c.id == document_id,
+        models.documents.c.workspace_id == workspace_id,
+    )
+    result = await session.execute(stmt)
+    row = result.fetchone()
+    return _row_to_mapping(row) if row else None
+
+
 async def create_file(
     session: AsyncSession,
     document_id: str,
@@ -168,112 +246,369 @@ async def get_parse_job(session: AsyncSession, job_id: str) -> Mapping[str, Any]
     return _row_to_mapping(row) if row else None
 
 
-async def fetch_queued_parse_jobs(session: AsyncSession, batch_size: int) -> Sequence[Mapping[str, Any]]:
+async def claim_parse_jobs(
+    session: AsyncSession,
+    lease_owner: str,
+    batch_size: int,
+    lease_seconds: int,
+) -> Sequence[Mapping[str, Any]]:
+    """Atomically claim queued parse_jobs for a worker.
+
+    Runs a single `UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+    RETURNING *` so concurrent workers (also across replicas) never receive
+    the same job. Claimed jobs are moved to running with a lease that the
+    owner must keep renewing via `renew_parse_job_lease`. Jobs waiting for
+    a retry backoff (`next_attempt_at` in the future) are skipped.
+    """
+    if batch_size <= 0:
+        return []
+    pj = models.parse_jobs
+    candidates = (
+        sa.select(pj.c.id)
+        .where(pj.c.status == PARSE_JOB_STATUS_QUEUED, _parse_job_is_due())
+        .order_by(pj.c.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
     stmt = (
-        sa.select(models.parse_jobs)
-        .where(models.parse_jobs.c.status == PARSE_JOB_STATUS_QUEUED)
-        .order_by(models.parse_jobs.c.id.asc())
+        sa.update(pj)
+        .where(pj.c.id.in_(candidates))
+        .values(
+            status=PARSE_JOB_STATUS_RUNNING,
+            started_at=sa.func.now(),
+            finished_at=None,
+            lease_owner=lease_owner,
+            lease_expires_at=sa.func.now() + _seconds_interval(lease_seconds),
+        )
+        .returning(pj)
+    )
+    result = await session.execute(stmt)
+    rows = [r._mapping for r in result.fetchall()]
+    await session.commit()
+    return rows
+
+
+async def renew_parse_job_lease(
+    session: AsyncSession,
+    job_id: str,
+    lease_owner: str,
+    lease_seconds: int,
+) -> bool:
+    """Extend the lease of a running job (heartbeat).
+
+    Returns False if the job is no longer running under this owner, e.g.
+    because the reaper already took it back after the lease expired.
+    """
+    pj = models.parse_jobs
+    stmt = (
+        sa.update(pj)
+        .where(
+            pj.c.id == job_id,
+            pj.c.status == PARSE_JOB_STATUS_RUNNING,
+            pj.c.lease_owner == lease_owner,
+        )
+        .values(lease_expires_at=sa.func.now() + _seconds_interval(lease_seconds))
+        .returning(pj.c.id)
+    )
+    result = await session.execute(stmt)
+    row = result.fetchone()
+    await session.commit()
+    return row is not None
+
+
+async def reap_expired_parse_jobs(
+    session: AsyncSession,
+    max_retries: int,
+    legacy_stale_seconds: int,
+    retry_base_seconds: float,
+    retry_max_seconds: float,
+    batch_size: int = 100,
+    error_message: str = "stale-running",
+) -> Sequence[Mapping[str, Any]]:
+    """Requeue (or fail) running parse_jobs whose lease has expired.
+
+    Jobs with retries left go back to queued with retry_count + 1 and a
+    backoff-delayed next_attempt_at; jobs that exhausted their retries are
+    marked failed. Running jobs without a lease
+    (claimed by older workers) are considered expired once started_at is
+    older than `legacy_stale_seconds`. The update is atomic and skips rows
+    locked by other reapers. Returns the updated rows (new values).
+    """
+    pj = models.parse_jobs
+    expired = sa.or_(
+        pj.c.lease_expires_at < sa.func.now(),
+        sa.and_(
+            pj.c.lease_expires_at.is_(None),
+            pj.c.started_at.is_not(None),
+            pj.c.started_at < sa.func.now() - _seconds_interval(legacy_stale_seconds),
+        ),
+    )
+    candidates = (
+        sa.select(pj.c.id)
+        .where(pj.c.status == PARSE_JOB_STATUS_RUNNING, expired)
         .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    can_retry = pj.c.retry_count < max_retries
+    stmt = (
+        sa.update(pj)
+        .where(pj.c.id.in_(candidates))
+        .values(
+            status=sa.case((can_retry, PARSE_JOB_STATUS_QUEUED), else_=PARSE_JOB_STATUS_FAILED),
+            retry_count=sa.case((can_retry, pj.c.retry_count + 1), else_=pj.c.retry_count),
+            started_at=sa.case((can_retry, sa.null()), else_=pj.c.started_at),
+            finished_at=sa.case((can_retry, sa.null()), else_=sa.func.now()),
+            next_attempt_at=sa.case(
+                (
+                    can_retry,
+                    sa.func.now() + _retry_backoff_interval(pj.c.retry_count, retry_base_seconds, retry_max_seconds),
+                ),
+                else_=sa.null(),
+            ),
+            lease_owner=None,
+            lease_expires_at=None,
+            error_message=error_message[:1000],
+        )
+        .returning(pj)
     )
     result = await session.execute(stmt)
-    return [r._mapping for r in result.fetchall()]
+    rows = [r._mapping for r in result.fetchall()]
+    await session.commit()
+    return rows
 
 
 async def get_latest_parse_job_for_document(session: AsyncSession, document_id: str) -> Mapping[str, Any] | None:
-    stmt = sa.select(models.parse_jobs).where(models.parse_jobs.c.document_id == document_id).limit(1)
+    # A document gets several jobs when reparsed; a job not started yet is the newest.
+    stmt = (
+        sa.select(models.parse_jobs)
+        .where(models.parse_jobs.c.document_id == document_id)
+        .order_by(models.parse_jobs.c.started_at.desc().nulls_first())
+        .limit(1)
+    )
     result = await session.execute(stmt)
     row = result.fetchone()
     return _row_to_mapping(row) if row else None
 
 
-async def mark_parse_job_running(session: AsyncSession, job_id: str) -> None:
+async def mark_parse_job_running(
+    session: AsyncSession,
+    job_id: str,
+    lease_owner: str,
+    lease_seconds: int,
+) -> None:
     stmt = (
         sa.update(models.parse_jobs)
         .where(models.parse_jobs.c.id == job_id)
-        .values(status=PARSE_JOB_STATUS_RUNNING, started_at=sa.func.now())
+        .values(
+            status=PARSE_JOB_STATUS_RUNNING,
+            started_at=sa.func.now(),
+            lease_owner=lease_owner,
+            lease_expires_at=sa.func.now() + _seconds_interval(lease_seconds),
+        )
     )
     await session.execute(stmt)
     await session.commit()
 
 
-async def mark_parse_job_success(session: AsyncSession, job_id: str) -> None:
+async def mark_parse_job_success(
+    session: AsyncSession,
+    job_id: str,
+    lease_owner: str,
+    commit: bool = True,
+) -> int:
+    """Mark a running job owned by `lease_owner` as success.
+
+    Returns the number of updated rows: 0 means the lease was lost (the
+    reaper requeued the job, possibly to another worker) and the caller
+    must not write any results. With `commit=False` the caller commits,
+    so the job and document updates land in one transaction.
+    """
     stmt = (
         sa.update(models.parse_jobs)
-        .where(models.parse_jobs.c.id == job_id)
-        .values(status=PARSE_JOB_STATUS_SUCCESS, finished_at=sa.func.now(), error_message=None)
+        .where(_parse_job_owned_by(job_id, lease_owner))
+        .values(
+            status=PARSE_JOB_STATUS_SUCCESS,
+            finished_at=sa.func.now(),
+            error_message=None,
+            lease_owner=None,
+            lease_expires_at=None,
+        )
     )
-    await session.execute(stmt)
-    await session.commit()
+    result = await session.execute(stmt)
+    if commit:
+        await session.commit()
+    return result.rowcount
 
 
-async def mark_parse_job_failed(session: AsyncSession, job_id: str, error_message: str) -> None:
+async def mark_parse_job_failed(
+    session: AsyncSession,
+    job_id: str,
+    lease_owner: str,
+    error_message: str,
+) -> int:
+    """Mark a running job owned by `lease_owner` as failed; returns the updated row count."""
     stmt = (
         sa.update(models.parse_jobs)
-        .where(models.parse_jobs.c.id == job_id)
+        .where(_parse_job_owned_by(job_id, lease_owner))
         .values(
             status=PARSE_JOB_STATUS_FAILED,
             finished_at=sa.func.now(),
             error_message=error_message[:1000],
+            lease_owner=None,
+            lease_expires_at=None,
         )
     )
-    await session.execute(stmt)
+    result = await session.execute(stmt)
     await session.commit()
+    return result.rowcount
 
 
-async def requeue_parse_job(session: AsyncSession, job_id: str, retry_count: int, error_message: str | None = None) -> None:
-    """Move a job back to queued state with incremented retry_count."""
+async def requeue_parse_job(
+    session: AsyncSession,
+    job_id: str,
+    lease_owner: str,
+    retry_count: int,
+    error_message: str | None = None,
+    delay_seconds: float = 0,
+) -> int:
+    """Move a running job owned by `lease_owner` back to queued with incremented retry_count.
+
+    With `delay_seconds` the job is not claimed again before
+    now() + delay (next_attempt_at). Returns the updated row count
+    (0 when the lease was lost).
+    """
     values: dict[str, Any] = {
         "status": PARSE_JOB_STATUS_QUEUED,
         "retry_count": retry_count,
         "started_at": None,
         "finished_at": None,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "next_attempt_at": (
+            sa.func.now() + _seconds_interval_expr(float(delay_seconds))
+            if delay_seconds > 0
+            else None
+        ),
     }
     if error_message:
         values["error_message"] = error_message[:1000]
-    stmt = sa.update(models.parse_jobs).where(models.parse_jobs.c.id == job_id).values(**values)
-    await session.execute(stmt)
+    stmt = sa.update(models.parse_jobs).where(_parse_job_owned_by(job_id, lease_owner)).values(**values)
+    result = await session.execute(stmt)
     await session.commit()
+    return result.rowcount
 
 
-async def fetch_stale_running_parse_jobs(
+async def update_document_parsed_success(
     session: AsyncSession,
-    older_than_seconds: int,
-) -> Sequence[Mapping[str, Any]]:
-    """Return parse_jobs stuck in running state longer than the given threshold.
+    document_id: str,
+    full_text: str,
+    raw_r2_key: str | None,
+    page_ranges: Sequence[Sequence[int]] | None = None,
+) -> None:
+    """Store OCR text and (optionally) its page offset index in one transaction."""
+    stmt = (
+        sa.update(models.documents)
+        .where(models.documents.c.id == document_id)
+        .values(
+            docai_full_text=full_text,
+            docai_raw_r2_key=raw_r2_key,
+            status=DOCUMENT_STATUS_PARSED,
+            updated_at=sa.func.now(),
+        )
+    )
+    await session.execute(stmt)
+    # Re-parse replaces the previous page index.
+    await session.execute(
+        sa.delete(models.document_pages).where(models.document_pages.c.document_id == document_id)
+    )
+    if page_ranges:
+        await session.execute(
+            sa.insert(models.document_pages),
+            [
+                {
+                    "document_id": document_id,
+                    "page_idx": int(page_idx),
+                    "char_start": int(char_start),
+                    "char_end": int(char_end),
+                }
+                for page_idx, char_start, char_end in page_ranges
+            ],
+        )
+    await session.commit()
 
-    Uses started_at as the reference time; jobs without started_at are ignored.
-    """
-    if older_than_seconds <= 0:
-        return []
-    # Build a Postgres expression: started_at < now() - interval '<seconds> seconds'
-    interval_expr = sa.text(f"interval '{older_than_seconds} seconds'")
+
+async def list_document_pages(session: AsyncSession, document_id: str) -> Sequence[Mapping[str, Any]]:
+    """Return the page offset index (page_idx, char_start, char_end) of a document."""
     stmt = (
-        sa.select(models.parse_jobs)
-        .where(
-            models.parse_jobs.c.status == PARSE_JOB_STATUS_RUNNING,
-            models.parse_jobs.c.started_at.is_not(None),
-            models.parse_jobs.c.started_at < sa.func.now() - interval_expr,
+        sa.select(
+            models.document_pages.c.page_idx,
+            models.document_pages.c.char_start,
+            models.document_pages.c.char_end,
         )
+        .where(models.document_pages.c.document_id == document_id)
+        .order_by(models.document_pages.c.page_idx)
     )
     result = await session.execute(stmt)
     return [r._mapping for r in result.fetchall()]
 
 
-async def update_document_parsed_success(
-    session: AsyncSession, document_id: str, full_text: str, raw_r2_key: str
-) -> None:
-    stmt = (
+async def get_document_text_range(
+    session: AsyncSession, document_id: str, char_start: int, char_end: int
+) -> str:
+    """Return docai_full_text[char_start:char_end] without loading the whole text."""
+    length = max(0, int(char_end) - int(char_start))
+    stmt = sa.select(
+        # Postgres substr is 1-based and counts characters, like Python str slicing.
+        sa.func.substr(models.documents.c.docai_full_text, int(char_start) + 1, length)
+    ).where(models.documents.c.id == document_id)
+    result = await session.execute(stmt)
+    row = result.fetchone()
+    return str(row[0] or "") if row else ""
+
+
+async def create_reparse_job(session: AsyncSession, document_id: str) -> Mapping[str, Any] | None:
+    """Put an already parsed/ingested document back into the parse queue.
+
+    In one transaction, with the document row locked so concurrent reparse
+    requests are serialized: returns None (nothing changed) when the
+    document already has a queued/running parse job. Otherwise the
+    rag_documents row is dropped so the ingest worker picks the document up
+    again once parsed (rag_chunks_mapping is kept as the previous chunk set
+    for the incremental re-ingest), the document goes back to pending and a
+    new parse job is created with the previous job's parser_type and
+    `bypass_ocr_cache` set.
+    """
+    pj = models.parse_jobs
+    await session.execute(
+        sa.select(models.documents.c.id).where(models.documents.c.id == document_id).with_for_update()
+    )
+    latest = await get_latest_parse_job_for_document(session, document_id=document_id)
+    if latest and latest["status"] in {PARSE_JOB_STATUS_QUEUED, PARSE_JOB_STATUS_RUNNING}:
+        await session.rollback()
+        return None
+
+    await session.execute(
+        sa.delete(models.rag_documents).where(models.rag_documents.c.document_id == document_id)
+    )
+    await session.execute(
         sa.update(models.documents)
         .where(models.documents.c.id == document_id)
+        .values(status=DOCUMENT_STATUS_PENDING, updated_at=sa.func.now())
+    )
+    result = await session.execute(
+        sa.insert(pj)
         .values(
-            docai_full_text=full_text,
-            docai_raw_r2_key=raw_r2_key,
-            status=DOCUMENT_STATUS_PARSED,
-            updated_at=sa.func.now(),
+            id=new_uuid(),
+            document_id=document_id,
+            status=PARSE_JOB_STATUS_QUEUED,
+            parser_type=(latest or {}).get("parser_type") or PARSER_TYPE_GCP_DOCAI,
+            bypass_ocr_cache=True,
         )
+        .returning(pj)
     )
-    await session.execute(stmt)
+    row = result.fetchone()
     await session.commit()
+    return _row_to_mapping(row)
 
 
 async def update_document_parse_error(session: AsyncSession, document_id: str) -> None:
@@ -289,6 +624,144 @@ async def update_document_parse_error(session: AsyncSession, document_id: str) -
     await session.commit()
 
 
+# OCR cache
+async def get_ocr_cache_entry(
+    session: AsyncSession,
+    checksum: str,
+    parser_type: str,
+    processor_version: str,
+    builder_version: str,
+) -> Mapping[str, Any] | None:
+    """Return cached OCR `full_text`, `page_ranges` and `docai_raw_r2_key` (may be None) for a file checksum."""
+    stmt = sa.select(
+        models.ocr_cache.c.full_text,
+        models.ocr_cache.c.page_ranges,
+        models.ocr_cache.c.docai_raw_r2_key,
+    ).where(
+        models.ocr_cache.c.checksum == checksum,
+        models.ocr_cache.c.parser_type == parser_type,
+        models.ocr_cache.c.processor_version == processor_version,
+        models.ocr_cache.c.builder_version == builder_version,
+    )
+    result = await session.execute(stmt)
+    row = result.fetchone()
+    return _row_to_mapping(row) if row else None
+
+
+async def upsert_ocr_cache_text(
+    session: AsyncSession,
+    checksum: str,
+    parser_type: str,
+    processor_version: str,
+    builder_version: str,
+    full_text: str,
+    page_ranges: Sequence[Sequence[int]] | None = None,
+    docai_raw_r2_key: str | None = None,
+    overwrite: bool = False,
+) -> None:
+    """Store OCR full_text (and its page ranges / raw archive key) for a file checksum.
+
+    The first writer wins unless `overwrite` is set (reparse jobs, which
+    re-ran OCR on purpose, replace the entry).
+    """
+    key_columns = ["checksum", "parser_type", "processor_version", "builder_version"]
+    stmt = pg_insert(models.ocr_cache).values(
+        id=new_uuid(),
+        checksum=checksum,
+        parser_type=parser_type,
+        processor_version=processor_version,
+        builder_version=builder_version,
+        full_text=full_text,
+        page_ranges=[list(r) for r in page_ranges] if page_ranges else None,
+        docai_raw_r2_key=docai_raw_r2_key,
+    )
+    if overwrite:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                "full_text": stmt.excluded.full_text,
+                "page_ranges": stmt.excluded.page_ranges,
+                "docai_raw_r2_key": stmt.excluded.docai_raw_r2_key,
+                "created_at": sa.func.now(),
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=key_columns)
+    await session.execute(stmt)
+    await session.commit()
+
+
+# Embedding cache
+# last_used_at is refreshed at most this often per row, so cache hits do not
+# turn every read into a write.
+_EMBEDDING_CACHE_TOUCH_SECONDS = 3600
+
+
+async def get_embedding_cache_entries(
+    session: AsyncSession,
+    model: str,
+    dim: int,
+    text_hashes: Sequence[bytes],
+) -> dict[bytes, bytes]:
+    """Return cached float32 embedding bytes keyed by text hash (hits only)."""
+    if not text_hashes:
+        return {}
+    ec = models.embedding_cache
+    stmt = sa.select(ec.c.text_hash, ec.c.embedding, ec.c.last_used_at).where(
+        ec.c.model == model,
+        ec.c.dim == dim,
+        ec.c.text_hash.in_(list(text_hashes)),
+    )
+    rows = (await session.execute(stmt)).fetchall()
+    hits = {bytes(r.text_hash): bytes(r.embedding) for r in rows}
+    if hits:
+        await session.execute(
+            sa.update(ec)
+            .where(
+                ec.c.model == model,
+                ec.c.dim == dim,
+                ec.c.text_hash.in_(list(hits)),
+                ec.c.last_used_at < sa.func.now() - _seconds_interval(_EMBEDDING_CACHE_TOUCH_SECONDS),
+            )
+            .values(last_used_at=sa.func.now())
+        )
+        await session.commit()
+    return hits
+
+
+async def insert_embedding_cache_entries(
+    session: AsyncSession,
+    model: str,
+    dim: int,
+    entries: Mapping[bytes, bytes],
+) -> None:
+    """Insert float32 embedding bytes keyed by text hash; existing keys are kept."""
+    if not entries:
+        return
+    rows = [
+        {"model": model, "dim": dim, "text_hash": text_hash, "embedding": embedding}
+        for text_hash, embedding in entries.items()
+    ]
+    stmt = pg_insert(models.embedding_cache).on_conflict_do_nothing(
+        index_elements=["model", "dim", "text_hash"]
+    )
+    await session.execute(stmt, rows)
+    await session.commit()
+
+
+async def evict_embedding_cache(session: AsyncSession, max_entries: int) -> int:
+    """Delete the least recently used rows beyond `max_entries`; return how many."""
+    ec = models.embedding_cache
+    total = int((await session.execute(sa.select(sa.func.count()).select_from(ec))).scalar_one())
+    excess = total - max(0, int(max_entries))
+    if excess <= 0:
+        return 0
+    oldest = sa.select(ec.c.model, ec.c.dim, ec.c.text_hash).order_by(ec.c.last_used_at.asc()).limit(excess)
+    await session.execute(sa.delete(ec).where(sa.tuple_(ec.c.model, ec.c.dim, ec.c.text_hash).in_(oldest)))
+    await session.commit()
+    return excess
+
+
 # RAG documents / ingestion
 async def list_parsed_documents_without_rag(session: AsyncSession, batch_size: int) -> Sequence[Mapping[str, Any]]:
     """Return documents with status='parsed' that have no rag_documents mapping."""
@@ -310,6 +783,46 @@ async def list_parsed_documents_without_rag(session: AsyncSession, batch_size: i
     return [r._mapping for r in result.fetchall()]
 
 
+async def list_parsed_documents_fair(
+    session: AsyncSession,
+    batch_size: int,
+    exclude_document_ids: Sequence[str] = (),
+) -> Sequence[Mapping[str, Any]]:
+    """Return parsed documents without rag_documents mapping, round-robin across workspaces.
+
+    Each workspace's documents are ranked by created_at (`workspace_rank`,
+    1 = oldest) and rows are ordered by that rank first, so one workspace
+    with a large backlog cannot starve the others. Only id / workspace_id /
+    created_at are selected (no OCR text). `exclude_document_ids` skips
+    documents that are already being ingested.
+    """
+    docs = models.documents
+    workspace_rank = (
+        sa.func.row_number()
+        .over(partition_by=docs.c.workspace_id, order_by=(docs.c.created_at.asc(), docs.c.id.asc()))
+        .label("workspace_rank")
+    )
+    conditions = [
+        docs.c.status == DOCUMENT_STATUS_PARSED,
+        models.rag_documents.c.id.is_(None),
+    ]
+    if exclude_document_ids:
+        conditions.append(docs.c.id.notin_(list(exclude_document_ids)))
+    ranked = (
+        sa.select(docs.c.id, docs.c.workspace_id, docs.c.created_at, workspace_rank)
+        .select_from(docs.outerjoin(models.rag_documents, docs.c.id == models.rag_documents.c.document_id))
+        .where(*conditions)
+        .subquery("ranked")
+    )
+    stmt = (
+        sa.select(ranked)
+        .order_by(ranked.c.workspace_rank.asc(), ranked.c.created_at.asc())
+        .limit(batch_size)
+    )
+    result = await session.execute(stmt)
+    return [r._mapping for r in result.fetchall()]
+
+
 async def insert_rag_document(session: AsyncSession, document_id: str, rag_doc_id: str) -> Mapping[str, Any]:
     """Insert a mapping row into rag_documents for a newly ingested document."""
     rag_id = new_uuid()
@@ -342,6 +855,76 @@ async def delete_rag_document_mapping(session: AsyncSession, document_id: str) -
     await session.commit()
 
 
+# RAG chunk mappings (chunk_id -> document offsets)
+async def replace_chunk_mappings_for_document(
+    session: AsyncSession,
+    workspace_id: str,
+    document_id: str,
+    chunks: Sequence[Mapping[str, Any]],
+) -> None:
+    """Replace the rag_chunks_mapping rows of a document with `chunks`.
+
+    `chunks` are chunker entries (chunk_id, page_start/end, char_start/end).
+    A chunk_id already mapped to another document of the workspace keeps
+    that mapping (LightRAG stores identical chunk texts once).
+    """
+    await session.execute(
+        sa.delete(models.rag_chunks_mapping).where(models.rag_chunks_mapping.c.document_id == document_id)
+    )
+    rows: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for chunk in chunks:
+        chunk_id = str(chunk["chunk_id"])
+        if chunk_id in seen:
+            continue
+        seen.add(chunk_id)
+        rows.append(
+            {
+                "id": new_uuid(),
+                "workspace_id": workspace_id,
+                "chunk_id": chunk_id,
+                "document_id": document_id,
+                "page_start": int(chunk["page_start"]),
+                "page_end": int(chunk["page_end"]),
+                "segment_start_index": chunk.get("segment_start_index"),
+                "segment_end_index": chunk.get("segment_end_index"),
+                "char_start": chunk.get("char_start"),
+                "char_end": chunk.get("char_end"),
+            }
+        )
+    if rows:
+        stmt = pg_insert(models.rag_chunks_mapping).on_conflict_do_nothing(
+            index_elements=["workspace_id", "chunk_id"]
+        )
+        await session.execute(stmt, rows)
+    await session.commit()
+
+
+async def list_chunk_ids_for_document(session: AsyncSession, document_id: str) -> list[str]:
+    """Return the chunk_ids mapped to a document (its chunk set at the last ingest)."""
+    stmt = sa.select(models.rag_chunks_mapping.c.chunk_id).where(
+        models.rag_chunks_mapping.c.document_id == document_id
+    )
+    result = await session.execute(stmt)
+    return [str(r[0]) for r in result.fetchall()]
+
+
+async def get_chunk_mappings_by_ids(
+    session: AsyncSession,
+    workspace_id: str,
+    chunk_ids: Sequence[str],
+) -> dict[str, Mapping[str, Any]]:
+    """Return rag_chunks_mapping rows keyed by chunk_id."""
+    if not chunk_ids:
+        return {}
+    stmt = sa.select(models.rag_chunks_mapping).where(
+        models.rag_chunks_mapping.c.workspace_id == workspace_id,
+        models.rag_chunks_mapping.c.chunk_id.in_(list(chunk_ids)),
+    )
+    result = await session.execute(stmt)
+    return {str(r._mapping["chunk_id"]): r._mapping for r in result.fetchall()}
+
+
 async def get_document_with_relations(
     session: AsyncSession,
     document_id: str,
@@ -373,8 +956,37 @@ async def get_document_with_relations(
     return _row_to_mapping(row) if row else None
 
 
+async def list_referenced_docai_raw_keys(session: AsyncSession, raw_keys: Sequence[str]) -> set[str]:
+    """Return the docai-raw keys still referenced by a document or an ocr_cache entry.
+
+    OCR cache hits share the raw archive of the document that filled the
+    entry, so delete flows only remove keys that are no longer referenced.
+    """
+    keys = [k for k in raw_keys if k]
+    if not keys:
+        return set()
+    stmt = sa.union(
+        sa.select(models.documents.c.docai_raw_r2_key.label("raw_key")).where(
+            models.documents.c.docai_raw_r2_key.in_(keys)
+        ),
+        sa.select(models.ocr_cache.c.docai_raw_r2_key.label("raw_key")).where(
+            models.ocr_cache.c.docai_raw_r2_key.in_(keys)
+        ),
+    )
+    result = await session.execute(stmt)
+    return {str(r[0]) for r in result.fetchall()}
+
+
 async def delete_document_cascade(session: AsyncSession, document_id: str) -> None:
-    """Delete a document and all directly-related rows (rag_documents, parse_jobs, files)."""
+    """Delete a document and all directly-related rows (rag_documents, chunk mappings, parse_jobs, files, pages)."""
+    # rag_chunks_mapping
+    await session.execute(
+        sa.delete(models.rag_chunks_mapping).where(models.rag_chunks_mapping.c.document_id == document_id)
+    )
+    # document_pages
+    await session.execute(
+        sa.delete(models.document_pages).where(models.document_pages.c.document_id == document_id)
+    )
     # rag_documents
     await session.execute(
         sa.delete(models.rag_documents).where(models.rag_documents.c.document_id == document_id)
@@ -427,6 +1039,24 @@ async def list_conversations(session: AsyncSession, workspace_id: str, user_id:
     return [r._mapping for r in result.fetchall()]
 
 
+async def list_recently_active_workspace_ids(session: AsyncSession, limit: int) -> list[str]:
+    """Workspace ids ordered by their latest message (most recent first)."""
+    last_activity = sa.func.max(models.messages.c.created_at)
+    stmt = (
+        sa.select(models.conversations.c.workspace_id)
+        .select_from(
+            models.messages.join(
+                models.conversations, models.conversations.c.id == models.messages.c.conversation_id
+            )
+        )
+        .group_by(models.conversations.c.workspace_id)
+        .order_by(last_activity.desc())
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return [str(r[0]) for r in result.fetchall()]
+
+
 # Messages
 async def list_messages(session: AsyncSession, conversation_id: str, user_id: str) -> Sequence[Mapping[str, Any]]:
     stmt = (
@@ -594,10 +1224,18 @@ async def delete_workspace_cascade(session: AsyncSession, workspace_id: str, use
     await session.execute(
         sa.delete(models.rag_documents).where(models.rag_documents.c.document_id.in_(doc_ids_subq))
     )
+    # rag_chunks_mapping
+    await session.execute(
+        sa.delete(models.rag_chunks_mapping).where(models.rag_chunks_mapping.c.workspace_id == workspace_id)
+    )
     # parse_jobs (via documents)
     await session.execute(
         sa.delete(models.parse_jobs).where(models.parse_jobs.c.document_id.in_(doc_ids_subq))
     )
+    # document_pages (via documents)
+    await session.execute(
+        sa.delete(models.document_pages).where(models.document_pages.c.document_id.in_(doc_ids_subq))
+    )
     # files (via documents)
     await session.execute(
         sa.delete(models.files).where(models.files.c.document_id.in_(doc_ids_subq))
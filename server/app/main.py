@@ -6,10 +6,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from server.app.api.routes import conversations, documents, me, messages, realtime, workspaces
+from server.app.core.config import get_settings
 from server.app.core.event_bus import listen_realtime_events
 from server.app.core.logging import get_logger, setup_logging
-from server.app.db.session import engine
-from server.app.schemas.common import HealthResponse
+from server.app.db.session import async_session, engine
+from server.app.schemas.common import HealthResponse, RagPoolHealthResponse
+from server.app.services.rag_engine import RagEngineService
+from server.app.services.rag_instance_cache import get_instance_cache, run_idle_eviction_loop
+from server.app.services.rag_pg_pool import get_pg_pool_stats, release_shared_pg_client
 from server.app.services.storage_r2 import check_r2_config_ready
 
 # Load environment variables from .env so that plain os.getenv() calls
@@ -48,6 +52,19 @@ async def validate_supabase_connection() -> None:
     check_r2_config_ready()
     # Start background listener for cross-process realtime events.
     asyncio.create_task(listen_realtime_events())
+    # Release LightRAG instances of workspaces that went idle.
+    asyncio.create_task(run_idle_eviction_loop())
+    # Pre-initialize LightRAG for recently active workspaces (in background,
+    # startup is not blocked).
+    asyncio.create_task(
+        RagEngineService().warm_up_recent_workspaces(async_session, limit=get_settings().rag.warmup_workspaces)
+    )
+
+
+@app.on_event("shutdown")
+async def close_rag_instances() -> None:
+    await get_instance_cache().close_all()
+    await release_shared_pg_client()
 
 
 # Health
@@ -56,6 +73,11 @@ def health() -> HealthResponse:
     return HealthResponse()
 
 
+@app.get("/health/rag-pool", response_model=RagPoolHealthResponse)
+def health_rag_pool() -> RagPoolHealthResponse:
+    return RagPoolHealthResponse(**get_pg_pool_stats(), cached_instances=len(get_instance_cache()))
+
+
 # Routers
 app.include_router(me.router)
 app.include_router(workspaces.router)
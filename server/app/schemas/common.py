@@ -5,5 +5,18 @@ class HealthResponse(BaseModel):
     status: str = "ok"
 
 
+class RagPoolHealthResponse(BaseModel):
+    """Shared LightRAG Postgres pool + instance cache metrics (one process)."""
+
+    initialized: bool
+    size: int | None = None
+    idle: int | None = None
+    in_use: int | None = None
+    min_size: int | None = None
+    max_size: int | None = None
+    ref_count: int | None = None
+    cached_instances: int = 0
+
+
 class ErrorResponse(BaseModel):
     detail: str
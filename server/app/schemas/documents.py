@@ -47,3 +47,8 @@ class DocumentRawTextResponse(BaseModel):
     workspace_id: UUID
     status: str
     text: str
+    # Number of indexed pages (None for documents parsed before page indexing).
+    page_count: Optional[int] = None
+    # Page range actually returned when the request asked for pages.
+    page_from: Optional[int] = None
+    page_to: Optional[int] = None
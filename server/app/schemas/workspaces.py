@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel
@@ -10,10 +10,21 @@ class WorkspaceCreate(BaseModel):
     description: Optional[str] = None
 
 
+# "auto" (stored as NULL) lets the query router pick the mode per question.
+WorkspaceQueryMode = Literal["auto", "naive", "local", "global", "hybrid", "mix"]
+
+
+class WorkspaceUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    query_mode: Optional[WorkspaceQueryMode] = None
+
+
 class Workspace(BaseModel):
     id: UUID
     name: str
     description: Optional[str] = None
+    query_mode: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -0,0 +1,240 @@
+"""Per-workspace answer cache (Redis).
+
+Chat answers are cached per workspace in two layers:
+
+- exact: keyed on the normalized question (`normalize_question`), so
+  "Giá gói Pro?" and "giá gói pro" share one entry;
+- semantic (optional): the embeddings of the last
+  `ANSWER_CACHE_SEMANTIC_MAX_ENTRIES` cached questions are kept in a list;
+  a new question whose embedding has cosine similarity >=
+  `ANSWER_CACHE_SEMANTIC_THRESHOLD` with one of them reuses its answer.
+
+Both layers are also scoped by the query mode and LLM model, so a config
+change never serves answers produced by another pipeline.
+
+Invalidation is version based: every key embeds the workspace's version
+counter (`answer_cache:{workspace_id}:version`), which is bumped whenever
+the workspace's knowledge changes (document ingested, document or
+workspace deleted). Entries of older versions are never read again and
+expire with their TTL (`ANSWER_CACHE_TTL_SECONDS`). The version is read
+before the RAG query, so an answer computed while an ingest finishes is
+stored under the old version and is not served afterwards.
+
+The cache is best effort: Redis errors are logged and the question is
+answered as if nothing were cached.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from server.app.core.config import get_settings
+from server.app.core.logging import get_logger
+from server.app.core.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+_KEY_PREFIX = "answer_cache"
+
+_cache: "AnswerCache | None" = None
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    # "exact" or "semantic".
+    layer: str
+    similarity: float = 1.0
+
+
+def _scope(mode: str, llm_model: str) -> str:
+    return hashlib.sha256(f"{mode}\x00{llm_model}".encode("utf-8")).hexdigest()[:16]
+
+
+def _question_hash(scope: str, normalized_question: str) -> str:
+    return hashlib.sha256(f"{scope}\x00{normalized_question}".encode("utf-8")).hexdigest()
+
+
+def _unit_vector(embedding: Any) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(vector))
+    if not vector.size or norm == 0.0:
+        return None
+    return vector / norm
+
+
+class AnswerCache:
+    """Two-layer (exact + semantic) answer cache with per-workspace versions."""
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        semantic_enabled: bool,
+        semantic_threshold: float,
+        semantic_max_entries: int,
+        redis_factory: Callable[[], Any] = get_redis,
+    ) -> None:
+        self._ttl = max(1, int(ttl_seconds))
+        self._semantic_enabled = bool(semantic_enabled)
+        self._semantic_threshold = float(semantic_threshold)
+        self._semantic_max_entries = max(1, int(semantic_max_entries))
+        self._redis_factory = redis_factory
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self._semantic_enabled
+
+    @staticmethod
+    def _version_key(workspace_id: str) -> str:
+        return f"{_KEY_PREFIX}:{workspace_id}:version"
+
+    @staticmethod
+    def _exact_key(workspace_id: str, version: int, question_hash: str) -> str:
+        return f"{_KEY_PREFIX}:{workspace_id}:{version}:exact:{question_hash}"
+
+    @staticmethod
+    def _semantic_key(workspace_id: str, version: int, scope: str) -> str:
+        return f"{_KEY_PREFIX}:{workspace_id}:{version}:semantic:{scope}"
+
+    async def get_version(self, workspace_id: str) -> Optional[int]:
+        """Current version of the workspace (None when Redis is unavailable)."""
+        try:
+            raw = await self._redis_factory().get(self._version_key(workspace_id))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Answer cache unavailable; answering without cache: %s", exc)
+            return None
+        return int(raw or 0)
+
+    async def bump_version(self, workspace_id: str) -> None:
+        """Invalidate every cached answer of the workspace."""
+        try:
+            version = await self._redis_factory().incr(self._version_key(workspace_id))
+            logger.info("Invalidated answer cache for workspace %s (version=%s)", workspace_id, version)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to invalidate answer cache for workspace %s: %s", workspace_id, exc)
+
+    async def get_exact(
+        self,
+        workspace_id: str,
+        version: int,
+        mode: str,
+        llm_model: str,
+        normalized_question: str,
+    ) -> Optional[CachedAnswer]:
+        question_hash = _question_hash(_scope(mode, llm_model), normalized_question)
+        answer = await self._get_answer(workspace_id, version, question_hash)
+        return CachedAnswer(answer=answer, layer="exact") if answer is not None else None
+
+    async def get_semantic(
+        self,
+        workspace_id: str,
+        version: int,
+        mode: str,
+        llm_model: str,
+        embedding: Any,
+    ) -> Optional[CachedAnswer]:
+        """Answer of the most similar cached question above the threshold."""
+        query = _unit_vector(embedding)
+        if not self._semantic_enabled or query is None:
+            return None
+        try:
+            raw_entries = await self._redis_factory().lrange(
+                self._semantic_key(workspace_id, version, _scope(mode, llm_model)), 0, -1
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Answer cache semantic lookup failed: %s", exc)
+            return None
+
+        best_hash: Optional[str] = None
+        best_similarity = self._semantic_threshold
+        for raw in raw_entries:
+            try:
+                entry = json.loads(raw)
+                vector = np.frombuffer(base64.b64decode(entry["e"]), dtype=np.float32)
+            except (ValueError, KeyError, TypeError):
+                continue
+            if vector.shape != query.shape:
+                continue
+            similarity = float(np.dot(query, vector))
+            if similarity >= best_similarity:
+                best_hash, best_similarity = entry["h"], similarity
+        if best_hash is None:
+            return None
+        answer = await self._get_answer(workspace_id, version, best_hash)
+        if answer is None:
+            return None
+        return CachedAnswer(answer=answer, layer="semantic", similarity=best_similarity)
+
+    async def put(
+        self,
+        workspace_id: str,
+        version: int,
+        mode: str,
+        llm_model: str,
+        normalized_question: str,
+        answer: str,
+        embedding: Any = None,
+    ) -> None:
+        """Store an answer (and the question embedding for the semantic layer)."""
+        scope = _scope(mode, llm_model)
+        question_hash = _question_hash(scope, normalized_question)
+        try:
+            redis = self._redis_factory()
+            await redis.set(
+                self._exact_key(workspace_id, version, question_hash),
+                json.dumps({"question": normalized_question, "answer": answer}),
+                ex=self._ttl,
+            )
+            vector = _unit_vector(embedding) if embedding is not None else None
+            if self._semantic_enabled and vector is not None:
+                semantic_key = self._semantic_key(workspace_id, version, scope)
+                entry = json.dumps({"h": question_hash, "e": base64.b64encode(vector.tobytes()).decode("ascii")})
+                pipe = redis.pipeline(transaction=False)
+                pipe.lpush(semantic_key, entry)
+                pipe.ltrim(semantic_key, 0, self._semantic_max_entries - 1)
+                pipe.expire(semantic_key, self._ttl)
+                await pipe.execute()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Answer cache write failed: %s", exc)
+
+    async def _get_answer(self, workspace_id: str, version: int, question_hash: str) -> Optional[str]:
+        try:
+            raw = await self._redis_factory().get(self._exact_key(workspace_id, version, question_hash))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Answer cache lookup failed: %s", exc)
+            return None
+        if not raw:
+            return None
+        try:
+            return str(json.loads(raw)["answer"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+def get_answer_cache() -> AnswerCache | None:
+    """Return the process-wide answer cache, or None when disabled."""
+    global _cache
+    settings = get_settings().answer
+    if not settings.cache_enabled:
+        return None
+    if _cache is None:
+        _cache = AnswerCache(
+            ttl_seconds=settings.cache_ttl_seconds,
+            semantic_enabled=settings.cache_semantic_enabled,
+            semantic_threshold=settings.cache_semantic_threshold,
+            semantic_max_entries=settings.cache_semantic_max_entries,
+        )
+    return _cache
+
+
+async def invalidate_workspace_answers(workspace_id: str) -> None:
+    """Bump the workspace's answer cache version (best effort, no-op when disabled)."""
+    cache = get_answer_cache()
+    if cache is not None:
+        await cache.bump_version(workspace_id)
@@ -4,26 +4,58 @@ Reverted Phase 9.1:
 - Delegates retrieval + answer generation entirely to LightRAG via
   RagEngineService.
 - Does not build sections or citations on the server anymore.
+
+Answers are served from the per-workspace answer cache when possible
+(see `answer_cache`). `stream_answer` is the streaming variant used by the
+chat background task (token deltas as LightRAG generates them).
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
 
 from server.app.core.config import get_settings
 from server.app.core.logging import get_logger
+from server.app.services.answer_cache import AnswerCache, CachedAnswer, get_answer_cache
+from server.app.services.query_router import QueryRoute, route_query_mode
 from server.app.services.rag_engine import RagEngineService
+from server.app.utils.text import normalize_question
 
 
 logger = get_logger(__name__)
 
+_NO_ANSWER_TEXT = "Xin lỗi, mình không thể tạo được câu trả lời cho câu hỏi này dựa trên tài liệu hiện có."
+_RAG_ERROR_TEXT = "Xin lỗi, đã xảy ra lỗi khi truy vấn engine RAG nên mình chưa thể trả lời câu hỏi này."
+
+
+@dataclass
+class _CacheLookup:
+    hit: Optional[CachedAnswer] = None
+    # Version read before querying (None: cache disabled / unavailable).
+    version: Optional[int] = None
+    embedding: Any = None
+
+
+def _answer_result(answer: str, route: QueryRoute | None = None, **extra: Any) -> Dict[str, Any]:
+    result = {"answer": answer, "sections": [], "citations": [], "llm_usage": None, **extra}
+    if route is not None:
+        result["query_mode"] = route.mode
+        result["query_mode_reason"] = route.reason
+    return result
+
 
 class AnswerEngineService:
     """High-level answer engine that owns the chat pipeline."""
 
-    def __init__(self, rag_engine: RagEngineService | None = None) -> None:
+    def __init__(
+        self,
+        rag_engine: RagEngineService | None = None,
+        answer_cache: AnswerCache | None = None,
+    ) -> None:
         settings_all = get_settings()
         self._rag_engine = rag_engine or RagEngineService(settings=settings_all.rag)
+        self._answer_cache = answer_cache or get_answer_cache()
         self._logger = get_logger(__name__)
 
     async def answer_question(
@@ -31,31 +63,37 @@ class AnswerEngineService:
         workspace_id: str,
         conversation_id: str,
         question: str,
+        workspace_query_mode: str | None = None,
     ) -> Dict[str, Any]:
         """Return an answer for a single user question using LightRAG only.
 
         The response keeps `sections`, `citations` and `llm_usage` keys for
         backward compatibility with clients, but these fields are always
         empty/None because server-side source attribution is disabled.
+        `query_mode` / `query_mode_reason` report the routed LightRAG mode
+        (`workspace_query_mode` is the workspace's pinned mode, if any).
+        A cache hit additionally sets `answer_cache` ("exact" / "semantic").
         """
+        route = self._route(question, workspace_query_mode)
+        mode = route.mode
+        normalized = normalize_question(question)
         try:
+            lookup = await self._lookup_cache(workspace_id, conversation_id, question, normalized, mode)
+            if lookup.hit is not None:
+                return _answer_result(lookup.hit.answer, route, answer_cache=lookup.hit.layer)
+
             rag_result = await self._rag_engine.query_answer(
                 workspace_id=workspace_id,
                 question=question,
                 system_prompt=None,
-                mode=None,
+                mode=mode,
             )
             answer_text = str(rag_result.get("answer") or "").strip()
             if not answer_text:
-                answer_text = (
-                    "Xin lỗi, mình không thể tạo được câu trả lời cho câu hỏi này dựa trên tài liệu hiện có."
-                )
-            return {
-                "answer": answer_text,
-                "sections": [],
-                "citations": [],
-                "llm_usage": None,
-            }
+                answer_text = _NO_ANSWER_TEXT
+            elif not rag_result.get("fallback"):
+                await self._store(workspace_id, lookup, mode, normalized, answer_text)
+            return _answer_result(answer_text, route)
         except Exception as exc:  # noqa: BLE001
             self._logger.error(
                 "LightRAG query_answer failed for workspace=%s conversation=%s: %s",
@@ -63,12 +101,134 @@ class AnswerEngineService:
                 conversation_id,
                 str(exc),
             )
-            return {
-                "answer": (
-                    "Xin lỗi, đã xảy ra lỗi khi truy vấn engine RAG nên mình chưa thể trả lời câu hỏi này."
-                ),
-                "sections": [],
-                "citations": [],
-                "llm_usage": None,
+            return _answer_result(_RAG_ERROR_TEXT, route)
+
+    async def stream_answer(
+        self,
+        workspace_id: str,
+        conversation_id: str,
+        question: str,
+        workspace_query_mode: str | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of `answer_question`.
+
+        Yields `{"delta": text}` events while the answer is generated, then
+        exactly one `{"result": ...}` event carrying the same dict
+        `answer_question` returns. A cache hit (or a missing LLM config)
+        yields the result directly. If the query fails mid-stream the
+        result is the error message, replacing any partial text.
+        """
+        if not self._rag_engine.is_llm_configured():
+            # Non-streaming path returns the configuration fallback at once.
+            yield {
+                "result": await self.answer_question(
+                    workspace_id, conversation_id, question, workspace_query_mode=workspace_query_mode
+                )
             }
+            return
 
+        route = self._route(question, workspace_query_mode)
+        mode = route.mode
+        normalized = normalize_question(question)
+        pieces: list[str] = []
+        try:
+            lookup = await self._lookup_cache(workspace_id, conversation_id, question, normalized, mode)
+            if lookup.hit is not None:
+                yield {"result": _answer_result(lookup.hit.answer, route, answer_cache=lookup.hit.layer)}
+                return
+
+            async for delta in self._rag_engine.stream_answer(
+                workspace_id=workspace_id,
+                question=question,
+                system_prompt=None,
+                mode=mode,
+            ):
+                pieces.append(delta)
+                yield {"delta": delta}
+        except Exception as exc:  # noqa: BLE001
+            self._logger.error(
+                "LightRAG stream_answer failed for workspace=%s conversation=%s after %d deltas: %s",
+                workspace_id,
+                conversation_id,
+                len(pieces),
+                str(exc),
+            )
+            yield {"result": _answer_result(_RAG_ERROR_TEXT, route)}
+            return
+
+        answer_text = "".join(pieces).strip()
+        if not answer_text:
+            yield {"result": _answer_result(_NO_ANSWER_TEXT, route)}
+            return
+        await self._store(workspace_id, lookup, mode, normalized, answer_text)
+        yield {"result": _answer_result(answer_text, route)}
+
+    def _route(self, question: str, workspace_query_mode: str | None) -> QueryRoute:
+        settings = self._rag_engine.settings
+        route = route_query_mode(
+            question,
+            default_mode=settings.query_mode,
+            workspace_mode=workspace_query_mode,
+            enabled=settings.query_router_enabled,
+        )
+        self._logger.info("Routed question to LightRAG mode=%s (%s)", route.mode, route.reason)
+        return route
+
+    async def _lookup_cache(
+        self,
+        workspace_id: str,
+        conversation_id: str,
+        question: str,
+        normalized: str,
+        mode: str,
+    ) -> _CacheLookup:
+        cache = self._answer_cache
+        lookup = _CacheLookup()
+        if cache is None or not normalized:
+            return lookup
+        lookup.version = await cache.get_version(workspace_id)
+        if lookup.version is None:
+            return lookup
+        llm_model = self._rag_engine.settings.llm_model
+        hit = await cache.get_exact(workspace_id, lookup.version, mode, llm_model, normalized)
+        if hit is None and cache.semantic_enabled:
+            lookup.embedding = await self._embed_question(question)
+            if lookup.embedding is not None:
+                hit = await cache.get_semantic(workspace_id, lookup.version, mode, llm_model, lookup.embedding)
+        if hit is not None:
+            self._logger.info(
+                "Answer cache hit (%s, similarity=%.3f) for workspace=%s conversation=%s",
+                hit.layer,
+                hit.similarity,
+                workspace_id,
+                conversation_id,
+            )
+        lookup.hit = hit
+        return lookup
+
+    async def _store(self, workspace_id: str, lookup: _CacheLookup, mode: str, normalized: str, answer: str) -> None:
+        if self._answer_cache is None or lookup.version is None:
+            return
+        await self._answer_cache.put(
+            workspace_id,
+            lookup.version,
+            mode,
+            self._rag_engine.settings.llm_model,
+            normalized,
+            answer,
+            embedding=lookup.embedding,
+        )
+
+    async def _embed_question(self, question: str) -> Any:
+        """Question embedding for the semantic cache layer (None on failure).
+
+        The raw (stripped) question is embedded, as LightRAG does for its own
+        retrieval, so on a cache miss LightRAG's query embedding is served
+        from the embedding cache instead of a second provider call.
+        """
+        try:
+            vectors = await self._rag_engine.embed_texts([question.strip()])
+            return vectors[0]
+        except Exception as exc:  # noqa: BLE001
+            self._logger.warning("Failed to embed question for the semantic answer cache: %s", exc)
+            return None
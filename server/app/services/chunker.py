@@ -1,26 +1,239 @@
-"""Chunker service for building RAG content_list (Phase 3).
+"""Chunker service for building RAG content_list + custom chunks (Phase 3 / 9.1).
 
 This service bridges OCR results (`docai_full_text` stored in DB)
-with the RAG engine by producing `content_list` items that LightRAG
-can ingest. It does not attempt to reconstruct complex layout from
-Document AI JSON; it works directly on the flattened OCR text.
+with the RAG engine. It produces:
+
+- `content_list`: one item per page (using the `document_pages` offset
+  index); LightRAG stores their concatenation as the document full text.
+- `chunks_info`: token-bounded chunks that drive `ainsert_custom_chunks`,
+  each with a deterministic `chunk_id` (same hash LightRAG uses) plus
+  char/page offsets into `docai_full_text` for `rag_chunks_mapping`.
+
+Chunks are built structurally on the flattened OCR text: a page is split
+into blocks (paragraphs separated by blank lines; runs of ` | ` table
+rows form their own block), oversized blocks are split by line (table
+rows stay whole), and only single lines longer than the budget are cut at
+whitespace. Blocks are then packed greedily up to `RAG_CHUNK_MAX_TOKENS`,
+preferring to close a chunk at a page break, with an optional overlap of
+whole trailing blocks. Every chunk is an exact slice of `docai_full_text`.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from server.app.core.config import get_settings
 from server.app.core.logging import get_logger
-from server.app.db import models
+from server.app.db import models, repositories as repo
+from server.app.utils.tokens import count_tokens
 
 logger = get_logger(__name__)
 
+# A chunk already filled to this fraction of the budget is closed at a page
+# break instead of continuing onto the next page.
+_PAGE_BREAK_FILL_RATIO = 0.5
+# Safety margin when cutting an over-long line by an estimated char budget.
+_LONG_LINE_CUT_RATIO = 0.9
+
+
+@dataclass
+class _Unit:
+    """Smallest piece that is never split: a block, line or line window."""
+
+    start: int
+    end: int
+    tokens: int
+    page_idx: int
+
+
+def compute_chunk_id(chunk_text: str) -> str:
+    """Chunk id as LightRAG computes it (`compute_mdhash_id(text, prefix="chunk-")`)."""
+    content = chunk_text.strip().replace("\x00", "")
+    return "chunk-" + hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+def build_structural_chunks(
+    full_text: str,
+    page_ranges: Sequence[tuple[int, int, int]],
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    tokenizer_model: str = "gpt-4o-mini",
+) -> List[dict]:
+    """Split `full_text` into token-bounded chunks along its structure.
+
+    `page_ranges` are `(page_idx, char_start, char_end)` into `full_text`
+    (see `document_pages`). Returns chunk dicts with `chunk_id`,
+    `chunk_text`, `tokens`, `chunk_order_index`, `page_start`, `page_end`,
+    `char_start`, `char_end` (end exclusive); identical chunk texts are
+    emitted once.
+    """
+    max_tokens = max(1, int(max_tokens))
+    # Keep room for new content in every chunk.
+    overlap_tokens = max(0, min(int(overlap_tokens or 0), max_tokens // 2))
+
+    units: List[_Unit] = []
+    for page_idx, page_start, page_end in page_ranges:
+        units.extend(_page_units(full_text, page_idx, page_start, page_end, max_tokens, tokenizer_model))
+
+    groups: List[List[_Unit]] = []
+    current: List[_Unit] = []
+    current_tokens = 0
+    for unit in units:
+        if current:
+            page_break = unit.page_idx != current[-1].page_idx
+            if current_tokens + unit.tokens > max_tokens or (
+                page_break and current_tokens >= max_tokens * _PAGE_BREAK_FILL_RATIO
+            ):
+                groups.append(current)
+                current = _overlap_tail(current, overlap_tokens, max_tokens - unit.tokens)
+                current_tokens = sum(u.tokens for u in current)
+        current.append(unit)
+        current_tokens += unit.tokens
+    if current:
+        groups.append(current)
+
+    chunks: List[dict] = []
+    seen: set[str] = set()
+    for group in groups:
+        char_start, char_end = group[0].start, group[-1].end
+        chunk_text = full_text[char_start:char_end]
+        chunk_id = compute_chunk_id(chunk_text)
+        if chunk_id in seen:
+            continue
+        seen.add(chunk_id)
+        chunks.append(
+            {
+                "chunk_id": chunk_id,
+                "chunk_text": chunk_text,
+                "tokens": sum(u.tokens for u in group),
+                "chunk_order_index": len(chunks),
+                "page_start": group[0].page_idx,
+                "page_end": group[-1].page_idx,
+                "char_start": char_start,
+                "char_end": char_end,
+            }
+        )
+    return chunks
+
+
+def _overlap_tail(units: List[_Unit], overlap_tokens: int, room: int) -> List[_Unit]:
+    """Trailing whole units of a closed chunk to repeat at the next chunk start."""
+    budget = min(overlap_tokens, room)
+    tail: List[_Unit] = []
+    total = 0
+    for unit in reversed(units):
+        if total + unit.tokens > budget:
+            break
+        tail.insert(0, unit)
+        total += unit.tokens
+    # Never carry a whole chunk over (it would be emitted twice).
+    return tail if len(tail) < len(units) else []
+
+
+def _page_units(
+    text: str,
+    page_idx: int,
+    page_start: int,
+    page_end: int,
+    max_tokens: int,
+    tokenizer_model: str,
+) -> List[_Unit]:
+    units: List[_Unit] = []
+    for block in _page_blocks(text, page_start, page_end):
+        block_start, block_end = block[0][0], block[-1][1]
+        tokens = count_tokens(text[block_start:block_end], tokenizer_model)
+        if tokens <= max_tokens:
+            units.append(_Unit(block_start, block_end, tokens, page_idx))
+            continue
+        for line_start, line_end in block:
+            tokens = count_tokens(text[line_start:line_end], tokenizer_model)
+            if tokens <= max_tokens:
+                units.append(_Unit(line_start, line_end, tokens, page_idx))
+            else:
+                units.extend(
+                    _split_long_line(text, line_start, line_end, tokens, page_idx, max_tokens, tokenizer_model)
+                )
+    return units
+
+
+def _page_blocks(text: str, page_start: int, page_end: int) -> List[List[tuple[int, int]]]:
+    """Group the non-blank lines of a page into blocks of (start, end) line spans.
+
+    Blank lines end a block; switching between table rows (` | `) and
+    regular lines also does, so a table is kept apart from its caption.
+    """
+    blocks: List[List[tuple[int, int]]] = []
+    current: List[tuple[int, int]] = []
+    current_is_table = False
+    pos = page_start
+    while pos < page_end:
+        newline = text.find("\n", pos, page_end)
+        line_end = page_end if newline == -1 else newline
+        span = _trim_span(text, pos, line_end)
+        if span is None:
+            if current:
+                blocks.append(current)
+                current = []
+        else:
+            is_table = " | " in text[span[0] : span[1]]
+            if current and is_table != current_is_table:
+                blocks.append(current)
+                current = []
+            current.append(span)
+            current_is_table = is_table
+        pos = line_end + 1
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def _split_long_line(
+    text: str,
+    start: int,
+    end: int,
+    tokens: int,
+    page_idx: int,
+    max_tokens: int,
+    tokenizer_model: str,
+) -> List[_Unit]:
+    """Cut a line longer than the budget at whitespace (hard cut if there is none)."""
+    units: List[_Unit] = []
+    pos = start
+    while pos < end:
+        if tokens <= max_tokens:
+            units.append(_Unit(pos, end, tokens, page_idx))
+            break
+        window = max(1, int((end - pos) * max_tokens / tokens * _LONG_LINE_CUT_RATIO))
+        cut = pos + window
+        space = text.rfind(" ", pos + 1, cut)
+        if space > pos:
+            cut = space
+        piece = _trim_span(text, pos, cut)
+        if piece is not None:
+            units.append(_Unit(piece[0], piece[1], count_tokens(text[piece[0] : piece[1]], tokenizer_model), page_idx))
+        rest = _trim_span(text, cut, end)
+        if rest is None:
+            break
+        pos = rest[0]
+        tokens = count_tokens(text[pos:end], tokenizer_model)
+    return units
+
+
+def _trim_span(text: str, start: int, end: int) -> Optional[tuple[int, int]]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
+
 
 class ChunkerService:
-    """Service responsible for turning documents into content_list."""
+    """Service responsible for turning documents into content_list + chunks."""
 
     def __init__(self, session_factory, storage_r2) -> None:  # type: ignore[no-untyped-def]
         self._session_factory = session_factory
@@ -47,28 +260,43 @@ class ChunkerService:
             if not file_row:
                 raise RuntimeError(f"No file metadata found for document id={document_id}")
             file = file_row._mapping
-            full_text = (document.get("docai_full_text") or "").strip()
-            if not full_text:
-                raise RuntimeError(f"Document {document_id} has no OCR text (docai_full_text is empty)")
+
+            pages = await repo.list_document_pages(session, document_id=document_id)
+
+        full_text = str(document.get("docai_full_text") or "")
+        # Documents parsed before page indexing are a single page.
+        page_ranges = [(int(p["page_idx"]), int(p["char_start"]), int(p["char_end"])) for p in pages]
+        if not page_ranges and full_text.strip():
+            page_ranges = [(0, 0, len(full_text))]
+
+        # One content item per page so page_idx is real.
+        content_list: List[dict] = []
+        for page_idx, char_start, char_end in page_ranges:
+            page_text = full_text[char_start:char_end].strip()
+            if page_text:
+                content_list.append({"type": "text", "text": page_text, "page_idx": page_idx})
+        if not content_list:
+            raise RuntimeError(f"Document {document_id} has no OCR text (docai_full_text is empty)")
+
+        settings = get_settings().rag
+        chunks_info = build_structural_chunks(
+            full_text,
+            page_ranges,
+            max_tokens=settings.chunk_max_tokens,
+            overlap_tokens=settings.chunk_overlap_tokens,
+            tokenizer_model=settings.chunk_tokenizer_model,
+        )
 
         workspace_id = str(document["workspace_id"])
         original_filename = str(file["original_filename"])
 
-        content_list: List[dict] = [
-            {
-                "type": "text",
-                "text": full_text,
-                "page_idx": 0,
-            }
-        ]
-        chunks_info: List[dict] = []
-
         self._logger.info(
-            "Built content_list for document %s (workspace=%s, filename=%s, chunks=%d)",
+            "Built content_list for document %s (workspace=%s, filename=%s, pages=%d, chunks=%d)",
             document_id,
             workspace_id,
             original_filename,
             len(content_list),
+            len(chunks_info),
         )
 
         return content_list, chunks_info
@@ -7,7 +7,9 @@ integration with `google-cloud-documentai` can be implemented later.
 
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import io
+from typing import IO, Any, Dict, List, Mapping, Sequence, Tuple
 
 from google.api_core.exceptions import GoogleAPIError
 from google.cloud import documentai_v1 as documentai
@@ -17,6 +19,7 @@ from starlette.concurrency import run_in_threadpool
 
 from server.app.core.config import DocumentAISettings, get_settings
 from server.app.core.logging import get_logger
+from server.app.core.rate_limiter import TokenBucketRateLimiter
 
 
 class PermanentDocumentAIError(RuntimeError):
@@ -46,14 +49,40 @@ class DocumentAIClient:
 
         # Without credentials_path, fall back to Application Default Credentials.
         self._client = documentai.DocumentProcessorServiceClient(**client_kwargs)
-        self._processor_name = self._client.processor_path(
-            self.settings.project_id,
-            self.settings.location,
-            self.settings.ocr_processor_id,
-        )
+        if self.settings.ocr_processor_version:
+            self._processor_name = self._client.processor_version_path(
+                self.settings.project_id,
+                self.settings.location,
+                self.settings.ocr_processor_id,
+                self.settings.ocr_processor_version,
+            )
+        else:
+            self._processor_name = self._client.processor_path(
+                self.settings.project_id,
+                self.settings.location,
+                self.settings.ocr_processor_id,
+            )
+
+        # Requests to one processor share a quota across all workers/replicas.
+        self._rate_limiter: TokenBucketRateLimiter | None = None
+        if self.settings.rate_limit_per_minute > 0:
+            self._rate_limiter = TokenBucketRateLimiter(
+                name=f"docai:{self._processor_name}",
+                rate_per_second=self.settings.rate_limit_per_minute / 60.0,
+                burst=self.settings.rate_limit_burst,
+            )
+
+    @property
+    def processor_version(self) -> str:
+        """Processor version label used to key cached OCR results."""
+        return self.settings.ocr_processor_version or "default"
+
+    def _process_sync_payload(self, file_bytes: bytes, mime_type: str) -> bytes:
+        """Synchronous call to Document AI, wrapped for use in a thread.
 
-    def _process_sync(self, file_bytes: bytes, mime_type: str) -> Dict[str, Any]:
-        """Synchronous call to Document AI, wrapped for use in a thread."""
+        Returns the Document as serialized protobuf bytes; converting it to a
+        dict is CPU-bound and left to the caller (see `ocr_postprocess`).
+        """
         raw_document = documentai.RawDocument(content=file_bytes, mime_type=mime_type)
         request = documentai.ProcessRequest(name=self._processor_name, raw_document=raw_document)
         
@@ -76,10 +105,151 @@ class DocumentAIClient:
             # Fallback: generic, potentially retryable error.
             raise RuntimeError(f"Document AI processing failed: {message}") from exc
 
-        # Convert Document protobuf to dict so it can be serialized and stored.
-        # Fix: result.document is a proto-plus wrapper; access the underlying protobuf via ._pb
-        return MessageToDict(result.document._pb, preserving_proto_field_name=True)
+        # result.document is a proto-plus wrapper; serialize the underlying protobuf via ._pb
+        return result.document._pb.SerializeToString()
 
-    async def process_document_ocr(self, file_bytes: bytes, mime_type: str) -> Dict[str, Any]:
-        """Call Enterprise Document OCR for a single file and return the Document as dict."""
-        return await run_in_threadpool(self._process_sync, file_bytes, mime_type)
+    async def process_document_ocr_payloads(self, source: bytes | IO[bytes], mime_type: str) -> List[bytes]:
+        """Call Enterprise Document OCR and return serialized Documents, one per shard.
+
+        `source` is either the file bytes or a seekable binary file handle
+        (e.g. from `storage_r2.download_file_stream`).
+
+        PDFs with more pages than `shard_page_count` are split locally into
+        page ranges that are OCR'd concurrently (bounded by
+        `shard_max_concurrency`); the returned payloads are in page order and
+        are merged by `merge_ocr_payloads`. Shards are cut lazily, so at most
+        `shard_max_concurrency` shard payloads are held in memory at once.
+        """
+        reader, page_ranges = self._plan_shards(source, mime_type)
+        if reader is None or len(page_ranges) <= 1:
+            content = _read_all(source)
+            return [await self._process_payload(content, mime_type)]
+
+        self._logger.info(
+            f"Sharding PDF into {len(page_ranges)} requests of up to {self.settings.shard_page_count} pages"
+        )
+        semaphore = asyncio.Semaphore(max(1, self.settings.shard_max_concurrency))
+        # The PDF reader is not thread-safe; cut one shard at a time.
+        split_lock = asyncio.Lock()
+
+        async def _process_shard(start: int, end: int) -> bytes:
+            async with semaphore:
+                async with split_lock:
+                    shard_bytes = await run_in_threadpool(write_pdf_page_range, reader, start, end)
+                return await self._process_payload(shard_bytes, mime_type)
+
+        return list(await asyncio.gather(*(_process_shard(start, end) for start, end in page_ranges)))
+
+    async def _process_payload(self, content: bytes, mime_type: str) -> bytes:
+        """Wait for a rate-limit token (if configured), then call Document AI in a thread."""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        return await run_in_threadpool(self._process_sync_payload, content, mime_type)
+
+    def _plan_shards(self, source: bytes | IO[bytes], mime_type: str) -> Tuple[Any, List[Tuple[int, int]]]:
+        """Return (pdf_reader, page_ranges), or (None, []) when sharding does not apply."""
+        pages_per_shard = int(self.settings.shard_page_count or 0)
+        if pages_per_shard <= 0 or (mime_type or "").lower() != "application/pdf":
+            return None, []
+        try:
+            from pypdf import PdfReader  # type: ignore[import]
+        except ImportError:
+            self._logger.warning("pypdf is not installed; sending PDF to Document AI without sharding.")
+            return None, []
+        try:
+            if isinstance(source, (bytes, bytearray)):
+                reader = PdfReader(io.BytesIO(source))
+            else:
+                source.seek(0)
+                reader = PdfReader(source)
+            total_pages = len(reader.pages)
+        except Exception as exc:  # noqa: BLE001
+            # Malformed PDFs: let Document AI decide instead of failing locally.
+            self._logger.warning(f"Failed to read PDF locally; sending it unsharded: {exc}")
+            return None, []
+        page_ranges = [
+            (start, min(start + pages_per_shard, total_pages))
+            for start in range(0, total_pages, pages_per_shard)
+        ]
+        return reader, page_ranges
+
+
+def _read_all(source: bytes | IO[bytes]) -> bytes:
+    """Return the full payload (Document AI online requests need raw bytes)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
+
+def write_pdf_page_range(reader: Any, start: int, end: int) -> bytes:
+    """Write pages [start, end) of an open `pypdf.PdfReader` into a new PDF."""
+    from pypdf import PdfWriter  # type: ignore[import]
+
+    writer = PdfWriter()
+    for page_idx in range(start, end):
+        writer.add_page(reader.pages[page_idx])
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def document_dict_from_payload(payload: bytes) -> Dict[str, Any]:
+    """Convert a serialized Document protobuf into the dict form used everywhere else."""
+    document = documentai.Document.pb().FromString(payload)
+    return MessageToDict(document, preserving_proto_field_name=True)
+
+
+def merge_ocr_payloads(payloads: Sequence[bytes]) -> Dict[str, Any]:
+    """Convert per-shard serialized Documents (in page order) and merge them."""
+    return merge_ocr_documents([document_dict_from_payload(payload) for payload in payloads])
+
+
+def merge_ocr_documents(docs: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Merge per-shard Document dicts (in page order) into one Document dict.
+
+    Shard texts are concatenated; every `text_anchor.text_segments` index is
+    shifted by the length of the preceding text and page numbers are
+    renumbered, so the result looks like a single OCR response and works
+    unchanged with `build_full_text_from_ocr_result`. Only `text`, `pages`
+    and `mime_type` are kept; document-level annotations are dropped.
+    """
+    if len(docs) == 1:
+        return dict(docs[0])
+
+    text_parts: List[str] = []
+    pages: List[Any] = []
+    text_offset = 0
+    for doc in docs:
+        shard_text = str(doc.get("text") or "")
+        for page in doc.get("pages") or []:
+            if text_offset:
+                _shift_text_anchors(page, text_offset)
+            pages.append(page)
+            page["page_number"] = len(pages)
+        text_parts.append(shard_text)
+        text_offset += len(shard_text)
+
+    merged: Dict[str, Any] = {"text": "".join(text_parts), "pages": pages}
+    mime_type = docs[0].get("mime_type") if docs else None
+    if mime_type:
+        merged["mime_type"] = mime_type
+    return merged
+
+
+def _shift_text_anchors(node: Any, offset: int) -> None:
+    """Shift all text_anchor segment indices inside `node` by `offset` (in place)."""
+    if isinstance(node, list):
+        for item in node:
+            _shift_text_anchors(item, offset)
+        return
+    if not isinstance(node, dict):
+        return
+    for key, value in node.items():
+        if key == "text_anchor" and isinstance(value, dict):
+            for seg in value.get("text_segments") or []:
+                # MessageToDict renders int64 as strings and omits zero values.
+                seg["start_index"] = str(int(seg.get("start_index", 0) or 0) + offset)
+                seg["end_index"] = str(int(seg.get("end_index", 0) or 0) + offset)
+        else:
+            _shift_text_anchors(value, offset)
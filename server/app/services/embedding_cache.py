@@ -0,0 +1,145 @@
+"""Content-addressed embedding cache (Postgres `embedding_cache`).
+
+Wraps the embedding function handed to LightRAG. Every input text is keyed
+by (embedding model, dimension, sha256(text)); a batch is split into cache
+hits and misses, only the misses go to the provider, and their vectors are
+stored for next time. Identical chunks across workspaces, re-ingests and
+repeated query strings are therefore embedded once.
+
+Vectors are stored as raw float32 bytes. The table is bounded by
+`RAG_EMBEDDING_CACHE_MAX_ENTRIES`: after every
+`RAG_EMBEDDING_CACHE_EVICT_EVERY` inserted rows the least recently used
+rows beyond the limit are deleted.
+
+The cache is best effort: a database error is logged and the texts are
+embedded as if the cache were empty.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Mapping, Sequence
+
+import numpy as np
+
+from server.app.core.config import get_settings
+from server.app.core.logging import get_logger
+from server.app.db import repositories as repo
+
+EmbedFunc = Callable[[list[str]], Awaitable[Any]]
+
+logger = get_logger(__name__)
+
+_cache: "EmbeddingCache | None" = None
+
+
+def _text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Postgres-backed embedding store with size-bounded LRU eviction."""
+
+    def __init__(self, session_factory, max_entries: int, evict_every: int) -> None:  # type: ignore[no-untyped-def]
+        self._session_factory = session_factory
+        self._max_entries = max(0, int(max_entries))
+        self._evict_every = max(1, int(evict_every))
+        self._inserted_since_evict = 0
+        self._evicting = False
+
+    async def get_many(self, model: str, dim: int, text_hashes: Sequence[bytes]) -> dict[bytes, np.ndarray]:
+        """Return cached vectors for the hashes that hit."""
+        try:
+            async with self._session_factory() as session:  # type: ignore[call-arg]
+                rows = await repo.get_embedding_cache_entries(session, model=model, dim=dim, text_hashes=text_hashes)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Embedding cache lookup failed; embedding without cache: %s", exc)
+            return {}
+        vectors: dict[bytes, np.ndarray] = {}
+        for text_hash, payload in rows.items():
+            vector = np.frombuffer(payload, dtype=np.float32)
+            if vector.shape[0] == dim:
+                vectors[text_hash] = vector
+        return vectors
+
+    async def put_many(self, model: str, dim: int, vectors: Mapping[bytes, np.ndarray]) -> None:
+        """Store vectors (float32) and evict old rows every `evict_every` inserts."""
+        if not vectors:
+            return
+        entries = {h: np.asarray(v, dtype=np.float32).tobytes() for h, v in vectors.items()}
+        try:
+            async with self._session_factory() as session:  # type: ignore[call-arg]
+                await repo.insert_embedding_cache_entries(session, model=model, dim=dim, entries=entries)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Embedding cache write failed: %s", exc)
+            return
+        self._inserted_since_evict += len(entries)
+        if self._inserted_since_evict >= self._evict_every and not self._evicting:
+            self._inserted_since_evict = 0
+            await self._evict()
+
+    async def _evict(self) -> None:
+        self._evicting = True
+        try:
+            async with self._session_factory() as session:  # type: ignore[call-arg]
+                evicted = await repo.evict_embedding_cache(session, max_entries=self._max_entries)
+            if evicted:
+                logger.info("Evicted %d embedding cache rows (max_entries=%d)", evicted, self._max_entries)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Embedding cache eviction failed: %s", exc)
+        finally:
+            self._evicting = False
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the process-wide cache, or None when disabled."""
+    global _cache
+    settings = get_settings().rag
+    if not settings.embedding_cache_enabled:
+        return None
+    if _cache is None:
+        # Imported lazily: creating the engine needs the database settings.
+        from server.app.db.session import async_session
+
+        _cache = EmbeddingCache(
+            session_factory=async_session,
+            max_entries=settings.embedding_cache_max_entries,
+            evict_every=settings.embedding_cache_evict_every,
+        )
+    return _cache
+
+
+def with_embedding_cache(embed: EmbedFunc, model: str, dim: int, cache: EmbeddingCache | None = None) -> EmbedFunc:
+    """Wrap `embed(texts) -> (n, dim) array` so cached texts are not re-embedded."""
+    cache = cache or get_embedding_cache()
+    if cache is None:
+        return embed
+
+    async def _embed(texts: list[str]) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return await embed(texts)
+        hashes = [_text_hash(t) for t in texts]
+        text_by_hash = dict(zip(hashes, texts))
+        vectors = await cache.get_many(model, dim, list(text_by_hash))
+
+        missing = [h for h in text_by_hash if h not in vectors]
+        if missing:
+            embedded = np.asarray(await embed([text_by_hash[h] for h in missing]), dtype=np.float32)
+            fresh = dict(zip(missing, embedded))
+            vectors.update(fresh)
+            if embedded.ndim == 2 and embedded.shape[1] == dim:
+                # Keep the write going even if the caller is cancelled meanwhile.
+                await asyncio.shield(cache.put_many(model, dim, fresh))
+
+        logger.debug(
+            "Embedding cache: %d texts, %d unique, %d hits, %d misses",
+            len(texts),
+            len(text_by_hash),
+            len(text_by_hash) - len(missing),
+            len(missing),
+        )
+        return np.stack([vectors[h] for h in hashes])
+
+    return _embed
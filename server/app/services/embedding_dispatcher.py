@@ -0,0 +1,182 @@
+"""Adaptive batched embedding dispatcher.
+
+Sits between LightRAG's embedding function and the provider call
+(`openai_embed`). A list of texts is packed into requests bounded by a
+token budget (`RAG_EMBEDDING_BATCH_MAX_TOKENS`) and an item budget
+(`RAG_EMBEDDING_BATCH_MAX_ITEMS`); requests run with bounded concurrency
+(`RAG_EMBEDDING_MAX_CONCURRENCY`, shared by every workspace of the
+process) and vectors are returned in input order.
+
+Batch size adapts to the provider: a 429 or a timeout halves the budgets
+and the failed request is re-packed into smaller ones (retried with
+backoff); after a run of successes the budgets grow back step by step.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+import numpy as np
+
+from server.app.core.config import get_settings
+from server.app.core.logging import get_logger
+from server.app.utils.tokens import count_tokens
+
+EmbedFunc = Callable[[list[str]], Awaitable[Any]]
+
+logger = get_logger(__name__)
+
+# Successful requests in a row before the budgets grow again.
+_GROW_AFTER_SUCCESSES = 8
+# Budget growth step as a fraction of the configured maximum.
+_GROW_STEP_RATIO = 0.25
+_RETRY_BASE_SECONDS = 1.0
+_RETRY_MAX_SECONDS = 30.0
+
+_dispatchers: dict[str, "EmbeddingDispatcher"] = {}
+
+
+def _is_throttle_error(exc: BaseException) -> bool:
+    """429 / timeout from the provider (checked by name, openai is optional)."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return type(exc).__name__ in {"RateLimitError", "APITimeoutError"}
+
+
+class EmbeddingDispatcher:
+    """Pack, throttle and order embedding requests for one model."""
+
+    def __init__(
+        self,
+        embed: EmbedFunc,
+        max_batch_tokens: int,
+        max_batch_items: int,
+        max_concurrency: int,
+        request_timeout_seconds: float,
+        max_retries: int,
+        tokenizer_model: str,
+    ) -> None:
+        self._embed = embed
+        self._max_tokens = max(1, int(max_batch_tokens))
+        self._max_items = max(1, int(max_batch_items))
+        self._batch_tokens = self._max_tokens
+        self._batch_items = self._max_items
+        self._timeout = float(request_timeout_seconds) if request_timeout_seconds else None
+        self._max_retries = max(0, int(max_retries))
+        self._tokenizer_model = tokenizer_model
+        self._semaphore = asyncio.Semaphore(max(1, int(max_concurrency)))
+        self._success_streak = 0
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed `texts`; returns an (n, dim) array in input order."""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        tokens = [count_tokens(t, self._tokenizer_model) for t in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        batches = self._pack(list(range(len(texts))), tokens)
+        await asyncio.gather(*(self._run_batch(b, texts, tokens, results, 0) for b in batches))
+        return np.stack(results)  # type: ignore[arg-type]
+
+    def _pack(self, indices: List[int], tokens: List[int]) -> List[List[int]]:
+        """Greedy packing under the current token / item budgets (a text over budget goes alone)."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i in indices:
+            if current and (
+                len(current) >= self._batch_items or current_tokens + tokens[i] > self._batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens[i]
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _run_batch(
+        self,
+        indices: List[int],
+        texts: List[str],
+        tokens: List[int],
+        results: List[Optional[np.ndarray]],
+        attempt: int,
+    ) -> None:
+        async with self._semaphore:
+            try:
+                request = self._embed([texts[i] for i in indices])
+                vectors = await (asyncio.wait_for(request, self._timeout) if self._timeout else request)
+            except Exception as exc:  # noqa: BLE001
+                if not _is_throttle_error(exc) or attempt >= self._max_retries:
+                    raise
+                self._shrink(exc, len(indices), sum(tokens[i] for i in indices))
+                vectors = None
+            else:
+                self._grow()
+
+        if vectors is None:
+            delay = min(_RETRY_MAX_SECONDS, _RETRY_BASE_SECONDS * 2**attempt)
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            sub_batches = self._pack(indices, tokens)
+            if len(sub_batches) == 1 and len(indices) > 1:
+                half = len(indices) // 2
+                sub_batches = [indices[:half], indices[half:]]
+            await asyncio.gather(
+                *(self._run_batch(b, texts, tokens, results, attempt + 1) for b in sub_batches)
+            )
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[0] != len(indices):
+            raise RuntimeError(f"Embedding provider returned {vectors.shape[0]} vectors for {len(indices)} texts")
+        for i, vector in zip(indices, vectors):
+            results[i] = vector
+
+    def _shrink(self, exc: BaseException, failed_items: int, failed_tokens: int) -> None:
+        # Halve relative to the failed request, so concurrent failures of
+        # same-sized requests shrink the budget once, not once each.
+        self._success_streak = 0
+        self._batch_items = max(1, min(self._batch_items, failed_items // 2))
+        self._batch_tokens = max(1, min(self._batch_tokens, failed_tokens // 2))
+        logger.warning(
+            "Embedding request throttled (%s); batch budget now %d items / %d tokens",
+            type(exc).__name__,
+            self._batch_items,
+            self._batch_tokens,
+        )
+
+    def _grow(self) -> None:
+        self._success_streak += 1
+        if self._success_streak < _GROW_AFTER_SUCCESSES:
+            return
+        self._success_streak = 0
+        if self._batch_items < self._max_items or self._batch_tokens < self._max_tokens:
+            self._batch_items = min(
+                self._max_items, self._batch_items + max(1, int(self._max_items * _GROW_STEP_RATIO))
+            )
+            self._batch_tokens = min(
+                self._max_tokens, self._batch_tokens + max(1, int(self._max_tokens * _GROW_STEP_RATIO))
+            )
+
+
+def get_embedding_dispatcher(embed: EmbedFunc, model: str) -> EmbeddingDispatcher:
+    """Return the process-wide dispatcher for `model` (created with `embed` on first use)."""
+    dispatcher = _dispatchers.get(model)
+    if dispatcher is None:
+        settings = get_settings().rag
+        dispatcher = EmbeddingDispatcher(
+            embed,
+            max_batch_tokens=settings.embedding_batch_max_tokens,
+            max_batch_items=settings.embedding_batch_max_items,
+            max_concurrency=settings.embedding_max_concurrency,
+            request_timeout_seconds=settings.embedding_request_timeout_seconds,
+            max_retries=settings.embedding_max_retries,
+            tokenizer_model=settings.chunk_tokenizer_model,
+        )
+        _dispatchers[model] = dispatcher
+    return dispatcher
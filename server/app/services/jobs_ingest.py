@@ -7,6 +7,9 @@ document statuses.
 
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import Counter
 from typing import Callable
 
 import sqlalchemy as sa
@@ -15,10 +18,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from server.app.core.constants import DOCUMENT_STATUS_INGESTED, DOCUMENT_STATUS_PARSED
 from server.app.core.event_bus import event_bus
 from server.app.core.logging import get_logger
+from server.app.core.task_pool import TaskPool
 from server.app.db import models, repositories as repo
+from server.app.services.answer_cache import invalidate_workspace_answers
 from server.app.services.chunker import ChunkerService
 from server.app.services.rag_engine import RagEngineService
 
+# A document whose ingest failed is not re-dispatched by the concurrent
+# scheduler for this long (it stays 'parsed' and is retried afterwards).
+_FAILURE_COOLDOWN_SECONDS = 30.0
+
 
 class IngestJobService:
     """Service responsible for ingesting parsed documents into RAG."""
@@ -28,11 +37,21 @@ class IngestJobService:
         session_factory: Callable[[], AsyncSession],
         chunker: ChunkerService,
         rag_engine: RagEngineService,
+        max_concurrency: int = 1,
+        per_workspace_concurrency: int = 1,
     ) -> None:
         self._session_factory = session_factory
         self._chunker = chunker
         self._rag_engine = rag_engine
         self._logger = get_logger(__name__)
+        # Concurrent scheduler state (used by `dispatch_pending_documents`):
+        # at most `max_concurrency` documents in flight overall and at most
+        # `per_workspace_concurrency` per workspace (LightRAG graph writes of
+        # one workspace must not race).
+        self._pool = TaskPool("ingest", max_concurrency)
+        self._per_workspace_concurrency = max(1, int(per_workspace_concurrency or 1))
+        self._workspace_in_flight: Counter[str] = Counter()
+        self._failed_at: dict[str, float] = {}
 
     async def ingest_document(self, document_id: str) -> None:
         """Ingest a single parsed document into RAG."""
@@ -63,6 +82,9 @@ class IngestJobService:
                 raise RuntimeError(f"No file metadata found for document id={document_id}")
             file = file_row._mapping
 
+            # Chunk set of the previous ingest (re-parsed documents only).
+            previous_chunk_ids = await repo.list_chunk_ids_for_document(session, document_id=document_id)
+
         workspace_id = str(document["workspace_id"])
         original_filename = str(file["original_filename"])
         file_path = f"{workspace_id}/{document_id}/{original_filename}"
@@ -73,8 +95,8 @@ class IngestJobService:
                 document_id=document_id
             )
 
-            # Ingest into RAG engine using custom chunks (LightRAG handles
-            # internal chunk IDs; we no longer persist a separate mapping).
+            # Ingest into RAG engine using custom chunks (chunk IDs are the
+            # md5 of chunk_text, so they match `chunks_info[*]["chunk_id"]`).
             rag_doc_id = await self._rag_engine.ingest_content(
                 workspace_id=workspace_id,
                 document_id=document_id,
@@ -82,10 +104,17 @@ class IngestJobService:
                 file_path=file_path,
                 doc_id=str(document_id),
                 chunks_info=chunks_info,
+                previous_chunk_ids=previous_chunk_ids or None,
             )
 
-            # Persist rag_document mapping and mark document as ingested.
+            # Persist rag_document + chunk mappings and mark document as ingested.
             async with self._session_factory() as session:  # type: ignore[call-arg]
+                await repo.replace_chunk_mappings_for_document(
+                    session=session,
+                    workspace_id=workspace_id,
+                    document_id=document_id,
+                    chunks=chunks_info,
+                )
                 await repo.insert_rag_document(
                     session=session,
                     document_id=document_id,
@@ -95,6 +124,8 @@ class IngestJobService:
                     session=session,
                     document_id=document_id,
                 )
+            # The workspace's knowledge changed: cached answers are stale.
+            await invalidate_workspace_answers(workspace_id)
 
             self._logger.info(
                 "Document ingested into RAG",
@@ -103,7 +134,8 @@ class IngestJobService:
                     "workspace_id": workspace_id,
                     "rag_doc_id": rag_doc_id,
                     "file_path": file_path,
-                    "chunks": len(content_list),
+                    "pages": len(content_list),
+                    "chunks": len(chunks_info),
                 },
             )
             # Realtime notification: document is now ingested/ready.
@@ -124,6 +156,7 @@ class IngestJobService:
                 pass
         except Exception as exc:  # noqa: BLE001
             # Keep document in 'parsed' state so ingestion can be retried later.
+            self._failed_at[document_id] = time.monotonic()
             self._logger.error(
                 "Failed to ingest document into RAG",
                 extra={"document_id": document_id, "workspace_id": workspace_id, "error": str(exc)},
@@ -141,3 +174,80 @@ class IngestJobService:
             processed += 1
 
         return processed
+
+    @property
+    def in_flight_count(self) -> int:
+        """Number of documents dispatched by `dispatch_pending_documents` still being ingested."""
+        return self._pool.in_flight_count
+
+    @property
+    def free_slots(self) -> int:
+        """Number of additional documents the scheduler can start right now."""
+        return self._pool.free_slots
+
+    async def dispatch_pending_documents(self) -> int:
+        """Start ingesting pending documents in background, fairly across workspaces.
+
+        Candidates come round-robin across workspaces (see
+        `repo.list_parsed_documents_fair`); workspaces that already have
+        documents in flight are ranked behind the others, and a workspace
+        never exceeds `per_workspace_concurrency`. Returns the number of
+        newly dispatched documents.
+        """
+        free = self.free_slots
+        if free <= 0:
+            return 0
+
+        now = time.monotonic()
+        self._failed_at = {
+            doc_id: failed_at
+            for doc_id, failed_at in self._failed_at.items()
+            if now - failed_at < _FAILURE_COOLDOWN_SECONDS
+        }
+        async with self._session_factory() as session:  # type: ignore[call-arg]
+            assert isinstance(session, AsyncSession)
+            candidates = await repo.list_parsed_documents_fair(
+                session,
+                # Over-fetch: some candidates may belong to saturated workspaces.
+                batch_size=free * 4,
+                exclude_document_ids=[*self._pool.in_flight_keys(), *self._failed_at],
+            )
+
+        ranked = sorted(
+            candidates,
+            key=lambda doc: (
+                int(doc["workspace_rank"]) + self._workspace_in_flight[str(doc["workspace_id"])],
+                doc["created_at"],
+            ),
+        )
+        dispatched = 0
+        for doc in ranked:
+            if dispatched >= free:
+                break
+            document_id = str(doc["id"])
+            workspace_id = str(doc["workspace_id"])
+            if self._workspace_in_flight[workspace_id] >= self._per_workspace_concurrency:
+                continue
+            self._workspace_in_flight[workspace_id] += 1
+            self._pool.start(
+                document_id,
+                self.ingest_document(document_id=document_id),
+                on_done=lambda wid=workspace_id: self._release_workspace_slot(wid),
+            )
+            dispatched += 1
+
+        if dispatched:
+            self._logger.info(
+                "Dispatched documents to ingest pool",
+                extra={"dispatched": dispatched, "in_flight": self._pool.in_flight_count},
+            )
+        return dispatched
+
+    async def wait_for_progress(self, wakeup_event: asyncio.Event, timeout: float) -> None:
+        """Wait until an ingest finishes, a wake-up arrives, or the timeout expires."""
+        await self._pool.wait_for_progress(wakeup_event, timeout)
+
+    def _release_workspace_slot(self, workspace_id: str) -> None:
+        self._workspace_in_flight[workspace_id] -= 1
+        if self._workspace_in_flight[workspace_id] <= 0:
+            del self._workspace_in_flight[workspace_id]
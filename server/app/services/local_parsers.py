@@ -0,0 +1,206 @@
+"""Local (no-OCR) parsers for born-digital documents.
+
+Used by the parser pipeline for parser types that do not need Document AI:
+
+- `pdf_text`: PDFs with a text layer (via pypdf). If any page has no
+  extractable text (scanned page, image-only PDF) or the PDF cannot be read
+  locally, the parser returns None and the pipeline falls back to OCR for
+  the whole document.
+- `docx`: Word documents (WordprocessingML read with the stdlib), tables
+  rendered as " | " separated rows like the Document AI layout builder.
+- `html`: HTML pages (stdlib `html.parser`), scripts/styles dropped.
+
+All parsers are synchronous and CPU-bound; callers run them in a thread.
+They return `(full_text, page_ranges)` in the same shape as
+`ocr_text_builder.build_full_text_with_pages_from_ocr_result`.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+import zipfile
+from html.parser import HTMLParser
+from typing import IO, Iterator
+from xml.etree import ElementTree
+
+from server.app.core.constants import PARSER_TYPE_DOCX, PARSER_TYPE_HTML, PARSER_TYPE_PDF_TEXT
+from server.app.core.logging import get_logger
+from server.app.services.ocr_text_builder import PageRange, build_full_text_from_page_texts, single_page_range
+
+LOCAL_PARSER_TYPES = frozenset({PARSER_TYPE_PDF_TEXT, PARSER_TYPE_DOCX, PARSER_TYPE_HTML})
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_HTML_SKIP_TAGS = {"script", "style", "noscript", "template", "head"}
+_HTML_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+    "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul", "title",
+}
+_SPACES_RE = re.compile(r"[ \t\r\f\v]+")
+
+logger = get_logger(__name__)
+
+
+class InvalidDocumentError(ValueError):
+    """The file is corrupt / not what its parser type claims (not retryable)."""
+
+
+def parse_local_document(parser_type: str, file_obj: IO[bytes]) -> tuple[str, list[PageRange]] | None:
+    """Extract text with the local parser for `parser_type`.
+
+    Returns None when the document needs OCR instead (only for `pdf_text`).
+    """
+    file_obj.seek(0)
+    if parser_type == PARSER_TYPE_PDF_TEXT:
+        return _parse_pdf_text(file_obj)
+    if parser_type == PARSER_TYPE_DOCX:
+        text = _parse_docx(file_obj)
+    elif parser_type == PARSER_TYPE_HTML:
+        text = _parse_html(file_obj)
+    else:
+        raise ValueError(f"Unsupported local parser type: {parser_type}")
+    return text, single_page_range(text)
+
+
+def _parse_pdf_text(file_obj: IO[bytes]) -> tuple[str, list[PageRange]] | None:
+    """Extract the PDF text layer page by page; None if any page has no text."""
+    try:
+        from pypdf import PdfReader  # type: ignore[import]
+    except ImportError:
+        logger.warning("pypdf is not installed; falling back to OCR for PDF.")
+        return None
+
+    page_texts: list[str] = []
+    try:
+        reader = PdfReader(file_obj)
+        for page_idx, page in enumerate(reader.pages):
+            page_text = (page.extract_text() or "").strip()
+            if not page_text:
+                logger.info("PDF page has no text layer; falling back to OCR", extra={"page_idx": page_idx})
+                return None
+            page_texts.append(page_text)
+    except Exception as exc:  # noqa: BLE001
+        # Encrypted / malformed PDFs: let Document AI handle them.
+        logger.warning(f"Failed to extract PDF text layer; falling back to OCR: {exc}")
+        return None
+
+    if not page_texts:
+        return None
+    return build_full_text_from_page_texts(page_texts)
+
+
+def _parse_docx(file_obj: IO[bytes]) -> str:
+    """Extract paragraphs and tables (in body order) from a .docx file."""
+    try:
+        with zipfile.ZipFile(file_obj) as archive:
+            xml_bytes = archive.read("word/document.xml")
+        root = ElementTree.fromstring(xml_bytes)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise InvalidDocumentError(f"Invalid DOCX file: {exc}") from exc
+
+    body = root.find(f"{_WORD_NS}body")
+    if body is None:
+        return ""
+
+    lines: list[str] = []
+    for element in body:
+        if element.tag == f"{_WORD_NS}p":
+            lines.append(_docx_paragraph_text(element).strip())
+        elif element.tag == f"{_WORD_NS}tbl":
+            for row in element.iter(f"{_WORD_NS}tr"):
+                cells = [
+                    " ".join(
+                        _docx_paragraph_text(p).strip() for p in cell.iter(f"{_WORD_NS}p")
+                    ).strip()
+                    for cell in row.iter(f"{_WORD_NS}tc")
+                ]
+                if any(cells):
+                    lines.append(" | ".join(cells))
+            # Blank line after each table, like the OCR layout builder.
+            lines.append("")
+    return _collapse_blank_lines(lines)
+
+
+def _docx_paragraph_text(paragraph: ElementTree.Element) -> str:
+    parts: list[str] = []
+    for node in paragraph.iter():
+        if node.tag == f"{_WORD_NS}t":
+            parts.append(node.text or "")
+        elif node.tag == f"{_WORD_NS}tab":
+            parts.append("\t")
+        elif node.tag in (f"{_WORD_NS}br", f"{_WORD_NS}cr"):
+            parts.append("\n")
+    return "".join(parts)
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collect visible text, one line per block element / table row."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.lines: list[str] = []
+        self._current: list[str] = []
+        self._skip_depth = 0
+        self._cells_in_row = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _HTML_SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "br" or tag in _HTML_BLOCK_TAGS:
+            self._flush()
+            if tag == "tr":
+                self._cells_in_row = 0
+        elif tag in ("td", "th"):
+            if self._cells_in_row:
+                self._current.append(" | ")
+            self._cells_in_row += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _HTML_SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _HTML_BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+    def _flush(self) -> None:
+        line = _SPACES_RE.sub(" ", "".join(self._current).replace("\n", " ")).strip()
+        self._current = []
+        if line:
+            self.lines.append(line)
+
+
+def _parse_html(file_obj: IO[bytes]) -> str:
+    """Extract visible text from an HTML file (UTF-8, undecodable bytes ignored)."""
+    extractor = _HTMLTextExtractor()
+    for chunk in _read_text_chunks(file_obj):
+        extractor.feed(chunk)
+    extractor.close()
+    return "\n".join(extractor.lines).strip()
+
+
+def _read_text_chunks(file_obj: IO[bytes], chunk_size: int = 1024 * 1024) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def _collapse_blank_lines(lines: list[str]) -> str:
+    """Join lines, keeping at most one blank line in a row."""
+    out: list[str] = []
+    for line in lines:
+        if not line and (not out or not out[-1]):
+            continue
+        out.append(line)
+    return "\n".join(out).strip()
@@ -0,0 +1,147 @@
+"""CPU-bound OCR post-processing, offloaded to a process pool.
+
+Converting Document AI protobufs to dicts (`MessageToDict`), merging shards,
+rebuilding layout-aware full_text and serializing / compressing the raw
+JSON archive are pure CPU work. Running them on the parse worker's event
+loop (or in its thread pool, still under the GIL) stalls the Redis wake-up
+listener, lease heartbeats and every other in-flight job while one large
+document is rebuilt.
+
+`run_docai_postprocess` runs this stage in a `ProcessPoolExecutor` sized by
+`PARSE_WORKER_POSTPROCESS_PROCESSES`. Only the compact serialized protobufs
+go to the child and only full_text, its page ranges and the path of the raw
+archive come back, so no large dict (or archive) is pickled across
+processes. The archive is streamed to a temp file with
+`storage_r2.write_json` and uploaded from there by the parent. With size 0
+the stage runs in the thread pool instead (same behavior as before, no
+extra processes).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+from server.app.core.config import get_settings
+from server.app.core.logging import get_logger
+from server.app.services import storage_r2
+from server.app.services.docai_client import merge_ocr_payloads
+from server.app.services.ocr_text_builder import (
+    PageRange,
+    build_full_text_with_pages_from_ocr_result,
+    compact_docai_document,
+)
+
+_executor: ProcessPoolExecutor | None = None
+
+
+@dataclass
+class OcrPostprocessResult:
+    """Output of the post-processing stage for one document."""
+
+    full_text: str
+    # (page_idx, char_start, char_end) into full_text (see document_pages).
+    page_ranges: list[PageRange]
+    # Temp file holding the docai-raw archive (gzip-compressed JSON when
+    # `compressed`); the caller uploads it and calls `remove_raw_file`.
+    raw_path: str
+    raw_content_type: str
+    compressed: bool
+
+    def remove_raw_file(self) -> None:
+        try:
+            os.unlink(self.raw_path)
+        except FileNotFoundError:
+            pass
+
+
+def get_postprocess_executor() -> ProcessPoolExecutor | None:
+    """Return the shared post-processing pool (created lazily), or None when disabled."""
+    global _executor
+    if _executor is None:
+        processes = int(get_settings().parse_worker.postprocess_processes or 0)
+        if processes <= 0:
+            return None
+        # "spawn": never fork a process that already runs an event loop,
+        # Redis connections and boto3 threads.
+        _executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        get_logger(__name__).info("Started OCR post-processing pool", extra={"processes": processes})
+    return _executor
+
+
+def shutdown_postprocess_executor() -> None:
+    """Shut down the post-processing pool (on worker exit)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_docai_postprocess(
+    parser_type: str,
+    payloads: Sequence[bytes],
+    compact: bool,
+    compress: bool,
+) -> OcrPostprocessResult:
+    """Build full_text and the raw archive from Document AI shard payloads.
+
+    Runs in the process pool when one is configured, otherwise in the thread
+    pool. A broken pool (child killed, e.g. OOM) is discarded so the next
+    job gets a fresh one; the error propagates and the job is retried.
+    """
+    func = functools.partial(postprocess_docai_payloads, parser_type, list(payloads), compact, compress)
+    executor = get_postprocess_executor()
+    if executor is None:
+        return await run_in_threadpool(func)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func)
+    except BrokenProcessPool:
+        get_logger(__name__).error("OCR post-processing pool broke; it will be recreated")
+        _discard_executor(executor)
+        raise
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    global _executor
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def postprocess_docai_payloads(
+    parser_type: str,
+    payloads: Sequence[bytes],
+    compact: bool,
+    compress: bool,
+) -> OcrPostprocessResult:
+    """Synchronous post-processing; runs inside a pool process (must stay picklable)."""
+    doc = merge_ocr_payloads(payloads)
+    full_text, page_ranges = build_full_text_with_pages_from_ocr_result(parser_type=parser_type, doc=doc)
+    archive = compact_docai_document(doc) if compact else doc
+    del doc
+    suffix = ".json.gz" if compress else ".json"
+    with tempfile.NamedTemporaryFile(mode="w+b", suffix=suffix, prefix="docai-raw-", delete=False) as raw_file:
+        try:
+            content_type = storage_r2.write_json(archive, raw_file, compress)
+        except BaseException:
+            os.unlink(raw_file.name)
+            raise
+    return OcrPostprocessResult(
+        full_text=full_text,
+        page_ranges=page_ranges,
+        raw_path=raw_file.name,
+        raw_content_type=content_type,
+        compressed=compress,
+    )
@@ -17,6 +17,18 @@ from typing import Any, Mapping, Sequence
 
 from server.app.core.constants import PARSER_TYPE_GCP_DOCAI
 
+# (page_idx, char_start, char_end) into the built full_text; end exclusive.
+PageRange = tuple[int, int, int]
+
+# Part of the ocr_cache key: bump whenever a change here alters the built
+# full_text / page ranges, so cached OCR text from the old builder is not served.
+OCR_TEXT_BUILDER_VERSION = "1"
+
+try:  # Optional: vectorized layout reconstruction.
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy ships with LightRAG
+    np = None  # type: ignore[assignment]
+
 
 def build_full_text_from_ocr_result(parser_type: str, doc: Mapping[str, Any]) -> str:
     """Return a layout-aware full_text string for an OCR result.
@@ -28,19 +40,87 @@ def build_full_text_from_ocr_result(parser_type: str, doc: Mapping[str, Any]) ->
     - For other parser types (or if the structured layout is missing),
       fall back to `doc["text"]` as-is.
     """
+    full_text, _ = build_full_text_with_pages_from_ocr_result(parser_type, doc)
+    return full_text
+
+
+def build_full_text_with_pages_from_ocr_result(
+    parser_type: str, doc: Mapping[str, Any]
+) -> tuple[str, list[PageRange]]:
+    """Like `build_full_text_from_ocr_result`, plus each page's char range.
+
+    Returns `(full_text, page_ranges)` where `page_ranges` holds
+    `(page_idx, char_start, char_end)` offsets into `full_text` (0-based
+    page index, end exclusive; `full_text[char_start:char_end]` is the page
+    text). When the layout cannot be used the whole text is one page.
+    """
     parser_type = (parser_type or "").strip() or PARSER_TYPE_GCP_DOCAI
 
     if parser_type == PARSER_TYPE_GCP_DOCAI:
-        full_text = _build_docai_full_text_with_layout(doc)
-        if full_text:
-            return full_text
+        pages = _build_docai_layout_pages(doc)
+        if pages is not None:
+            full_text, page_ranges = _join_page_lines(pages)
+            if full_text:
+                return full_text, page_ranges
 
     # Fallback: best-effort raw text.
-    return (doc.get("text") or "").strip()
+    full_text = (doc.get("text") or "").strip()
+    return full_text, single_page_range(full_text)
+
 
+def single_page_range(full_text: str) -> list[PageRange]:
+    """Page index for text without page structure: one page covering everything."""
+    return [(0, 0, len(full_text))] if full_text else []
 
-def _build_docai_full_text_with_layout(doc: Mapping[str, Any]) -> str:
-    """Build full_text using Document AI layout information.
+
+def build_full_text_from_page_texts(page_texts: Sequence[str]) -> tuple[str, list[PageRange]]:
+    """Join already-extracted page texts (page order) like the layout builder does."""
+    return _join_page_lines([(page_idx, [text]) for page_idx, text in enumerate(page_texts)])
+
+
+def _join_page_lines(pages: Sequence[tuple[int, list[str]]]) -> tuple[str, list[PageRange]]:
+    """Join per-page lines into full_text and compute page char ranges.
+
+    Output text is exactly what the layout builders always produced:
+    lines joined with newlines, a blank line between pages, stripped.
+    """
+    lines: list[str] = []
+    spans: list[tuple[int, int, int]] = []
+    for page_idx, page_lines in pages:
+        if lines:
+            # Page break: keep a blank line between pages.
+            lines.append("")
+        spans.append((page_idx, len(lines), len(lines) + len(page_lines)))
+        lines.extend(page_lines)
+
+    # Char offset of every line start in the joined (unstripped) string.
+    line_starts: list[int] = []
+    offset = 0
+    for line in lines:
+        line_starts.append(offset)
+        offset += len(line) + 1
+    joined_len = max(0, offset - 1)
+
+    joined = "\n".join(lines)
+    full_text = joined.strip()
+    lead = len(joined) - len(joined.lstrip())
+    text_len = len(full_text)
+
+    page_ranges: list[PageRange] = []
+    for page_idx, first_line, end_line in spans:
+        start = line_starts[first_line] if first_line < len(lines) else joined_len
+        if end_line > first_line:
+            end = line_starts[end_line - 1] + len(lines[end_line - 1])
+        else:
+            end = start
+        start = min(max(0, start - lead), text_len)
+        end = min(max(start, end - lead), text_len)
+        page_ranges.append((page_idx, start, end))
+    return full_text, page_ranges
+
+
+def _build_docai_layout_pages(doc: Mapping[str, Any]) -> list[tuple[int, list[str]]] | None:
+    """Build per-page text lines using Document AI layout information.
 
     Strategy:
     - Iterate over pages.
@@ -56,15 +136,31 @@ def _build_docai_full_text_with_layout(doc: Mapping[str, Any]) -> str:
     - For paragraphs:
       - Extract text via text_anchor spans.
 
-    If anything looks wrong (no pages/anchors), we fall back to the
-    original doc["text"].
+    Returns `[(page_idx, lines), ...]` for pages with layout items, or
+    None when anything looks wrong (no pages, or a page without items while
+    doc["text"] is not empty); the caller then falls back to the original
+    doc["text"].
+
+    When NumPy is available the vectorized implementation
+    (`_build_docai_layout_pages_numpy`) is used; it produces the same output.
     """
+    if np is not None:
+        try:
+            return _build_docai_layout_pages_numpy(doc)
+        except (TypeError, ValueError):
+            # Unparseable coordinates: the pure-Python path skips bad vertices.
+            pass
+    return _build_docai_layout_pages_pure(doc)
+
+
+def _build_docai_layout_pages_pure(doc: Mapping[str, Any]) -> list[tuple[int, list[str]]] | None:
+    """Pure-Python implementation of `_build_docai_layout_pages`."""
     text = (doc.get("text") or "").strip()
     pages: Sequence[Mapping[str, Any]] = doc.get("pages") or []
     if not pages:
-        return text
+        return None
 
-    lines: list[str] = []
+    layout_pages: list[tuple[int, list[str]]] = []
 
     for page_idx, page in enumerate(pages):
         page_items: list[dict[str, Any]] = []
@@ -112,52 +208,179 @@ def _build_docai_full_text_with_layout(doc: Mapping[str, Any]) -> str:
         # If we somehow have no structured items, fall back to raw text.
         if not page_items:
             if text:
-                return text
+                return None
             continue
 
         # Sort by vertical position first, then horizontal, to approximate
         # reading order (supports simple multi-column layouts reasonably).
         page_items.sort(key=lambda it: (it["y"], it["x"]))
 
-        if page_idx > 0 and lines:
-            # Page break: keep a blank line between pages.
-            lines.append("")
+        # Page breaks are added by `_join_page_lines`.
+        page_lines: list[str] = []
+        layout_pages.append((page_idx, page_lines))
 
         for item in page_items:
             if item["kind"] == "paragraph":
                 anchor = (item["layout"] or {}).get("text_anchor") or {}
                 para_text = _extract_text_from_anchor(doc, anchor).strip()
                 if para_text:
-                    lines.append(para_text)
+                    page_lines.append(para_text)
             else:  # table
                 table = item["table"]
                 # Header rows, if any.
                 for row in table.get("header_rows") or []:
                     row_text = _render_table_row(doc, row)
                     if row_text:
-                        lines.append(row_text)
+                        page_lines.append(row_text)
                 # Body rows.
                 for row in table.get("body_rows") or []:
                     row_text = _render_table_row(doc, row)
                     if row_text:
-                        lines.append(row_text)
+                        page_lines.append(row_text)
 
                 # Blank line after each table to visually separate.
                 if table.get("header_rows") or table.get("body_rows"):
-                    lines.append("")
+                    page_lines.append("")
+
+    return layout_pages
+
+
+def _build_docai_layout_pages_numpy(doc: Mapping[str, Any]) -> list[tuple[int, list[str]]] | None:
+    """Vectorized `_build_docai_layout_pages` for large documents.
 
-    full_text = "\n".join(lines).strip()
-    return full_text or text
+    Per page, bounding polys are converted once into (n, 4) box arrays.
+    Paragraph-in-table containment uses an interval index (paragraph
+    centers sorted by y, one `searchsorted` per table) instead of testing
+    every paragraph against every table, and reading order comes from a
+    stable `lexsort` on the centers. `doc["text"]` is read once for all
+    anchors. Raises ValueError/TypeError on unparseable coordinates.
+    """
+    raw_text = doc.get("text") or ""
+    text = raw_text.strip()
+    pages: Sequence[Mapping[str, Any]] = doc.get("pages") or []
+    if not pages:
+        return None
+
+    layout_pages: list[tuple[int, list[str]]] = []
+
+    for page_idx, page in enumerate(pages):
+        tables: Sequence[Mapping[str, Any]] = page.get("tables") or []
+        paragraphs: Sequence[Mapping[str, Any]] = page.get("paragraphs") or []
+
+        table_boxes = _boxes_array(tables)
+        para_boxes = _boxes_array(paragraphs)
+        table_cy, table_cx = _centers(table_boxes)
+        para_cy, para_cx = _centers(para_boxes)
+
+        # Paragraphs whose center falls inside any table box are rendered
+        # as part of the table, not separately.
+        keep = np.ones(len(paragraphs), dtype=bool)
+        if len(tables) and len(paragraphs):
+            by_y = np.argsort(para_cy, kind="stable")
+            sorted_cy = para_cy[by_y]
+            for t_min_x, t_min_y, t_max_x, t_max_y in table_boxes:
+                lo = np.searchsorted(sorted_cy, t_min_y, side="left")
+                hi = np.searchsorted(sorted_cy, t_max_y, side="right")
+                if lo >= hi:
+                    continue
+                candidates = by_y[lo:hi]
+                cx = para_cx[candidates]
+                keep[candidates[(cx >= t_min_x) & (cx <= t_max_x)]] = False
+
+        kept = np.nonzero(keep)[0]
+        # Items keep the original order (tables first, then paragraphs) so the
+        # stable sort breaks ties exactly like the pure-Python version.
+        item_y = np.concatenate([table_cy, para_cy[kept]])
+        item_x = np.concatenate([table_cx, para_cx[kept]])
+        if not len(item_y):
+            if text:
+                return None
+            continue
+
+        n_tables = len(tables)
+        order = np.lexsort((item_x, item_y))
+
+        # Page breaks are added by `_join_page_lines`.
+        page_lines: list[str] = []
+        layout_pages.append((page_idx, page_lines))
+
+        for item_idx in order.tolist():
+            if item_idx >= n_tables:
+                para = paragraphs[int(kept[item_idx - n_tables])]
+                anchor = (para.get("layout") or {}).get("text_anchor") or {}
+                para_text = _extract_text_from_segments(raw_text, anchor).strip()
+                if para_text:
+                    page_lines.append(para_text)
+            else:
+                table = tables[item_idx]
+                for row in table.get("header_rows") or []:
+                    row_text = _render_table_row_text(raw_text, row)
+                    if row_text:
+                        page_lines.append(row_text)
+                for row in table.get("body_rows") or []:
+                    row_text = _render_table_row_text(raw_text, row)
+                    if row_text:
+                        page_lines.append(row_text)
+                if table.get("header_rows") or table.get("body_rows"):
+                    page_lines.append("")
+
+    return layout_pages
+
+
+def _boxes_array(items: Sequence[Mapping[str, Any]]) -> Any:
+    """Return an (n, 4) float array of (min_x, min_y, max_x, max_y) per item.
+
+    Same semantics as `_bounding_box_from_poly`: items without vertices get
+    the whole-page box (0, 0, 1, 1).
+    """
+    boxes = np.tile(np.array([0.0, 0.0, 1.0, 1.0]), (len(items), 1))
+    if not len(items):
+        return boxes
+
+    counts: list[int] = []
+    xs: list[Any] = []
+    ys: list[Any] = []
+    for item in items:
+        poly = (item.get("layout") or {}).get("bounding_poly") or {}
+        vertices = poly.get("normalized_vertices") or poly.get("vertices") or []
+        counts.append(len(vertices))
+        for v in vertices:
+            xs.append(v.get("x", 0))
+            ys.append(v.get("y", 0))
+
+    if not xs:
+        return boxes
+    # Values may be strings or numbers depending on JSON conversion.
+    x_arr = np.asarray(xs, dtype=np.float64)
+    y_arr = np.asarray(ys, dtype=np.float64)
+    counts_arr = np.asarray(counts)
+    has_vertices = counts_arr > 0
+    starts = np.concatenate([[0], np.cumsum(counts_arr)[:-1]])[has_vertices]
+    boxes[has_vertices, 0] = np.minimum.reduceat(x_arr, starts)
+    boxes[has_vertices, 1] = np.minimum.reduceat(y_arr, starts)
+    boxes[has_vertices, 2] = np.maximum.reduceat(x_arr, starts)
+    boxes[has_vertices, 3] = np.maximum.reduceat(y_arr, starts)
+    return boxes
+
+
+def _centers(boxes: Any) -> tuple[Any, Any]:
+    """Return (cy, cx) center arrays for an (n, 4) box array."""
+    return (boxes[:, 1] + boxes[:, 3]) / 2.0, (boxes[:, 0] + boxes[:, 2]) / 2.0
 
 
 def _render_table_row(doc: Mapping[str, Any], row: Mapping[str, Any]) -> str:
     """Render a single table row as a pipe-separated string."""
+    return _render_table_row_text(doc.get("text") or "", row)
+
+
+def _render_table_row_text(full_text: str, row: Mapping[str, Any]) -> str:
+    """Render a table row against an already-loaded Document.text."""
     cells = row.get("cells") or []
     cell_texts: list[str] = []
     for cell in cells:
         layout = cell.get("layout") or {}
         anchor = layout.get("text_anchor") or {}
-        text = _extract_text_from_anchor(doc, anchor).strip()
+        text = _extract_text_from_segments(full_text, anchor).strip()
         cell_texts.append(text)
 
     # If all cells are empty, skip the row.
@@ -169,10 +392,16 @@ def _render_table_row(doc: Mapping[str, Any], row: Mapping[str, Any]) -> str:
 
 def _extract_text_from_anchor(doc: Mapping[str, Any], anchor: Mapping[str, Any]) -> str:
     """Extract text from Document.text using a text_anchor dict."""
+    if not anchor:
+        return ""
+    return _extract_text_from_segments(doc.get("text") or "", anchor)
+
+
+def _extract_text_from_segments(full_text: str, anchor: Mapping[str, Any]) -> str:
+    """Extract anchor text from an already-loaded Document.text."""
     if not anchor:
         return ""
 
-    full_text = doc.get("text") or ""
     segments = anchor.get("text_segments") or []
     if not full_text or not segments:
         return ""
@@ -239,3 +468,54 @@ def _is_inside_any_table(
             return True
     return False
 
+
+def compact_docai_document(doc: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a trimmed copy of a Document AI dict for archival.
+
+    Keeps only what `build_full_text_from_ocr_result` reads: `text` and,
+    per page, the tables (layout + header/body row cells) and paragraphs
+    with their bounding polys and text anchors. Per-token / per-symbol
+    layout, image data and other annotations are dropped, which is most
+    of the raw payload size. Rebuilding full_text from the compact form
+    gives the same result as from the original.
+    """
+
+    def _layout(layout: Mapping[str, Any] | None, with_box: bool = True) -> dict[str, Any]:
+        layout = layout or {}
+        out: dict[str, Any] = {}
+        anchor = layout.get("text_anchor")
+        if anchor:
+            out["text_anchor"] = {"text_segments": anchor.get("text_segments") or []}
+        if with_box and layout.get("bounding_poly"):
+            poly = layout["bounding_poly"]
+            vertices_key = "normalized_vertices" if poly.get("normalized_vertices") else "vertices"
+            out["bounding_poly"] = {vertices_key: poly.get(vertices_key) or []}
+        return out
+
+    def _rows(rows: Sequence[Mapping[str, Any]] | None) -> list[dict[str, Any]]:
+        return [
+            {"cells": [{"layout": _layout(cell.get("layout"), with_box=False)} for cell in row.get("cells") or []]}
+            for row in rows or []
+        ]
+
+    pages: list[dict[str, Any]] = []
+    for page in doc.get("pages") or []:
+        compact_page: dict[str, Any] = {}
+        if "page_number" in page:
+            compact_page["page_number"] = page["page_number"]
+        tables = [
+            {
+                "layout": _layout(table.get("layout")),
+                "header_rows": _rows(table.get("header_rows")),
+                "body_rows": _rows(table.get("body_rows")),
+            }
+            for table in page.get("tables") or []
+        ]
+        if tables:
+            compact_page["tables"] = tables
+        paragraphs = [{"layout": _layout(para.get("layout"))} for para in page.get("paragraphs") or []]
+        if paragraphs:
+            compact_page["paragraphs"] = paragraphs
+        pages.append(compact_page)
+
+    return {"text": doc.get("text") or "", "pages": pages}
@@ -2,9 +2,11 @@
 
 Responsible for orchestrating parse_jobs:
   - Load job and associated document/file metadata.
+  - Extract born-digital files (text-layer PDF, DOCX, HTML) locally.
+  - Reuse cached OCR text for files with a known checksum (ocr_cache).
   - Download file bytes from R2.
   - Call Document AI OCR.
-  - Persist docai_full_text and JSON raw key.
+  - Persist docai_full_text, its page offset index and JSON raw key.
   - Update job and document statuses.
 
 Implementation is deferred to Phase 2; this file only establishes the interface.
@@ -12,10 +14,17 @@ Implementation is deferred to Phase 2; this file only establishes the interface.
 
 from __future__ import annotations
 
-from typing import Callable
+import asyncio
+import codecs
+import os
+import random
+import socket
+import uuid
+from typing import IO, Any, Callable, Mapping, Sequence
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from server.app.core.constants import (
     DOCUMENT_STATUS_ERROR,
@@ -28,11 +37,16 @@ from server.app.core.constants import (
     PARSER_TYPE_RAW_TEXT,
 )
 from server.app.core.logging import get_logger
-from server.app.core.event_bus import event_bus
+from server.app.core.task_pool import TaskPool
+from server.app.core.event_bus import event_bus, notify_document_parsed
 from server.app.db import models, repositories as repo
 from server.app.services import storage_r2
 from server.app.services.docai_client import DocumentAIClient, PermanentDocumentAIError
-from server.app.services.ocr_text_builder import build_full_text_from_ocr_result
+from server.app.services.local_parsers import LOCAL_PARSER_TYPES, InvalidDocumentError, parse_local_document
+from server.app.services.ocr_postprocess import OcrPostprocessResult, run_docai_postprocess
+from server.app.services.ocr_text_builder import OCR_TEXT_BUILDER_VERSION, PageRange, single_page_range
+
+_RAW_TEXT_CHUNK_SIZE = 1024 * 1024
 
 
 class ParserPipelineService:
@@ -42,15 +56,37 @@ class ParserPipelineService:
         self,
         session_factory: Callable[[], AsyncSession],
         docai_client: DocumentAIClient | None = None,
+        max_concurrency: int = 1,
+        lease_owner: str | None = None,
+        lease_seconds: int = 300,
+        max_retries: int = 3,
+        retry_base_seconds: float = 30.0,
+        retry_max_seconds: float = 900.0,
     ) -> None:
         self._session_factory = session_factory
         self._docai_client = docai_client or DocumentAIClient()
         self._logger = get_logger(__name__)
+        # In-process job pool (used by `dispatch_next_jobs`): bounds how many
+        # claimed jobs run at once and tracks the ones not finished yet.
+        self._pool = TaskPool("parse", max_concurrency)
+        # Lease identity used when claiming jobs; unique per worker process.
+        self._lease_owner = lease_owner or default_lease_owner()
+        self._lease_seconds = max(30, int(lease_seconds or 300))
+        # Retry policy for failed jobs (see `retry_backoff_seconds`).
+        self._max_retries = max(0, int(max_retries))
+        self._retry_base_seconds = float(retry_base_seconds)
+        self._retry_max_seconds = float(retry_max_seconds)
+
+    @property
+    def lease_owner(self) -> str:
+        return self._lease_owner
 
-    async def process_single_job(self, job_id: str) -> None:
+    async def process_single_job(self, job_id: str, claimed: bool = False) -> None:
         """Process a single parse_job.
 
         See `docs/design/phase-2-design.md` for the detailed steps.
+        When `claimed` is True the job was already moved to running by
+        `repo.claim_parse_jobs` and is not marked running again.
         """
         async with self._session_factory() as session:  # type: ignore[call-arg]
             assert isinstance(session, AsyncSession)
@@ -62,6 +98,8 @@ class ParserPipelineService:
             document_id = str(job["document_id"])
             retry_count = int(job.get("retry_count", 0) or 0)
             parser_type = (job.get("parser_type") or "").strip()
+            # Reparse jobs re-run OCR and refresh the cached entry.
+            bypass_ocr_cache = bool(job.get("bypass_ocr_cache"))
 
             # Load workspace + owner for realtime notifications.
             doc_stmt = (
@@ -79,9 +117,15 @@ class ParserPipelineService:
             workspace_id = str(doc_row[0])
             user_id = await repo.get_workspace_owner_id(session, workspace_id=workspace_id)
 
-        # Mark job running in a separate transaction.
-        async with self._session_factory() as session:  # type: ignore[call-arg]
-            await repo.mark_parse_job_running(session, job_id=job_id)
+        # Mark job running in a separate transaction (claimed jobs already are).
+        if not claimed:
+            async with self._session_factory() as session:  # type: ignore[call-arg]
+                await repo.mark_parse_job_running(
+                    session,
+                    job_id=job_id,
+                    lease_owner=self._lease_owner,
+                    lease_seconds=self._lease_seconds,
+                )
         if user_id:
             try:
                 await event_bus.publish(
@@ -114,44 +158,111 @@ class ParserPipelineService:
             r2_key = file_row["r2_key"]
             mime_type = file_row["mime_type"]
             original_filename = str(file_row.get("original_filename") or "")
-
-            # Download file bytes from R2.
-            file_bytes = await storage_r2.download_file(r2_key)
+            checksum = str(file_row.get("checksum") or "")
 
             # Decide branch based on parser_type.
             normalized_parser_type = (parser_type or "").strip() or PARSER_TYPE_GCP_DOCAI
             raw_key: str | None = None
 
+            local_result: tuple[str, list[PageRange]] | None = None
+            if normalized_parser_type in LOCAL_PARSER_TYPES:
+                # Born-digital files (text-layer PDF, DOCX, HTML): extract the
+                # text locally instead of calling Document AI.
+                with await storage_r2.download_file_stream(r2_key) as file_obj:
+                    local_result = await run_in_threadpool(
+                        parse_local_document, normalized_parser_type, file_obj
+                    )
+                if local_result is None:
+                    # E.g. a PDF page without text layer: OCR the whole document.
+                    self._logger.info(
+                        "Local parser needs OCR; falling back to Document AI",
+                        extra={"job_id": job_id, "document_id": document_id, "parser_type": normalized_parser_type},
+                    )
+                    normalized_parser_type = PARSER_TYPE_GCP_DOCAI
+                elif not local_result[0]:
+                    raise RuntimeError(f"Local parser {normalized_parser_type} returned empty text")
+
             if normalized_parser_type == PARSER_TYPE_RAW_TEXT:
                 # Raw-text branch: do not call Document AI, just decode the file.
-                full_text = _decode_raw_text(
-                    file_bytes=file_bytes,
-                    mime_type=mime_type,
-                    original_filename=original_filename,
-                )
+                with await storage_r2.download_file_stream(r2_key) as file_obj:
+                    full_text = _decode_raw_text(
+                        file_obj=file_obj,
+                        mime_type=mime_type,
+                        original_filename=original_filename,
+                    )
+                page_ranges = single_page_range(full_text)
+            elif local_result is not None:
+                full_text, page_ranges = local_result
             else:
-                # Call Document AI and build layout-aware full_text from OCR result.
-                doc = await self._docai_client.process_document_ocr(file_bytes=file_bytes, mime_type=mime_type)
-                full_text = build_full_text_from_ocr_result(parser_type=normalized_parser_type, doc=doc)
-                if not full_text:
-                    raise RuntimeError("Document AI returned empty text")
-
-                raw_key = f"docai-raw/{document_id}.json"
-                await storage_r2.upload_json(doc, key=raw_key)
+                # Same bytes already OCR'd (any workspace / earlier retry):
+                # reuse the cached full_text and raw archive, skip download + OCR.
+                cached = None
+                if not bypass_ocr_cache:
+                    cached = await self._get_cached_ocr_text(checksum, normalized_parser_type)
+                if cached:
+                    full_text, page_ranges, raw_key = cached
+                    self._logger.info(
+                        "OCR cache hit; skipping Document AI",
+                        extra={"job_id": job_id, "document_id": document_id, "checksum": checksum},
+                    )
+                else:
+                    # Call Document AI and build layout-aware full_text from OCR result.
+                    # The file is streamed into a spooled temp file, so only the
+                    # payload sent to Document AI is materialized in memory.
+                    with await storage_r2.download_file_stream(r2_key) as file_obj:
+                        payloads = await self._docai_client.process_document_ocr_payloads(
+                            source=file_obj, mime_type=mime_type
+                        )
+                    # Dict conversion, layout rebuild and raw JSON serialization
+                    # run in the post-processing pool, off the event loop.
+                    docai_settings = self._docai_client.settings
+                    ocr_result = await run_docai_postprocess(
+                        parser_type=normalized_parser_type,
+                        payloads=payloads,
+                        compact=docai_settings.raw_compact,
+                        compress=docai_settings.raw_compress,
+                    )
+                    del payloads
+                    try:
+                        full_text = ocr_result.full_text
+                        page_ranges = ocr_result.page_ranges
+                        if not full_text:
+                            raise RuntimeError("Document AI returned empty text")
+                        raw_key = await self._upload_docai_raw(document_id, ocr_result)
+                    finally:
+                        ocr_result.remove_raw_file()
+                    await self._store_cached_ocr_text(
+                        checksum,
+                        normalized_parser_type,
+                        full_text,
+                        page_ranges,
+                        raw_key,
+                        overwrite=bypass_ocr_cache,
+                    )
 
-            # Persist document fields and mark job success.
+            # Mark job success and persist document fields in one transaction,
+            # only while this worker still holds the lease.
             async with self._session_factory() as session:  # type: ignore[call-arg]
+                updated = await repo.mark_parse_job_success(
+                    session=session, job_id=job_id, lease_owner=self._lease_owner, commit=False
+                )
+                if not updated:
+                    await session.rollback()
+                    self._log_lease_lost(job_id, "success")
+                    return
                 await repo.update_document_parsed_success(
                     session=session,
                     document_id=document_id,
                     full_text=full_text,
                     raw_r2_key=raw_key or None,
+                    page_ranges=page_ranges,
                 )
-                await repo.mark_parse_job_success(session=session, job_id=job_id)
             self._logger.info(
                 "parse_job processed successfully",
                 extra={"job_id": job_id, "document_id": document_id, "parser_type": normalized_parser_type},
             )
+            # Wake up ingest_worker right away (it still polls as a safety net).
+            await notify_document_parsed(document_id=document_id, workspace_id=workspace_id)
 
             # Realtime notifications for success.
             if user_id:
@@ -180,15 +291,22 @@ class ParserPipelineService:
                     )
                 except Exception:  # noqa: BLE001
                     pass
-        except PermanentDocumentAIError as exc:
-            # Non-retryable error from Document AI (e.g. page limit exceeded).
+        except (PermanentDocumentAIError, InvalidDocumentError) as exc:
+            # Non-retryable error: Document AI rejected the file (e.g. page
+            # limit exceeded) or the file is corrupt (e.g. invalid DOCX).
             self._logger.error(
                 "parse_job processing failed permanently",
                 extra={"job_id": job_id, "document_id": document_id, "error": str(exc)},
             )
             async with self._session_factory() as session:  # type: ignore[call-arg]
-                await repo.mark_parse_job_failed(session=session, job_id=job_id, error_message=str(exc))
-                await repo.update_document_parse_error(session=session, document_id=document_id)
+                updated = await repo.mark_parse_job_failed(
+                    session=session, job_id=job_id, lease_owner=self._lease_owner, error_message=str(exc)
+                )
+                if updated:
+                    await repo.update_document_parse_error(session=session, document_id=document_id)
+            if not updated:
+                self._log_lease_lost(job_id, "failed")
+                return
 
             if user_id:
                 try:
@@ -227,23 +345,46 @@ class ParserPipelineService:
                 # Refresh job to get latest retry_count in case of concurrent updates.
                 latest = await repo.get_parse_job(session, job_id=job_id)
                 latest_retry = int(latest.get("retry_count", retry_count) or 0) if latest else retry_count
-                max_retries = 3
-                if latest_retry < max_retries:
-                    await repo.requeue_parse_job(
+                if latest_retry < self._max_retries:
+                    # Delay the retry so a transient upstream outage does not
+                    # turn into a hot loop that burns every retry in seconds.
+                    delay_seconds = retry_backoff_seconds(
+                        attempt=latest_retry + 1,
+                        base_seconds=self._retry_base_seconds,
+                        max_seconds=self._retry_max_seconds,
+                    )
+                    updated = await repo.requeue_parse_job(
                         session=session,
                         job_id=job_id,
+                        lease_owner=self._lease_owner,
                         retry_count=latest_retry + 1,
                         error_message=str(exc),
+                        delay_seconds=delay_seconds,
                     )
+                    if updated:
+                        self._logger.info(
+                            "parse_job requeued with backoff",
+                            extra={
+                                "job_id": job_id,
+                                "retry_count": latest_retry + 1,
+                                "delay_seconds": round(delay_seconds, 1),
+                            },
+                        )
                     new_status = PARSE_JOB_STATUS_QUEUED
                     new_retry = latest_retry + 1
                     final_failure = False
                 else:
-                    await repo.mark_parse_job_failed(session=session, job_id=job_id, error_message=str(exc))
-                    await repo.update_document_parse_error(session=session, document_id=document_id)
+                    updated = await repo.mark_parse_job_failed(
+                        session=session, job_id=job_id, lease_owner=self._lease_owner, error_message=str(exc)
+                    )
+                    if updated:
+                        await repo.update_document_parse_error(session=session, document_id=document_id)
                     new_status = PARSE_JOB_STATUS_FAILED
                     new_retry = latest_retry
                     final_failure = True
+            if not updated:
+                self._log_lease_lost(job_id, new_status)
+                return
 
             if user_id:
                 try:
@@ -275,30 +416,226 @@ class ParserPipelineService:
                     pass
 
     async def fetch_and_process_next_jobs(self, batch_size: int = 1) -> int:
-        """Fetch a batch of queued jobs and process them.
+        """Claim a batch of queued jobs and process them.
 
         Returns the number of jobs processed (success + failed).
         """
-        async with self._session_factory() as session:  # type: ignore[call-arg]
-            jobs = await repo.fetch_queued_parse_jobs(session, batch_size=batch_size)
+        jobs = await self._claim_jobs(batch_size)
 
         processed = 0
         for job in jobs:
-            await self.process_single_job(job_id=str(job["id"]))
+            await self._process_claimed_job(job_id=str(job["id"]))
             processed += 1
         return processed
 
+    @property
+    def in_flight_count(self) -> int:
+        """Number of jobs dispatched by `dispatch_next_jobs` that are not finished yet."""
+        return self._pool.in_flight_count
+
+    @property
+    def free_slots(self) -> int:
+        """Number of additional jobs the pool can accept right now."""
+        return self._pool.free_slots
+
+    async def dispatch_next_jobs(self) -> int:
+        """Fetch queued jobs up to the free pool capacity and start them in background.
+
+        Unlike `fetch_and_process_next_jobs`, this returns as soon as the jobs
+        are scheduled. Returns the number of newly dispatched jobs.
+        """
+        free = self.free_slots
+        if free <= 0:
+            return 0
+
+        jobs = await self._claim_jobs(free)
+
+        for job in jobs:
+            job_id = str(job["id"])
+            self._pool.start(job_id, self._process_claimed_job(job_id=job_id))
+
+        if jobs:
+            self._logger.info(
+                "Dispatched parse_jobs to worker pool",
+                extra={"dispatched": len(jobs), "in_flight": self._pool.in_flight_count},
+            )
+        return len(jobs)
+
+    async def wait_for_progress(self, wakeup_event: asyncio.Event, timeout: float) -> None:
+        """Wait until a pooled job finishes, a wake-up arrives, or the timeout expires."""
+        await self._pool.wait_for_progress(wakeup_event, timeout)
+
+    async def _upload_docai_raw(self, document_id: str, ocr_result: OcrPostprocessResult) -> str:
+        """Stream the serialized Document AI output from its temp file to R2 and return its key.
+
+        The archive honors DOCAI_RAW_COMPACT / DOCAI_RAW_COMPRESS (applied by
+        `ocr_postprocess`); `storage_r2.download_json` reads every variant
+        (plain `.json` or gzip `.json.gz`) transparently.
+        """
+        suffix = ".json.gz" if ocr_result.compressed else ".json"
+        raw_key = f"docai-raw/{document_id}{suffix}"
+        with open(ocr_result.raw_path, "rb") as raw_file:
+            await storage_r2.upload_fileobj(raw_file, key=raw_key, content_type=ocr_result.raw_content_type)
+        return raw_key
 
-def _decode_raw_text(file_bytes: bytes, mime_type: str, original_filename: str) -> str:
+    async def _get_cached_ocr_text(
+        self, checksum: str, parser_type: str
+    ) -> tuple[str, list[PageRange], str | None] | None:
+        """Return cached OCR (full_text, page_ranges, docai_raw_r2_key) for a file checksum (best-effort)."""
+        if not checksum or not self._docai_client.settings.ocr_cache_enabled:
+            return None
+        try:
+            async with self._session_factory() as session:  # type: ignore[call-arg]
+                entry = await repo.get_ocr_cache_entry(
+                    session,
+                    checksum=checksum,
+                    parser_type=parser_type,
+                    processor_version=self._docai_client.processor_version,
+                    builder_version=OCR_TEXT_BUILDER_VERSION,
+                )
+        except Exception as exc:  # noqa: BLE001
+            self._logger.warning("OCR cache lookup failed", extra={"checksum": checksum, "error": str(exc)})
+            return None
+        if not entry or not entry["full_text"]:
+            return None
+        full_text = str(entry["full_text"])
+        # Entries cached before page indexing have no ranges: one page.
+        cached_ranges = entry.get("page_ranges") or []
+        page_ranges = [(int(p), int(start), int(end)) for p, start, end in cached_ranges]
+        return full_text, page_ranges or single_page_range(full_text), entry.get("docai_raw_r2_key")
+
+    async def _store_cached_ocr_text(
+        self,
+        checksum: str,
+        parser_type: str,
+        full_text: str,
+        page_ranges: Sequence[PageRange],
+        raw_key: str | None,
+        overwrite: bool = False,
+    ) -> None:
+        """Store OCR full_text, its page ranges and raw archive key in the cache (best-effort).
+
+        With `overwrite` an existing entry is replaced (reparse jobs).
+        """
+        if not checksum or not self._docai_client.settings.ocr_cache_enabled:
+            return
+        try:
+            async with self._session_factory() as session:  # type: ignore[call-arg]
+                await repo.upsert_ocr_cache_text(
+                    session,
+                    checksum=checksum,
+                    parser_type=parser_type,
+                    processor_version=self._docai_client.processor_version,
+                    builder_version=OCR_TEXT_BUILDER_VERSION,
+                    full_text=full_text,
+                    page_ranges=page_ranges,
+                    docai_raw_r2_key=raw_key,
+                    overwrite=overwrite,
+                )
+        except Exception as exc:  # noqa: BLE001
+            self._logger.warning("OCR cache store failed", extra={"checksum": checksum, "error": str(exc)})
+
+    async def _claim_jobs(self, batch_size: int) -> Sequence[Mapping[str, Any]]:
+        async with self._session_factory() as session:  # type: ignore[call-arg]
+            return await repo.claim_parse_jobs(
+                session,
+                lease_owner=self._lease_owner,
+                batch_size=batch_size,
+                lease_seconds=self._lease_seconds,
+            )
+
+    async def _process_claimed_job(self, job_id: str) -> None:
+        """Process a claimed job while a heartbeat keeps its lease alive.
+
+        If the lease is lost (the reaper took the job back) the heartbeat
+        cancels the processing task, so two workers never keep working on
+        the same job.
+        """
+        work = asyncio.create_task(self.process_single_job(job_id=job_id, claimed=True))
+        heartbeat = asyncio.create_task(self._lease_heartbeat(job_id, work))
+        try:
+            await work
+        except asyncio.CancelledError:
+            # The heartbeat only returns after cancelling `work`; any other
+            # cancellation (worker shutdown) propagates.
+            if not heartbeat.done() or heartbeat.cancelled():
+                raise
+            self._logger.warning(
+                "parse_job processing cancelled after lease loss",
+                extra={"job_id": job_id, "lease_owner": self._lease_owner},
+            )
+        finally:
+            heartbeat.cancel()
+
+    def _log_lease_lost(self, job_id: str, status: str) -> None:
+        self._logger.warning(
+            "parse_job lease lost; skipping final status write",
+            extra={"job_id": job_id, "lease_owner": self._lease_owner, "status": status},
+        )
+
+    async def _lease_heartbeat(self, job_id: str, work: asyncio.Task[None]) -> None:
+        interval = max(1.0, self._lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._session_factory() as session:  # type: ignore[call-arg]
+                    renewed = await repo.renew_parse_job_lease(
+                        session,
+                        job_id=job_id,
+                        lease_owner=self._lease_owner,
+                        lease_seconds=self._lease_seconds,
+                    )
+            except Exception as exc:  # noqa: BLE001
+                self._logger.warning(
+                    "Failed to renew parse_job lease; will retry",
+                    extra={"job_id": job_id, "error": str(exc)},
+                )
+                continue
+            if not renewed:
+                self._logger.warning(
+                    "parse_job lease lost (reaped or finished elsewhere); cancelling processing",
+                    extra={"job_id": job_id, "lease_owner": self._lease_owner},
+                )
+                work.cancel()
+                return
+
+
+def retry_backoff_seconds(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Delay before retry number `attempt` (1-based): exponential backoff with jitter.
+
+    d = min(max_seconds, base_seconds * 2^(attempt - 1)), randomized into
+    [d/2, d] so jobs that failed together do not retry in lockstep.
+    Mirrors the SQL used by `repo.reap_expired_parse_jobs`.
+    """
+    delay = min(float(max_seconds), float(base_seconds) * (2 ** max(0, attempt - 1)))
+    return max(0.0, delay * (0.5 + random.random() * 0.5))
+
+
+def default_lease_owner() -> str:
+    """Return a lease owner id unique to this worker process (host:pid:random)."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _decode_raw_text(file_obj: IO[bytes], mime_type: str, original_filename: str) -> str:
     """Decode raw text files for parser_type=raw_text.
 
     For Phase 10, we keep this intentionally simple:
     - Assume UTF-8 with errors ignored.
     - Do not pretty-print or transform JSON/CSV; preserve the original
       byte sequence as text as much as possible.
+
+    The file is read in chunks through an incremental decoder so the raw
+    bytes are never held in memory as a whole next to the decoded text.
     """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    parts: list[str] = []
     try:
-        text = file_bytes.decode("utf-8", errors="ignore")
+        while True:
+            chunk = file_obj.read(_RAW_TEXT_CHUNK_SIZE)
+            if not chunk:
+                break
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
     except Exception:  # noqa: BLE001
-        text = ""
-    return text.strip()
+        parts = []
+    return "".join(parts).strip()
@@ -0,0 +1,194 @@
+"""Per-question LightRAG query-mode router.
+
+`mix` (the `RAG_QUERY_MODE` default) runs an LLM keyword extraction plus
+graph and vector retrieval for every question. Most chat traffic is plain
+lookups ("tổng tiền hóa đơn là bao nhiêu?") that `naive` (vector search
+over chunks, no keyword-extraction call) answers as well, one LLM
+round-trip cheaper. The router picks a mode per question with cheap
+lexical heuristics on the normalized question:
+
+- overview / summary cues ("tóm tắt", "overview", ...)     -> global
+- relation / comparison / causal cues ("so sánh", "why")    -> mix
+- lookup cues in a short question ("bao nhiêu", "khi nào",
+  "how much", "total", ...)                                 -> naive
+- entity-centric cues ("là ai", "tell me about", ...)       -> local
+- literals (numbers, codes, quoted text) in a short question -> naive
+- anything else                                             -> default mode
+
+The first matching rule wins.
+
+A workspace can pin a mode (`workspaces.query_mode`); NULL / "auto" lets
+the router decide. With `RAG_QUERY_ROUTER_ENABLED=false` every question
+uses the default mode, as before.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from server.app.utils.text import normalize_question
+
+QUERY_MODE_AUTO = "auto"
+# Modes a workspace may pin (LightRAG QueryParam.mode values).
+QUERY_MODES = ("naive", "local", "global", "hybrid", "mix")
+
+# Questions longer than this (in words) are not treated as simple lookups.
+_LOOKUP_MAX_WORDS = 20
+
+_GLOBAL_CUES = (
+    "tóm tắt",
+    "tổng quan",
+    "tổng hợp",
+    "nội dung chính",
+    "ý chính",
+    "chủ đề chính",
+    "các chủ đề",
+    "xu hướng",
+    "toàn bộ tài liệu",
+    "các tài liệu",
+    "summarize",
+    "summary",
+    "overview",
+    "main points",
+    "main themes",
+    "key takeaways",
+    "trends",
+)
+_RELATION_CUES = (
+    "so sánh",
+    "khác nhau",
+    "khác biệt",
+    "giống nhau",
+    "mối quan hệ",
+    "quan hệ giữa",
+    "liên quan",
+    "ảnh hưởng",
+    "tác động",
+    "tại sao",
+    "vì sao",
+    "nguyên nhân",
+    "compare",
+    "comparison",
+    "difference",
+    "differ",
+    "relationship",
+    "related to",
+    "impact",
+    "affect",
+    "why",
+)
+_ENTITY_CUES = (
+    "là ai",
+    "là gì",
+    "giới thiệu về",
+    "thông tin về",
+    "vai trò của",
+    "who is",
+    "who are",
+    "what is",
+    "what are",
+    "tell me about",
+    "role of",
+)
+_LOOKUP_CUES = (
+    "bao nhiêu",
+    "mấy",
+    "khi nào",
+    "ngày nào",
+    "ngày bao nhiêu",
+    "lúc nào",
+    "ở đâu",
+    "tổng cộng",
+    "tổng tiền",
+    "tổng số",
+    "số tiền",
+    "giá tiền",
+    "đơn giá",
+    "mã số",
+    "số điện thoại",
+    "địa chỉ",
+    "email",
+    "hạn chót",
+    "thời hạn",
+    "how much",
+    "how many",
+    "when",
+    "where",
+    "what date",
+    "which date",
+    "deadline",
+    "total",
+    "amount",
+    "price",
+    "cost",
+    "phone",
+    "address",
+    "number of",
+)
+
+# Numbers, codes (INV-2024-001, HD123) and quoted literals. Quotes must be
+# paired; ASCII apostrophes are never quotes ("what's", "company's").
+_LITERAL_RE = re.compile(r'\d|\b[a-z]{1,5}[-_/]?\d+\b|"[^"]+"|“[^”]+”|‘[^’]+’|«[^»]+»')
+
+
+@dataclass
+class QueryRoute:
+    mode: str
+    # Short machine-readable reason (logged to the message metadata).
+    reason: str
+
+
+def _has_cue(text: str, cues: tuple[str, ...]) -> Optional[str]:
+    for cue in cues:
+        if re.search(rf"(?<!\w){re.escape(cue)}(?!\w)", text):
+            return cue
+    return None
+
+
+def route_query_mode(
+    question: str,
+    default_mode: str,
+    workspace_mode: Optional[str] = None,
+    enabled: bool = True,
+) -> QueryRoute:
+    """Pick the LightRAG query mode for `question`.
+
+    >>> route_query_mode("Tổng tiền hóa đơn HD123 là bao nhiêu?", "mix")
+    QueryRoute(mode='naive', reason='lookup_cue:bao nhiêu')
+    >>> route_query_mode('Which clause mentions "force majeure"?', "mix")
+    QueryRoute(mode='naive', reason='literal')
+    >>> route_query_mode("What's our company's growth strategy?", "mix")
+    QueryRoute(mode='mix', reason='default')
+    >>> route_query_mode("Don't the contracts cover liability?", "mix")
+    QueryRoute(mode='mix', reason='default')
+    >>> route_query_mode("Tóm tắt các tài liệu", "mix", workspace_mode="naive")
+    QueryRoute(mode='naive', reason='workspace_override')
+    """
+    if workspace_mode and workspace_mode != QUERY_MODE_AUTO:
+        return QueryRoute(mode=workspace_mode, reason="workspace_override")
+    if not enabled:
+        return QueryRoute(mode=default_mode, reason="default")
+
+    text = normalize_question(question)
+    if not text:
+        return QueryRoute(mode=default_mode, reason="default")
+
+    cue = _has_cue(text, _GLOBAL_CUES)
+    if cue:
+        return QueryRoute(mode="global", reason=f"overview_cue:{cue}")
+    cue = _has_cue(text, _RELATION_CUES)
+    if cue:
+        return QueryRoute(mode="mix", reason=f"relation_cue:{cue}")
+
+    short = len(text.split()) <= _LOOKUP_MAX_WORDS
+    cue = _has_cue(text, _LOOKUP_CUES)
+    if cue and short:
+        return QueryRoute(mode="naive", reason=f"lookup_cue:{cue}")
+    cue = _has_cue(text, _ENTITY_CUES)
+    if cue:
+        return QueryRoute(mode="local", reason=f"entity_cue:{cue}")
+    if short and _LITERAL_RE.search(text):
+        return QueryRoute(mode="naive", reason="literal")
+    return QueryRoute(mode=default_mode, reason="default")
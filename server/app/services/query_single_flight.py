@@ -0,0 +1,254 @@
+"""Single-flight coalescing of identical concurrent RAG queries.
+
+When several users of a workspace ask the same question at the same time
+(e.g. right after a team announcement), only one LightRAG query runs and
+every caller gets its result. Calls are keyed by (workspace_id, mode,
+normalized question) — plus the system prompt when one is given.
+
+Two layers:
+
+- in-process: callers of the same key await one shared task (shielded, so
+  a cancelled caller does not cancel the query of the others);
+- Redis (`RAG_QUERY_SINGLE_FLIGHT_REDIS`): the process running the query
+  holds `singleflight:{key}:lock` (SET NX with a TTL, value = its token)
+  and publishes the JSON result under `singleflight:{key}:result:{token}`
+  for a few seconds; other replicas poll for that result instead of
+  querying. If the holder fails
+  (lock gone without a result) a waiter takes over; a waiter never waits
+  longer than the lock TTL before querying on its own.
+
+`stream()` does the same for streamed answers: in-process subscribers
+share one stream (late joiners get the deltas so far replayed), and the
+streaming replica publishes the joined answer like `run()` does.
+
+In-process callers share the outcome, errors included. Across replicas
+only results are published: when the holder fails, a waiting replica
+takes over the lock and queries itself. Redis errors fall back to the
+in-process layer.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from server.app.core.config import get_settings
+from server.app.core.logging import get_logger
+from server.app.core.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+_KEY_PREFIX = "singleflight"
+# How long a published result stays readable for polling waiters.
+_RESULT_TTL_SECONDS = 30
+
+# Delete the lock only if we still own it (it may have expired and been
+# taken over by another replica).
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+QueryFunc = Callable[[], Awaitable[Dict[str, Any]]]
+StreamFunc = Callable[[], AsyncIterator[str]]
+
+_single_flight: "QuerySingleFlight | None" = None
+
+
+class _RedisUnavailable(Exception):
+    pass
+
+
+class _StreamFlight:
+    """Deltas of one shared streaming query, replayed to every subscriber."""
+
+    def __init__(self) -> None:
+        self.deltas: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = asyncio.Condition()
+
+    async def push(self, delta: str) -> None:
+        async with self._changed:
+            self.deltas.append(delta)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None) -> None:
+        async with self._changed:
+            self.done, self.error = True, error
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: index < len(self.deltas) or self.done)
+                pending, done, error = self.deltas[index:], self.done, self.error
+            for delta in pending:
+                yield delta
+            index += len(pending)
+            if done and index >= len(self.deltas):
+                if error is not None:
+                    raise error
+                return
+
+
+def single_flight_key(workspace_id: str, mode: str, normalized_question: str, system_prompt: str | None = None) -> str:
+    """Coalescing key of a query (hashed: questions can be long)."""
+    parts = [workspace_id, mode, normalized_question, system_prompt or ""]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class QuerySingleFlight:
+    """In-process (and optionally Redis-backed) single-flight for RAG queries."""
+
+    def __init__(
+        self,
+        use_redis: bool,
+        lock_ttl_seconds: float,
+        poll_interval_seconds: float,
+        redis_factory: Callable[[], Any] = get_redis,
+    ) -> None:
+        self._use_redis = bool(use_redis)
+        self._lock_ttl_ms = max(1000, int(float(lock_ttl_seconds) * 1000))
+        self._poll_interval = max(0.01, float(poll_interval_seconds))
+        self._redis_factory = redis_factory
+        self._in_flight: dict[str, asyncio.Task[Dict[str, Any]]] = {}
+        self._streams: dict[str, _StreamFlight] = {}
+        self._release_script = None
+
+    async def run(self, key: str, query: QueryFunc) -> Dict[str, Any]:
+        """Return `query()`'s result, sharing one execution per key."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_leader(key, query))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            logger.info("Coalesced RAG query into in-flight call (key=%s)", key[:12])
+        # Shielded: a cancelled caller must not cancel the shared query.
+        return await asyncio.shield(task)
+
+    async def stream(self, key: str, open_stream: StreamFunc) -> AsyncIterator[str]:
+        """Yield `open_stream()`'s deltas, sharing one stream per key.
+
+        Subscribers joining late get the deltas produced so far first. The
+        stream runs in its own task, so it completes (and its result is
+        published to Redis) even if every subscriber goes away. When another
+        replica holds the key, the whole answer arrives as a single delta.
+        """
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = _StreamFlight()
+            self._streams[key] = flight
+            asyncio.create_task(self._drive_stream(key, flight, open_stream))
+        else:
+            logger.info("Coalesced streaming RAG query into in-flight stream (key=%s)", key[:12])
+        async for delta in flight.subscribe():
+            yield delta
+
+    async def _drive_stream(self, key: str, flight: _StreamFlight, open_stream: StreamFunc) -> None:
+        async def consume() -> Dict[str, Any]:
+            async for delta in open_stream():
+                await flight.push(delta)
+            return {"answer": "".join(flight.deltas)}
+
+        error: Optional[BaseException] = None
+        try:
+            result = await self._run_leader(key, consume)
+            if not flight.deltas and result.get("answer"):
+                # Answered by another replica's query.
+                await flight.push(str(result["answer"]))
+        except BaseException as exc:  # noqa: BLE001 - handed to subscribers
+            error = exc
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        finally:
+            if self._streams.get(key) is flight:
+                del self._streams[key]
+            await flight.finish(error)
+
+    def _forget(self, key: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Retrieve the exception so an unawaited failure is not reported.
+            task.exception()
+
+    async def _run_leader(self, key: str, query: QueryFunc) -> Dict[str, Any]:
+        if not self._use_redis:
+            return await query()
+        try:
+            return await self._run_distributed(key, query)
+        except _RedisUnavailable as exc:
+            logger.warning("Single-flight Redis unavailable; coalescing in-process only: %s", exc)
+            return await query()
+
+    async def _run_distributed(self, key: str, query: QueryFunc) -> Dict[str, Any]:
+        lock_key = f"{_KEY_PREFIX}:{key}:lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self._lock_ttl_ms / 1000
+        # Token of the lock holder we wait for; its result is published under
+        # that token, so a result of an earlier flight is never picked up.
+        holder: Optional[str] = None
+        while True:
+            try:
+                redis = self._redis_factory()
+                if holder is not None:
+                    raw = await redis.get(f"{_KEY_PREFIX}:{key}:result:{holder}")
+                    if raw is not None:
+                        logger.info("Coalesced RAG query into another replica's call (key=%s)", key[:12])
+                        return json.loads(raw)
+                if await redis.set(lock_key, token, nx=True, px=self._lock_ttl_ms):
+                    break
+                current = await redis.get(lock_key)
+            except Exception as exc:  # noqa: BLE001
+                raise _RedisUnavailable(str(exc)) from exc
+            if current is not None and current != holder:
+                logger.info("Waiting for RAG query running on another replica (key=%s)", key[:12])
+                holder = current
+            if time.monotonic() >= deadline:
+                # The holder is stuck; stop waiting and query ourselves.
+                return await query()
+            await asyncio.sleep(self._poll_interval)
+
+        try:
+            result = await query()
+            try:
+                await self._redis_factory().set(
+                    f"{_KEY_PREFIX}:{key}:result:{token}", json.dumps(result), ex=_RESULT_TTL_SECONDS
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to publish single-flight result: %s", exc)
+            return result
+        finally:
+            await asyncio.shield(self._release(lock_key, token))
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            if self._release_script is None:
+                self._release_script = self._redis_factory().register_script(_RELEASE_LOCK_LUA)
+            await self._release_script(keys=[lock_key], args=[token])
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to release single-flight lock %s: %s", lock_key, exc)
+
+
+def get_query_single_flight() -> Optional[QuerySingleFlight]:
+    """Return the process-wide single-flight, or None when disabled."""
+    global _single_flight
+    settings = get_settings().rag
+    if not settings.query_single_flight_enabled:
+        return None
+    if _single_flight is None:
+        _single_flight = QuerySingleFlight(
+            use_redis=settings.query_single_flight_redis,
+            lock_ttl_seconds=settings.query_single_flight_lock_seconds,
+            poll_interval_seconds=settings.query_single_flight_poll_seconds,
+        )
+    return _single_flight
@@ -7,10 +7,19 @@ not depend directly on LightRAG internals.
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
 
 from server.app.core.config import RagSettings, get_settings
 from server.app.core.logging import get_logger
+from server.app.db import repositories as repo
+from server.app.services.embedding_cache import with_embedding_cache
+from server.app.services.embedding_dispatcher import get_embedding_dispatcher
+from server.app.services.query_single_flight import get_query_single_flight, single_flight_key
+from server.app.services.rag_instance_cache import get_instance_cache
+from server.app.services.rag_pg_pool import ensure_shared_pg_client
+from server.app.utils.text import normalize_question
 
 
 logger = get_logger(__name__)
@@ -47,8 +56,6 @@ class RagEngineService:
 
     def __init__(self, settings: RagSettings | None = None) -> None:
         self.settings: RagSettings = settings or get_settings().rag
-        # LightRAG instances are initialized lazily per workspace.
-        self._instances: dict[str, Any] = {}
 
     def _ensure_postgres_env_from_supabase(self) -> None:
         """Derive POSTGRES_* env vars for LightRAG from SUPABASE_DB_URL if needed.
@@ -57,6 +64,9 @@ class RagEngineService:
         To avoid duplicating config, we parse SUPABASE_DB_URL once and populate
         POSTGRES_* only when they are not already set.
         """
+        # One pool per process shared by all workspaces (see rag_pg_pool).
+        os.environ.setdefault("POSTGRES_MAX_CONNECTIONS", str(self.settings.pg_pool_max_connections))
+
         # If POSTGRES_DATABASE is already set, assume the rest are configured.
         if os.getenv("POSTGRES_DATABASE"):
             return
@@ -95,7 +105,6 @@ class RagEngineService:
         os.environ.setdefault("POSTGRES_USER", username)
         os.environ.setdefault("POSTGRES_PASSWORD", password)
         os.environ.setdefault("POSTGRES_DATABASE", database)
-        os.environ.setdefault("POSTGRES_MAX_CONNECTIONS", "10")
         # Disable asyncpg statement cache when going through PgBouncer transaction pooler.
         os.environ.setdefault("POSTGRES_STATEMENT_CACHE_SIZE", "0")
 
@@ -112,21 +121,65 @@ class RagEngineService:
             database,
         )
 
-    def _get_lightrag_instance(self, workspace_id: str) -> Any:
-        """Return (and lazily create) a LightRAG instance for a workspace.
+    @asynccontextmanager
+    async def _lightrag(self, workspace_id: str) -> AsyncIterator[Any]:
+        """Use the workspace's LightRAG instance from the process-wide cache.
+
+        The instance is pinned (not evictable) inside the `async with` block
+        and its storages are initialized (once per instance). Its PG
+        storages share the process-wide pool (`rag_pg_pool`).
+        """
+        self._ensure_postgres_env_from_supabase()
+        await ensure_shared_pg_client()
+        async with get_instance_cache().use(workspace_id, self._create_lightrag_instance) as lightrag:
+            yield lightrag
+
+    def _embedding_callable(self) -> Callable[[list[str]], Awaitable[Any]]:
+        """Embedding function used by LightRAG (and `embed_texts`).
+
+        Texts already embedded with this model (any workspace) are served
+        from the Postgres embedding cache; misses go through the shared
+        dispatcher (token/item-bounded batches, bounded concurrency).
+        """
+        try:
+            from lightrag.llm.openai import openai_embed  # type: ignore[import]
+        except ImportError as exc:  # pragma: no cover - environment/config issue
+            raise RuntimeError(
+                "LightRAG (lightrag-hku) must be installed to use RagEngineService."
+            ) from exc
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        base_url = os.getenv("OPENAI_BASE_URL")
+        embedding_model_name = self.settings.embedding_model
+        embedding_dim = _infer_embedding_dim(embedding_model_name)
+
+        async def embed_texts(texts: list[str]) -> Any:
+            return await openai_embed(
+                texts,
+                model=embedding_model_name,
+                api_key=api_key,
+                base_url=base_url,
+            )
+
+        dispatcher = get_embedding_dispatcher(embed_texts, model=embedding_model_name)
+        return with_embedding_cache(dispatcher.embed, model=embedding_model_name, dim=embedding_dim)
+
+    async def embed_texts(self, texts: Sequence[str]) -> Any:
+        """Embed texts with the same model / cache / dispatcher as LightRAG."""
+        return await self._embedding_callable()(list(texts))
+
+    def _create_lightrag_instance(self, workspace_id: str) -> Any:
+        """Create a LightRAG instance for a workspace (cached by `rag_instance_cache`).
 
         Each workspace gets its own working directory so knowledge is
         naturally isolated at the storage layer.
         """
-        if workspace_id in self._instances:
-            return self._instances[workspace_id]
-
         # Ensure LightRAG PGVector storage can connect to the same Supabase DB.
         self._ensure_postgres_env_from_supabase()
 
         try:
             from lightrag import LightRAG  # type: ignore[import]
-            from lightrag.llm.openai import openai_complete_if_cache, openai_embed  # type: ignore[import]
+            from lightrag.llm.openai import openai_complete_if_cache  # type: ignore[import]
             from lightrag.utils import EmbeddingFunc  # type: ignore[import]
         except ImportError as exc:  # pragma: no cover - environment/config issue
             raise RuntimeError(
@@ -173,13 +226,8 @@ class RagEngineService:
 
         embedding_func = EmbeddingFunc(
             embedding_dim=embedding_dim,
-            max_token_size=8192,
-            func=lambda texts: openai_embed(
-                texts,
-                model=embedding_model_name,
-                api_key=api_key,
-                base_url=base_url,
-            ),
+            max_token_size=self.settings.embedding_max_token_size,
+            func=self._embedding_callable(),
         )
 
         # Configure LightRAG to use Supabase Postgres + PGVector as storage backend.
@@ -193,12 +241,13 @@ class RagEngineService:
             doc_status_storage="PGDocStatusStorage",
             embedding_func=embedding_func,
             llm_model_func=llm_model_func,
+            # Hand whole upsert batches to the dispatcher, which does the packing.
+            embedding_batch_num=self.settings.embedding_batch_max_items,
             vector_db_storage_cls_kwargs={
                 "cosine_better_than_threshold": 0.2,
             },
         )
 
-        self._instances[workspace_id] = lightrag
         logger.info(
             "Initialized LightRAG instance for workspace %s at %s using PGVector storage",
             workspace_id,
@@ -206,6 +255,40 @@ class RagEngineService:
         )
         return lightrag
 
+    async def warm_up_recent_workspaces(self, session_factory, limit: int) -> int:  # type: ignore[no-untyped-def]
+        """Build + initialize instances of the `limit` most recently active workspaces.
+
+        Activity is the latest message per workspace. Runs at API / ingest
+        worker startup so a tenant's first chat message does not pay the
+        cold start. Returns the number of workspaces warmed up.
+        """
+        if limit <= 0 or not os.getenv("OPENAI_API_KEY"):
+            return 0
+        # Never warm up more than the cache keeps.
+        limit = min(limit, self.settings.instance_cache_max_size)
+        try:
+            async with session_factory() as session:
+                workspace_ids = await repo.list_recently_active_workspace_ids(session, limit=limit)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to load recently active workspaces for warm-up: %s", exc)
+            return 0
+
+        warmed = 0
+        started = time.monotonic()
+        for workspace_id in workspace_ids:
+            try:
+                async with self._lightrag(workspace_id):
+                    warmed += 1
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Failed to warm up LightRAG for workspace %s: %s", workspace_id, exc)
+        logger.info(
+            "Warmed up %d/%d LightRAG workspaces in %.1fs",
+            warmed,
+            len(workspace_ids),
+            time.monotonic() - started,
+        )
+        return warmed
+
     async def ingest_content(
         self,
         workspace_id: str,
@@ -214,6 +297,7 @@ class RagEngineService:
         file_path: str,
         doc_id: Optional[str] = None,
         chunks_info: Optional[List[dict]] = None,
+        previous_chunk_ids: Optional[Sequence[str]] = None,
     ) -> str:
         """Ingest document content into LightRAG.
 
@@ -223,68 +307,261 @@ class RagEngineService:
           mapped back to document/segment ranges for citations.
         - If `chunks_info` is None, we fall back to the simpler Phase 9
           behavior: flatten content_list and let LightRAG chunk internally.
-        """
-        lightrag = self._get_lightrag_instance(workspace_id)
 
-        # Ensure storages are initialized before inserting.
-        await lightrag.initialize_storages()
+        Re-ingest (the document is already in LightRAG, e.g. after a reparse):
+        chunk IDs are content hashes, so with `previous_chunk_ids` (the chunk
+        set of the last ingest, from `rag_chunks_mapping`) chunks that
+        disappeared are deleted one by one (see `_delete_document_chunks`) and
+        only new/changed chunks are embedded and extracted; unchanged chunks
+        are skipped by `ainsert_custom_chunks`. Without `previous_chunk_ids`
+        the old document is deleted entirely and re-inserted.
+        """
+        async with self._lightrag(workspace_id) as lightrag:
+            # Use the document_id as LightRAG document identifier by default so that
+            # DB ↔ RAG mapping is straightforward.
+            rag_doc_id = doc_id or str(document_id)
+
+            # Concatenate all text blocks; ignore non-text fields.
+            texts: List[str] = []
+            for item in content_list:
+                text = str(item.get("text") or "").strip()
+                if text:
+                    texts.append(text)
+            full_text = "\n\n".join(texts).strip()
+
+            if not full_text:
+                raise RuntimeError(
+                    f"Attempted to ingest empty content for document_id={document_id}"
+                )
 
-        # Use the document_id as LightRAG document identifier by default so that
-        # DB ↔ RAG mapping is straightforward.
-        rag_doc_id = doc_id or str(document_id)
+            logger.info(
+                "Ingesting document into LightRAG workspace=%s document_id=%s rag_doc_id=%s (blocks=%d, chars=%d, custom_chunks=%s)",
+                workspace_id,
+                document_id,
+                rag_doc_id,
+                len(content_list),
+                len(full_text),
+                "yes" if chunks_info else "no",
+            )
 
-        # Concatenate all text blocks; ignore non-text fields.
-        texts: List[str] = []
-        for item in content_list:
-            text = str(item.get("text") or "").strip()
-            if text:
-                texts.append(text)
-        full_text = "\n\n".join(texts).strip()
+            if chunks_info:
+                # Use custom chunks so that chunk_ids are deterministic from chunk_text.
+                # Filter out empty texts to avoid LightRAG errors.
+                custom_chunks = [c for c in chunks_info if str(c.get("chunk_text") or "").strip()]
+                text_chunks: List[str] = [str(c.get("chunk_text") or "").strip() for c in custom_chunks]
+                if not text_chunks:
+                    raise RuntimeError(
+                        f"Attempted to ingest with empty custom chunks for document_id={document_id}"
+                    )
+                is_reingest = bool(await lightrag.full_docs.get_by_id(rag_doc_id))
+                if is_reingest:
+                    await self._prepare_reingest(
+                        lightrag,
+                        rag_doc_id=rag_doc_id,
+                        new_chunk_ids={str(c.get("chunk_id") or "") for c in custom_chunks},
+                        previous_chunk_ids=previous_chunk_ids,
+                    )
+                await lightrag.ainsert_custom_chunks(
+                    full_text=full_text,
+                    text_chunks=text_chunks,
+                    doc_id=rag_doc_id,
+                )
+                if is_reingest and not await lightrag.full_docs.get_by_id(rag_doc_id):
+                    # Every chunk was unchanged: ainsert_custom_chunks returned
+                    # before storing the document text.
+                    await lightrag.full_docs.upsert({rag_doc_id: {"content": full_text, "file_path": file_path}})
+            else:
+                # Phase 9 fallback: let LightRAG perform its own chunking.
+                await lightrag.ainsert(
+                    input=full_text,
+                    ids=rag_doc_id,
+                    file_paths=file_path,
+                )
 
-        if not full_text:
-            raise RuntimeError(
-                f"Attempted to ingest empty content for document_id={document_id}"
+            logger.info(
+                "Completed LightRAG ingest for workspace=%s document_id=%s rag_doc_id=%s",
+                workspace_id,
+                document_id,
+                rag_doc_id,
             )
+            return rag_doc_id
 
+    async def _prepare_reingest(
+        self,
+        lightrag: Any,
+        rag_doc_id: str,
+        new_chunk_ids: set[str],
+        previous_chunk_ids: Optional[Sequence[str]],
+    ) -> None:
+        """Make room for re-inserting an already ingested document.
+
+        `ainsert_custom_chunks` skips documents already present in full_docs,
+        so the document entry is dropped first; chunks that are still present
+        are then skipped and only new chunks are embedded and extracted.
+        Chunks owned by this document (`full_doc_id`) that disappeared are
+        deleted together with the graph data sourced from them. A stale chunk
+        with identical text in another document is shared in LightRAG and is
+        never removed.
+        """
+        if not previous_chunk_ids:
+            # Ingested before chunk mappings existed: the old chunk set is unknown.
+            logger.info("Re-ingest without previous chunk set; deleting rag_doc_id=%s first", rag_doc_id)
+            await lightrag.adelete_by_doc_id(rag_doc_id)
+            return
+
+        stale_ids = [cid for cid in dict.fromkeys(previous_chunk_ids) if cid not in new_chunk_ids]
+        removed: List[str] = []
+        if stale_ids:
+            rows = await lightrag.text_chunks.get_by_ids(stale_ids)
+            removed = [
+                cid for cid, row in zip(stale_ids, rows) if row and row.get("full_doc_id") == rag_doc_id
+            ]
+
+        await lightrag.full_docs.delete([rag_doc_id])
+        if removed:
+            await self._delete_document_chunks(lightrag, rag_doc_id=rag_doc_id, chunk_ids=removed)
         logger.info(
-            "Ingesting document into LightRAG workspace=%s document_id=%s rag_doc_id=%s (blocks=%d, chars=%d, custom_chunks=%s)",
-            workspace_id,
-            document_id,
+            "Incremental re-ingest rag_doc_id=%s: %d chunks kept, %d new or changed, %d removed",
             rag_doc_id,
-            len(content_list),
-            len(full_text),
-            "yes" if chunks_info else "no",
+            len(set(previous_chunk_ids) & new_chunk_ids),
+            len(new_chunk_ids - set(previous_chunk_ids)),
+            len(removed),
         )
 
-        if chunks_info:
-            # Use custom chunks so that chunk_ids are deterministic from chunk_text.
-            text_chunks: List[str] = [str(c.get("chunk_text") or "").strip() for c in chunks_info]
-            # Filter out empty texts to avoid LightRAG errors.
-            text_chunks = [c for c in text_chunks if c]
-            if not text_chunks:
-                raise RuntimeError(
-                    f"Attempted to ingest with empty custom chunks for document_id={document_id}"
-                )
-            await lightrag.ainsert_custom_chunks(
-                full_text=full_text,
-                text_chunks=text_chunks,
-                doc_id=rag_doc_id,
+    async def _delete_document_chunks(self, lightrag: Any, rag_doc_id: str, chunk_ids: List[str]) -> None:
+        """Delete chunks of a document and the graph data that only they support.
+
+        The chunk ids are stripped from the `source_id` of the document's
+        entities and relations; entries left without sources are removed from
+        the graph together with their entities_vdb / relationships_vdb vectors.
+        Descriptions of entries that keep other sources are not re-summarised.
+        """
+        from lightrag.constants import GRAPH_FIELD_SEP  # type: ignore[import]
+        from lightrag.utils import compute_mdhash_id, make_relation_chunk_key  # type: ignore[import]
+
+        graph = lightrag.chunk_entity_relation_graph
+        removed = set(chunk_ids)
+        entity_chunks = getattr(lightrag, "entity_chunks", None)
+        relation_chunks = getattr(lightrag, "relation_chunks", None)
+
+        async def _remaining_sources(tracking: Any, key: str, source_id: Any) -> Optional[List[str]]:
+            # None when the entry does not reference any removed chunk.
+            sources: List[str] = []
+            if tracking is not None:
+                stored = await tracking.get_by_id(key)
+                if stored and isinstance(stored, dict):
+                    sources = [cid for cid in stored.get("chunk_ids", []) if cid]
+            if not sources:
+                sources = [cid for cid in str(source_id or "").split(GRAPH_FIELD_SEP) if cid]
+            if not removed.intersection(sources):
+                return None
+            return [cid for cid in sources if cid not in removed]
+
+        # Entities and relations of the document: full_entities / full_relations
+        # when LightRAG tracked them, otherwise every graph entry.
+        doc_entities = await lightrag.full_entities.get_by_id(rag_doc_id)
+        if doc_entities and doc_entities.get("entity_names"):
+            nodes_by_name = await graph.get_nodes_batch(list(doc_entities["entity_names"]))
+            nodes = list(nodes_by_name.items())
+        else:
+            nodes = [(str(n.get("entity_id") or n.get("id") or ""), n) for n in await graph.get_all_nodes()]
+        doc_relations = await lightrag.full_relations.get_by_id(rag_doc_id)
+        if doc_relations and doc_relations.get("relation_pairs"):
+            edges_by_pair = await graph.get_edges_batch(
+                [{"src": src, "tgt": tgt} for src, tgt in doc_relations["relation_pairs"]]
             )
+            edges = list(edges_by_pair.items())
         else:
-            # Phase 9 fallback: let LightRAG perform its own chunking.
-            await lightrag.ainsert(
-                input=full_text,
-                ids=rag_doc_id,
-                file_paths=file_path,
+            edges = [
+                ((str(e.get("source") or ""), str(e.get("target") or "")), e)
+                for e in await graph.get_all_edges()
+            ]
+
+        entities_to_delete: set[str] = set()
+        for name, node in nodes:
+            if not name or not node:
+                continue
+            remaining = await _remaining_sources(entity_chunks, name, node.get("source_id"))
+            if remaining is None:
+                continue
+            if not remaining:
+                entities_to_delete.add(name)
+                continue
+            data = {k: v for k, v in node.items() if k != "id"}
+            data["source_id"] = GRAPH_FIELD_SEP.join(remaining)
+            await graph.upsert_node(name, data)
+            if entity_chunks is not None:
+                await entity_chunks.upsert({name: {"chunk_ids": remaining, "count": len(remaining)}})
+
+        relations_to_delete: set[tuple[str, str]] = set()
+        seen_edges: set[tuple[str, str]] = set()
+        for (src, tgt), edge in edges:
+            pair = tuple(sorted((src, tgt)))
+            if not src or not tgt or not edge or pair in seen_edges:
+                continue
+            seen_edges.add(pair)
+            key = make_relation_chunk_key(src, tgt)
+            remaining = await _remaining_sources(relation_chunks, key, edge.get("source_id"))
+            if remaining is None:
+                continue
+            if not remaining:
+                relations_to_delete.add(pair)
+                continue
+            data = {k: v for k, v in edge.items() if k not in ("source", "target")}
+            data["source_id"] = GRAPH_FIELD_SEP.join(remaining)
+            await graph.upsert_edge(src, tgt, data)
+            if relation_chunks is not None:
+                await relation_chunks.upsert({key: {"chunk_ids": remaining, "count": len(remaining)}})
+
+        await lightrag.chunks_vdb.delete(chunk_ids)
+        await lightrag.text_chunks.delete(chunk_ids)
+
+        if entities_to_delete:
+            # Edges of deleted entities go with them, even if other chunks support them.
+            edges_of_entities = await graph.get_nodes_edges_batch(list(entities_to_delete))
+            for entity_edges in edges_of_entities.values():
+                for src, tgt in entity_edges or []:
+                    relations_to_delete.add(tuple(sorted((src, tgt))))
+        if relations_to_delete:
+            await lightrag.relationships_vdb.delete(
+                [
+                    rel_id
+                    for src, tgt in relations_to_delete
+                    for rel_id in (
+                        compute_mdhash_id(src + tgt, prefix="rel-"),
+                        compute_mdhash_id(tgt + src, prefix="rel-"),
+                    )
+                ]
+            )
+            await graph.remove_edges(list(relations_to_delete))
+            if relation_chunks is not None:
+                await relation_chunks.delete([make_relation_chunk_key(src, tgt) for src, tgt in relations_to_delete])
+        if entities_to_delete:
+            await graph.remove_nodes(list(entities_to_delete))
+            await lightrag.entities_vdb.delete(
+                [compute_mdhash_id(name, prefix="ent-") for name in entities_to_delete]
             )
+            if entity_chunks is not None:
+                await entity_chunks.delete(list(entities_to_delete))
+
+        if doc_entities and entities_to_delete:
+            names = [n for n in doc_entities.get("entity_names", []) if n not in entities_to_delete]
+            await lightrag.full_entities.upsert({rag_doc_id: {"entity_names": names, "count": len(names)}})
+        if doc_relations and relations_to_delete:
+            pairs = [
+                list(pair)
+                for pair in doc_relations.get("relation_pairs", [])
+                if tuple(sorted(pair)) not in relations_to_delete
+            ]
+            await lightrag.full_relations.upsert({rag_doc_id: {"relation_pairs": pairs, "count": len(pairs)}})
 
         logger.info(
-            "Completed LightRAG ingest for workspace=%s document_id=%s rag_doc_id=%s",
-            workspace_id,
-            document_id,
+            "Deleted %d chunks of rag_doc_id=%s (%d entities, %d relations removed)",
+            len(chunk_ids),
             rag_doc_id,
+            len(entities_to_delete),
+            len(relations_to_delete),
         )
-        return rag_doc_id
 
     async def query_answer(
         self,
@@ -297,9 +574,10 @@ class RagEngineService:
 
         Phase 9 deliberately ignores structured citations and uses LightRAG's
         built-in LLM pipeline as the single source of truth. If the LLM
-        configuration is missing, a graceful fallback answer is returned.
+        configuration is missing, a graceful fallback answer is returned
+        (flagged with `fallback: True` so it is not cached).
         """
-        if not os.getenv("OPENAI_API_KEY"):
+        if not self.is_llm_configured():
             logger.error(
                 "OPENAI_API_KEY is not set; skipping RAG query for workspace=%s",
                 workspace_id,
@@ -309,50 +587,142 @@ class RagEngineService:
                     "Xin lỗi, engine RAG chưa được cấu hình LLM (OPENAI_API_KEY) nên hiện tại mình "
                     "chưa thể trả lời dựa trên tài liệu. Bạn hãy cấu hình khóa API trước rồi thử lại nhé."
                 ),
+                "fallback": True,
             }
 
-        lightrag = self._get_lightrag_instance(workspace_id)
+        query_mode = mode or self.settings.query_mode
 
-        # Ensure storages are initialized before querying.
-        await lightrag.initialize_storages()
+        async def run_query() -> Dict[str, Any]:
+            return await self._query_llm(workspace_id, question, system_prompt, query_mode)
 
-        try:
-            from lightrag import QueryParam  # type: ignore[import]
-        except ImportError as exc:  # pragma: no cover - environment/config issue
-            raise RuntimeError(
-                "LightRAG must be installed to use RagEngineService.query_answer."
-            ) from exc
+        single_flight = get_query_single_flight()
+        if single_flight is None:
+            return await run_query()
+        # Identical questions asked concurrently in the workspace share one
+        # LightRAG query (across replicas when the Redis layer is enabled).
+        key = single_flight_key(workspace_id, query_mode, normalize_question(question), system_prompt)
+        return await single_flight.run(key, run_query)
 
-        query_mode = mode or self.settings.query_mode
-        param = QueryParam(mode=query_mode)
-        # Instruct LightRAG's prompt builder to generate answers that are
-        # more detailed, with extra insights and follow-up questions.
-        param.user_prompt = DEEP_RAG_USER_PROMPT
+    async def _query_llm(
+        self,
+        workspace_id: str,
+        question: str,
+        system_prompt: Optional[str],
+        query_mode: str,
+    ) -> Dict[str, Any]:
+        async with self._lightrag(workspace_id) as lightrag:
+            try:
+                from lightrag import QueryParam  # type: ignore[import]
+            except ImportError as exc:  # pragma: no cover - environment/config issue
+                raise RuntimeError(
+                    "LightRAG must be installed to use RagEngineService.query_answer."
+                ) from exc
 
-        logger.info(
-            "Querying LightRAG for workspace=%s mode=%s question_preview=%s",
-            workspace_id,
-            query_mode,
-            question[:80],
-        )
+            param = QueryParam(mode=query_mode)
+            # Instruct LightRAG's prompt builder to generate answers that are
+            # more detailed, with extra insights and follow-up questions.
+            param.user_prompt = DEEP_RAG_USER_PROMPT
 
-        raw = await lightrag.aquery_llm(
-            question.strip(),
-            param=param,
-            system_prompt=system_prompt,
-        )
+            logger.info(
+                "Querying LightRAG for workspace=%s mode=%s question_preview=%s",
+                workspace_id,
+                query_mode,
+                question[:80],
+            )
+
+            raw = await lightrag.aquery_llm(
+                question.strip(),
+                param=param,
+                system_prompt=system_prompt,
+            )
 
         llm_resp = raw.get("llm_response", {}) if isinstance(raw, dict) else {}
         answer = str(llm_resp.get("content") or "").strip()
 
         if not answer:
             # If LightRAG returns no content, fall back to a safe message.
-            answer = (
-                "Xin lỗi, mình không thể tạo được câu trả lời cho câu hỏi này dựa trên tài liệu hiện có."
-            )
+            return {
+                "answer": (
+                    "Xin lỗi, mình không thể tạo được câu trả lời cho câu hỏi này dựa trên tài liệu hiện có."
+                ),
+                "fallback": True,
+            }
 
         return {"answer": answer}
 
+    def is_llm_configured(self) -> bool:
+        """Whether the LightRAG LLM can be called (OPENAI_API_KEY is set)."""
+        return bool(os.getenv("OPENAI_API_KEY"))
+
+    async def stream_answer(
+        self,
+        workspace_id: str,
+        question: str,
+        system_prompt: Optional[str] = None,
+        mode: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the answer of a LightRAG query as text deltas.
+
+        Same query as `query_answer` with `QueryParam(stream=True)`, and
+        coalesced the same way (concurrent identical questions share one
+        stream). When LightRAG answers from its LLM cache, or another
+        replica ran the query, the whole answer comes as a single delta.
+        Callers check `is_llm_configured` first.
+        """
+        query_mode = mode or self.settings.query_mode
+
+        def open_stream() -> AsyncIterator[str]:
+            return self._stream_llm(workspace_id, question, system_prompt, query_mode)
+
+        single_flight = get_query_single_flight()
+        if single_flight is None:
+            stream = open_stream()
+        else:
+            key = single_flight_key(workspace_id, query_mode, normalize_question(question), system_prompt)
+            stream = single_flight.stream(key, open_stream)
+        async for delta in stream:
+            yield delta
+
+    async def _stream_llm(
+        self,
+        workspace_id: str,
+        question: str,
+        system_prompt: Optional[str],
+        query_mode: str,
+    ) -> AsyncIterator[str]:
+        # The workspace's instance stays pinned until the stream is exhausted or closed.
+        async with self._lightrag(workspace_id) as lightrag:
+            try:
+                from lightrag import QueryParam  # type: ignore[import]
+            except ImportError as exc:  # pragma: no cover - environment/config issue
+                raise RuntimeError(
+                    "LightRAG must be installed to use RagEngineService.stream_answer."
+                ) from exc
+
+            param = QueryParam(mode=query_mode, stream=True)
+            param.user_prompt = DEEP_RAG_USER_PROMPT
+
+            logger.info(
+                "Streaming LightRAG answer for workspace=%s mode=%s question_preview=%s",
+                workspace_id,
+                query_mode,
+                question[:80],
+            )
+
+            raw = await lightrag.aquery_llm(
+                question.strip(),
+                param=param,
+                system_prompt=system_prompt,
+            )
+            llm_resp = raw.get("llm_response", {}) if isinstance(raw, dict) else {}
+            iterator = llm_resp.get("response_iterator")
+            if llm_resp.get("is_streaming") and iterator is not None:
+                async for delta in iterator:
+                    if delta:
+                        yield str(delta)
+            elif llm_resp.get("content"):
+                yield str(llm_resp["content"])
+
     async def retrieve_context(
         self,
         workspace_id: str,
@@ -372,30 +742,28 @@ class RagEngineService:
             )
             return {"chunks": [], "references": [], "metadata": {}}
 
-        lightrag = self._get_lightrag_instance(workspace_id)
-        await lightrag.initialize_storages()
+        async with self._lightrag(workspace_id) as lightrag:
+            try:
+                from lightrag import QueryParam  # type: ignore[import]
+            except ImportError as exc:  # pragma: no cover - environment/config issue
+                raise RuntimeError(
+                    "LightRAG must be installed to use RagEngineService.retrieve_context."
+                ) from exc
 
-        try:
-            from lightrag import QueryParam  # type: ignore[import]
-        except ImportError as exc:  # pragma: no cover - environment/config issue
-            raise RuntimeError(
-                "LightRAG must be installed to use RagEngineService.retrieve_context."
-            ) from exc
+            query_mode = mode or self.settings.query_mode
+            param = QueryParam(mode=query_mode)
 
-        query_mode = mode or self.settings.query_mode
-        param = QueryParam(mode=query_mode)
-
-        logger.info(
-            "Retrieving LightRAG context for workspace=%s mode=%s question_preview=%s",
-            workspace_id,
-            query_mode,
-            question[:80],
-        )
+            logger.info(
+                "Retrieving LightRAG context for workspace=%s mode=%s question_preview=%s",
+                workspace_id,
+                query_mode,
+                question[:80],
+            )
 
-        raw = await lightrag.aquery_data(
-            question.strip(),
-            param=param,
-        )
+            raw = await lightrag.aquery_data(
+                question.strip(),
+                param=param,
+            )
 
         if not isinstance(raw, dict):
             logger.warning("Unexpected aquery_data result type: %s", type(raw))
@@ -471,6 +839,7 @@ class RagEngineService:
         This removes the per-workspace working_dir on disk so that RAG data
         for a deleted workspace does not accumulate indefinitely.
         """
+        await get_instance_cache().discard(workspace_id)
         workspace_dir = os.path.join(self.settings.working_dir, workspace_id)
         try:
             if os.path.isdir(workspace_dir):
@@ -0,0 +1,157 @@
+"""Process-wide bounded cache of per-workspace LightRAG instances.
+
+Every `RagEngineService` of the process shares this cache, so a workspace's
+instance (storage objects, connection state) is built once and reused by
+all requests / jobs. The cache is bounded:
+
+- at most `RAG_INSTANCE_CACHE_MAX_SIZE` instances; beyond that the least
+  recently used ones are evicted,
+- instances unused for `RAG_INSTANCE_IDLE_TTL_SECONDS` are evicted,
+
+and an evicted instance gets `finalize_storages()` so its storages release
+their resources. Instances with in-flight operations (`use()` not exited
+yet) are never evicted; the cache may temporarily exceed its max size when
+all instances are busy.
+
+`use()` also runs `initialize_storages()` once per instance: the first
+caller starts it and concurrent first callers await the same task (a failed
+initialization is retried by the next caller).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable
+
+from server.app.core.config import get_settings
+from server.app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_cache: "LightRAGInstanceCache | None" = None
+
+
+@dataclass
+class _Entry:
+    instance: Any
+    last_used: float = field(default_factory=time.monotonic)
+    in_flight: int = 0
+    # Removed from the cache while busy; finalized by its last user.
+    discarded: bool = False
+    # Shared `initialize_storages()` task (None until first use / after a failure).
+    init_task: "asyncio.Task[Any] | None" = None
+
+
+class LightRAGInstanceCache:
+    """LRU + idle-TTL cache of LightRAG instances keyed by workspace_id."""
+
+    def __init__(self, max_size: int, idle_ttl_seconds: float) -> None:
+        self._max_size = max(1, int(max_size))
+        self._idle_ttl = float(idle_ttl_seconds)
+        # Insertion order == recency order (moved to the end on use).
+        self._entries: dict[str, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def idle_ttl_seconds(self) -> float:
+        return self._idle_ttl
+
+    @asynccontextmanager
+    async def use(self, workspace_id: str, factory: Callable[[str], Any]) -> AsyncIterator[Any]:
+        """Yield the workspace's initialized instance (built with `factory` if missing), pinned while in use."""
+        entry = self._entries.pop(workspace_id, None)
+        if entry is None:
+            entry = _Entry(instance=factory(workspace_id))
+        self._entries[workspace_id] = entry
+        entry.in_flight += 1
+        entry.last_used = time.monotonic()
+        try:
+            await self._ensure_initialized(workspace_id, entry)
+            yield entry.instance
+        finally:
+            entry.in_flight -= 1
+            entry.last_used = time.monotonic()
+            if entry.discarded and entry.in_flight == 0:
+                await self._finalize(workspace_id, entry)
+            await self.evict()
+
+    async def _ensure_initialized(self, workspace_id: str, entry: _Entry) -> None:
+        if entry.init_task is None:
+            entry.init_task = asyncio.create_task(entry.instance.initialize_storages())
+            logger.info("Initializing LightRAG storages for workspace %s", workspace_id)
+        task = entry.init_task
+        try:
+            # Shielded: a cancelled caller must not cancel the shared init.
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if entry.init_task is task:
+                entry.init_task = None
+            raise
+
+    async def evict(self) -> None:
+        """Evict idle-expired instances, then LRU instances beyond max size (never busy ones)."""
+        now = time.monotonic()
+        evicted: list[tuple[str, _Entry]] = []
+        for workspace_id, entry in list(self._entries.items()):
+            if entry.in_flight == 0 and self._idle_ttl > 0 and now - entry.last_used >= self._idle_ttl:
+                evicted.append((workspace_id, self._entries.pop(workspace_id)))
+        for workspace_id, entry in list(self._entries.items()):
+            if len(self._entries) <= self._max_size:
+                break
+            if entry.in_flight == 0:
+                evicted.append((workspace_id, self._entries.pop(workspace_id)))
+        for workspace_id, entry in evicted:
+            await self._finalize(workspace_id, entry)
+
+    async def discard(self, workspace_id: str) -> None:
+        """Drop a workspace's instance (e.g. workspace deleted), finalizing it when idle."""
+        entry = self._entries.pop(workspace_id, None)
+        if entry is None:
+            return
+        if entry.in_flight:
+            entry.discarded = True
+        else:
+            await self._finalize(workspace_id, entry)
+
+    async def close_all(self) -> None:
+        """Finalize every cached instance (process shutdown)."""
+        entries, self._entries = self._entries, {}
+        await asyncio.gather(*(self._finalize(ws, e) for ws, e in entries.items()))
+
+    async def _finalize(self, workspace_id: str, entry: _Entry) -> None:
+        try:
+            await entry.instance.finalize_storages()
+            logger.info("Evicted LightRAG instance for workspace %s", workspace_id)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to finalize LightRAG instance for workspace %s: %s", workspace_id, exc)
+
+
+async def run_idle_eviction_loop() -> None:
+    """Background task: evict idle instances even when no request touches the cache."""
+    cache = get_instance_cache()
+    interval = max(1.0, min(60.0, cache.idle_ttl_seconds / 2 if cache.idle_ttl_seconds > 0 else 60.0))
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await cache.evict()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("LightRAG instance eviction failed: %s", exc)
+
+
+def get_instance_cache() -> LightRAGInstanceCache:
+    """Return the process-wide LightRAG instance cache."""
+    global _cache
+    if _cache is None:
+        settings = get_settings().rag
+        _cache = LightRAGInstanceCache(
+            max_size=settings.instance_cache_max_size,
+            idle_ttl_seconds=settings.instance_idle_ttl_seconds,
+        )
+    return _cache
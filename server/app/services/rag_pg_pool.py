@@ -0,0 +1,82 @@
+"""Process-wide Postgres pool shared by every workspace's LightRAG storages.
+
+LightRAG's PG storages (KV, vector, doc status) get their connection from
+`lightrag.kg.postgres_impl.ClientManager`, a reference-counted singleton
+that owns one asyncpg pool per process; workspaces are isolated only by
+the `workspace` column. Two things make the connection count scale with
+tenants instead of load if left alone:
+
+- the pool size comes from `POSTGRES_MAX_CONNECTIONS`, which we now derive
+  from `RAG_PG_POOL_MAX_CONNECTIONS` instead of a hardcoded value, and
+- the pool is closed whenever the last instance is finalized (instance
+  cache eviction) and reopened on the next request.
+
+`ensure_shared_pg_client` takes one extra reference for the lifetime of
+the process so the pool stays open across instance evictions, and
+`get_pg_pool_stats` exposes its metrics (`/health/rag-pool`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from server.app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_shared_client: Any = None
+_lock: asyncio.Lock | None = None
+
+
+async def ensure_shared_pg_client() -> Any:
+    """Return the shared LightRAG Postgres client, pinning it on first use."""
+    global _shared_client, _lock
+    if _shared_client is not None:
+        return _shared_client
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _shared_client is None:
+            try:
+                from lightrag.kg.postgres_impl import ClientManager  # type: ignore[import]
+            except ImportError as exc:  # pragma: no cover - environment/config issue
+                raise RuntimeError(
+                    "LightRAG (lightrag-hku) must be installed to use the shared Postgres pool."
+                ) from exc
+            _shared_client = await ClientManager.get_client()
+            logger.info("Pinned shared LightRAG Postgres pool", extra=get_pg_pool_stats())
+    return _shared_client
+
+
+async def release_shared_pg_client() -> None:
+    """Drop the process reference (on shutdown, after instances are finalized)."""
+    global _shared_client
+    if _shared_client is None:
+        return
+    from lightrag.kg.postgres_impl import ClientManager  # type: ignore[import]
+
+    client, _shared_client = _shared_client, None
+    await ClientManager.release_client(client)
+
+
+def get_pg_pool_stats() -> dict[str, Any]:
+    """Size / idle / limits of the shared asyncpg pool (empty stats before first use)."""
+    pool = getattr(_shared_client, "pool", None)
+    if pool is None:
+        return {"initialized": False}
+    stats: dict[str, Any] = {
+        "initialized": True,
+        "size": pool.get_size(),
+        "idle": pool.get_idle_size(),
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+    }
+    stats["in_use"] = stats["size"] - stats["idle"]
+    try:
+        from lightrag.kg.postgres_impl import ClientManager  # type: ignore[import]
+
+        stats["ref_count"] = ClientManager._instances.get("ref_count")
+    except (ImportError, AttributeError):
+        pass
+    return stats
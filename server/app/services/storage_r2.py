@@ -4,9 +4,12 @@ Phase 1: only upload_file is expected to be used.
 Updated to run blocking I/O in threadpool for FastAPI async compatibility.
 """
 
+import gzip
+import io
 import json
+import tempfile
 from functools import lru_cache
-from typing import Any, Tuple
+from typing import IO, Any, Tuple
 
 import boto3
 from botocore.config import Config
@@ -15,6 +18,11 @@ from starlette.concurrency import run_in_threadpool
 
 from server.app.core.config import get_settings
 
+_STREAM_CHUNK_SIZE = 1024 * 1024
+_GZIP_MAGIC = b"\x1f\x8b"
+# zlib default level: layout-heavy OCR JSON compresses ~10x at moderate CPU cost.
+_GZIP_LEVEL = 6
+
 
 @lru_cache(maxsize=1)
 def _get_client_and_bucket() -> Tuple[Any | None, str | None]:
@@ -83,24 +91,115 @@ async def download_file(key: str) -> bytes:
     return await run_in_threadpool(_download_file_sync, key)
 
 
-def _upload_json_sync(obj: dict, key: str) -> None:
-    """Synchronous JSON upload helper."""
-    data = json.dumps(obj).encode("utf-8")
-    _upload_file_sync(data, key, content_type="application/json")
+def _new_spool() -> IO[bytes]:
+    """Temp file kept in memory up to R2_SPOOL_MAX_MEMORY_BYTES, then on disk."""
+    max_size = get_settings().r2.spool_max_memory_bytes
+    return tempfile.SpooledTemporaryFile(max_size=max_size, mode="w+b")
+
 
+def _download_file_stream_sync(key: str) -> IO[bytes]:
+    """Synchronous streaming download helper to be run in a thread."""
+    client, bucket = _get_client_and_bucket()
+    if client is None or bucket is None:
+        raise RuntimeError("Cloudflare R2 configuration missing. Cannot download file.")
 
-async def upload_json(obj: dict, key: str) -> None:
+    spool = _new_spool()
+    try:
+        obj = client.get_object(Bucket=bucket, Key=key)
+        for chunk in obj["Body"].iter_chunks(chunk_size=_STREAM_CHUNK_SIZE):
+            spool.write(chunk)
+        spool.seek(0)
+        return spool
+    except (BotoCoreError, ClientError) as exc:  # pragma: no cover - thin wrapper
+        spool.close()
+        raise RuntimeError(f"Failed to download file from R2: {exc}") from exc
+    except Exception:
+        spool.close()
+        raise
+
+
+async def download_file_stream(key: str) -> IO[bytes]:
+    """Download an R2 object in chunks into a spooled temp file.
+
+    The returned file handle is positioned at the start; small objects stay
+    in memory, large ones are spilled to disk so the whole object is never
+    held as one bytes value. Callers must close it (use it as a context
+    manager).
+    """
+    return await run_in_threadpool(_download_file_stream_sync, key)
+
+
+def _upload_fileobj_sync(file_obj: IO[bytes], key: str, content_type: str | None = None) -> None:
+    """Synchronous (multipart-capable) upload of a file object."""
+    client, bucket = _get_client_and_bucket()
+    if client is None or bucket is None:
+        raise RuntimeError("Cloudflare R2 configuration missing. Cannot upload file.")
+
+    extra_args = {"ContentType": content_type} if content_type else {}
+    try:
+        client.upload_fileobj(file_obj, bucket, key, ExtraArgs=extra_args or None)
+    except (BotoCoreError, ClientError) as exc:  # pragma: no cover - thin wrapper
+        raise RuntimeError(f"Failed to upload file to R2: {exc}") from exc
+
+
+def write_json(obj: Any, file_obj: IO[bytes], compress: bool = False) -> str:
+    """Serialize `obj` as JSON into a binary file object, incrementally.
+
+    The full JSON string / encoded bytes are never built in memory. With
+    `compress` the output is gzip-compressed with compact separators (use a
+    `.json.gz` key). Returns the content type to upload the file with.
+    """
+    if compress:
+        with gzip.GzipFile(fileobj=file_obj, mode="wb", compresslevel=_GZIP_LEVEL) as gz:
+            writer = io.TextIOWrapper(gz, encoding="utf-8")
+            json.dump(obj, writer, separators=(",", ":"))
+            writer.flush()
+            writer.detach()
+        return "application/gzip"
+    writer = io.TextIOWrapper(file_obj, encoding="utf-8")
+    json.dump(obj, writer)
+    writer.flush()
+    writer.detach()
+    return "application/json"
+
+
+async def upload_fileobj(file_obj: IO[bytes], key: str, content_type: str | None = None) -> None:
+    """Async wrapper for uploading a binary file object (multipart for large files)."""
+    await run_in_threadpool(_upload_fileobj_sync, file_obj, key, content_type)
+
+
+def _upload_json_sync(obj: dict, key: str, compress: bool = False) -> None:
+    """Synchronous JSON upload helper.
+
+    Serializes into a spooled temp file (see `write_json`) and uploads it.
+    """
+    with _new_spool() as spool:
+        content_type = write_json(obj, spool, compress)
+        spool.seek(0)
+        _upload_fileobj_sync(spool, key, content_type=content_type)
+
+
+async def upload_json(obj: dict, key: str, compress: bool = False) -> None:
     """Async wrapper for uploading JSON object to R2."""
-    await run_in_threadpool(_upload_json_sync, obj, key)
+    await run_in_threadpool(_upload_json_sync, obj, key, compress)
 
 
 def _download_json_sync(key: str) -> dict:
-    """Synchronous JSON download helper."""
-    raw = _download_file_sync(key)
-    try:
-        return json.loads(raw.decode("utf-8"))
-    except json.JSONDecodeError as exc:  # pragma: no cover - defensive
-        raise RuntimeError(f"Failed to decode JSON from R2 object {key}: {exc}") from exc
+    """Synchronous JSON download helper.
+
+    Transparently reads both plain JSON and gzip-compressed JSON objects
+    (detected from the gzip magic bytes, not from the key).
+    """
+    with _download_file_stream_sync(key) as spool:
+        is_gzip = spool.read(2) == _GZIP_MAGIC
+        spool.seek(0)
+        try:
+            if is_gzip:
+                with gzip.GzipFile(fileobj=spool, mode="rb") as gz:
+                    return json.load(gz)
+            return json.load(spool)
+        except (json.JSONDecodeError, OSError, UnicodeDecodeError) as exc:  # pragma: no cover - defensive
+            raise RuntimeError(f"Failed to decode JSON from R2 object {key}: {exc}") from exc
 
 
 async def download_json(key: str) -> dict:
@@ -0,0 +1,22 @@
+"""Text normalization helpers."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Trailing punctuation that does not change what is being asked.
+_TRAILING_PUNCTUATION = "?？!！.。…;:,、 "
+
+
+def normalize_question(question: str) -> str:
+    """Canonical form of a chat question, used as a cache / coalescing key.
+
+    NFC-normalizes (Vietnamese input may arrive composed or decomposed),
+    case-folds, collapses whitespace and drops trailing punctuation.
+    Diacritics are kept: they change the meaning of Vietnamese words.
+    """
+    text = unicodedata.normalize("NFC", question or "")
+    text = _WHITESPACE_RE.sub(" ", text.casefold()).strip()
+    return text.rstrip(_TRAILING_PUNCTUATION)
@@ -0,0 +1,37 @@
+"""Token counting for chunking and embedding budgets.
+
+Uses tiktoken (installed with LightRAG) when available; otherwise falls
+back to a ~4 chars/token estimate so callers still get stable, roughly
+proportional sizes.
+"""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Any
+
+_FALLBACK_CHARS_PER_TOKEN = 4
+_FALLBACK_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> Any | None:
+    try:
+        import tiktoken  # type: ignore[import]
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(_FALLBACK_ENCODING)
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Return the number of tokens of `text` for `model`'s tokenizer."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / _FALLBACK_CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
@@ -1,7 +1,8 @@
 """Ingest worker for Phase 3 (RAG ingestion).
 
 Runs a loop that finds parsed documents without a rag_documents mapping
-and ingests them into the RAG engine.
+and ingests them into the RAG engine. The loop is woken up by the parse
+pipeline's Redis "documents_parsed" signal; polling remains as a safety net.
 """
 
 from __future__ import annotations
@@ -11,11 +12,37 @@ from dotenv import load_dotenv
 
 from server.app.core.config import get_settings
 from server.app.core.logging import get_logger, setup_logging
+from server.app.core.redis_client import get_redis
 from server.app.db.session import async_session
 from server.app.services import storage_r2
 from server.app.services.chunker import ChunkerService
 from server.app.services.jobs_ingest import IngestJobService
 from server.app.services.rag_engine import RagEngineService
+from server.app.services.rag_instance_cache import get_instance_cache, run_idle_eviction_loop
+from server.app.services.rag_pg_pool import release_shared_pg_client
+
+
+async def listen_documents_parsed_notifications(wakeup_event: asyncio.Event) -> None:
+    """Listen for Redis documents_parsed channel and wake the worker loop."""
+    logger = get_logger(__name__)
+    while True:
+        try:
+            redis = get_redis()
+            pubsub = redis.pubsub()
+            await pubsub.subscribe("documents_parsed")
+            logger.info("Listening for documents_parsed notifications via Redis")
+
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                # Payload chỉ để wake-up; DB vẫn là source-of-truth.
+                wakeup_event.set()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "documents_parsed Redis listener encountered error; will retry",
+                extra={"error": str(exc)},
+            )
+            await asyncio.sleep(5)
 
 
 async def run_worker_loop() -> None:
@@ -29,20 +56,50 @@ async def run_worker_loop() -> None:
 
     rag_engine = RagEngineService(settings=settings.rag)
     chunker = ChunkerService(session_factory=async_session, storage_r2=storage_r2)
+    worker_settings = settings.ingest_worker
+    concurrency = max(1, int(worker_settings.concurrency or 1))
     ingest_service = IngestJobService(
         session_factory=async_session,
         chunker=chunker,
         rag_engine=rag_engine,
+        max_concurrency=concurrency,
+        per_workspace_concurrency=worker_settings.per_workspace_concurrency,
     )
 
-    idle_sleep_seconds = 5
-    busy_sleep_seconds = 1
+    idle_sleep_seconds = worker_settings.idle_sleep_seconds
+    busy_sleep_seconds = worker_settings.busy_sleep_seconds
+
+    # Start background listener for documents_parsed wake-ups.
+    wakeup_event: asyncio.Event = asyncio.Event()
+    asyncio.create_task(listen_documents_parsed_notifications(wakeup_event))
+    asyncio.create_task(run_idle_eviction_loop())
+    asyncio.create_task(
+        rag_engine.warm_up_recent_workspaces(async_session, limit=settings.rag.warmup_workspaces)
+    )
 
     while True:
+        if concurrency > 1:
+            try:
+                dispatched = await ingest_service.dispatch_pending_documents()
+                if dispatched == 0 or ingest_service.free_slots == 0:
+                    # Pool is full or nothing is pending: wait for an ingest to
+                    # finish, a documents_parsed wake-up, or the poll timeout.
+                    await ingest_service.wait_for_progress(wakeup_event, timeout=idle_sleep_seconds)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Unexpected error in ingest worker loop", extra={"error": str(exc)})
+                await asyncio.sleep(busy_sleep_seconds)
+            continue
+
         try:
             processed = await ingest_service.ingest_pending_documents(batch_size=1)
             if processed == 0:
-                await asyncio.sleep(idle_sleep_seconds)
+                # Wait either for a documents_parsed wake-up or for the
+                # safety-net poll timeout.
+                try:
+                    await asyncio.wait_for(wakeup_event.wait(), timeout=idle_sleep_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup_event.clear()
             else:
                 await asyncio.sleep(busy_sleep_seconds)
         except Exception as exc:  # noqa: BLE001
@@ -50,8 +107,16 @@ async def run_worker_loop() -> None:
             await asyncio.sleep(idle_sleep_seconds)
 
 
+async def _run_worker() -> None:
+    try:
+        await run_worker_loop()
+    finally:
+        await get_instance_cache().close_all()
+        await release_shared_pg_client()
+
+
 def main() -> None:
-    asyncio.run(run_worker_loop())
+    asyncio.run(_run_worker())
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 """Parse worker for Phase 2 (Document AI OCR).
 
-Runs a simple loop that polls parse_jobs in Supabase and processes them
-via ParserPipelineService.
+Runs a simple loop that claims parse_jobs in Supabase and processes them
+via ParserPipelineService. Jobs are claimed with a lease, so several worker
+replicas can run side by side; a background reaper requeues jobs whose
+lease expired.
 """
 
 from __future__ import annotations
@@ -14,7 +16,6 @@ from server.app.core.config import get_settings
 from server.app.core.constants import (
     DOCUMENT_STATUS_ERROR,
     PARSE_JOB_STATUS_FAILED,
-    PARSE_JOB_STATUS_QUEUED,
 )
 from server.app.core.event_bus import event_bus
 from server.app.core.logging import get_logger, setup_logging
@@ -22,6 +23,7 @@ from server.app.core.redis_client import get_redis
 from server.app.db import models, repositories as repo
 from server.app.db.session import async_session
 from server.app.services.docai_client import DocumentAIClient
+from server.app.services.ocr_postprocess import shutdown_postprocess_executor
 from server.app.services.parser_pipeline import ParserPipelineService
 
 
@@ -48,131 +50,166 @@ async def listen_parse_jobs_notifications(wakeup_event: asyncio.Event) -> None:
             await asyncio.sleep(5)
 
 
-async def run_worker_loop() -> None:
-    """Main worker loop for processing parse_jobs."""
-    setup_logging()
-    logger = get_logger(__name__)
-    settings = get_settings()
-    logger.info("Starting parse worker", extra={"db_url": settings.database.db_url})
+async def reap_expired_parse_jobs_once(legacy_stale_seconds: int) -> int:
+    """Requeue or fail running parse_jobs with an expired lease.
 
-    docai_client = DocumentAIClient()
-    pipeline = ParserPipelineService(session_factory=async_session, docai_client=docai_client)
-
-    idle_sleep_seconds = 5
-    busy_sleep_seconds = 1
+    Safe to run concurrently from every worker replica: the repository
+    update skips rows locked by another reaper. Returns the number of jobs
+    reaped.
+    """
+    logger = get_logger(__name__)
+    worker_settings = get_settings().parse_worker
+
+    async with async_session() as session:  # type: ignore[call-arg]
+        jobs = await repo.reap_expired_parse_jobs(
+            session=session,
+            max_retries=worker_settings.max_retries,
+            legacy_stale_seconds=legacy_stale_seconds,
+            retry_base_seconds=worker_settings.retry_base_seconds,
+            retry_max_seconds=worker_settings.retry_max_seconds,
+        )
+    if jobs:
+        logger.info("Reaped parse_jobs with expired lease", extra={"count": len(jobs)})
+
+    for job in jobs:
+        job_id = str(job["id"])
+        document_id = str(job["document_id"])
+        new_status = str(job["status"])
+        new_retry = int(job.get("retry_count", 0) or 0)
+        final_failure = new_status == PARSE_JOB_STATUS_FAILED
 
-    # On startup, attempt to heal stale running parse_jobs so they can be retried
-    # hoặc đánh dấu failed + gửi realtime đầy đủ để client không phải reload.
-    try:
         async with async_session() as session:  # type: ignore[call-arg]
-            stale_threshold_seconds = 600  # 10 minutes
-            jobs = await repo.fetch_stale_running_parse_jobs(
-                session=session,
-                older_than_seconds=stale_threshold_seconds,
-            )
-            if jobs:
-                logger.info(
-                    "Found stale running parse_jobs; resetting for retry",
-                    extra={"count": len(jobs)},
-                )
-            for job in jobs:
-                job_id = str(job["id"])
-                document_id = str(job["document_id"])
-                retry_count = int(job.get("retry_count", 0) or 0)
-                max_retries = 3
-
-                # 1) Cập nhật trạng thái job/document trong DB.
-                if retry_count < max_retries:
-                    await repo.requeue_parse_job(
-                        session=session,
-                        job_id=job_id,
-                        retry_count=retry_count + 1,
-                        error_message="stale-running",
-                    )
-                    new_status = PARSE_JOB_STATUS_QUEUED
-                    new_retry = retry_count + 1
-                    final_failure = False
-                else:
-                    await repo.mark_parse_job_failed(
-                        session=session,
-                        job_id=job_id,
-                        error_message="stale-running",
-                    )
-                    # Đảm bảo document không bị kẹt ở pending mãi.
-                    try:
-                        await repo.update_document_parse_error(
-                            session=session,
-                            document_id=document_id,
-                        )
-                    except Exception as exc:  # noqa: BLE001
-                        logger.warning(
-                            "Failed to mark document parse error for stale parse_job",
-                            extra={"job_id": job_id, "document_id": document_id, "error": str(exc)},
-                        )
-                    new_status = PARSE_JOB_STATUS_FAILED
-                    new_retry = retry_count
-                    final_failure = True
-
-                # 2) Best-effort realtime: job.status_updated (+ document.status_updated nếu final_failure).
-                workspace_id: str | None = None
-                user_id: str | None = None
+            # Đảm bảo document không bị kẹt ở pending mãi.
+            if final_failure:
                 try:
-                    doc_stmt = (
-                        sa.select(models.documents.c.workspace_id)
-                        .where(models.documents.c.id == document_id)
-                        .limit(1)
+                    await repo.update_document_parse_error(
+                        session=session,
+                        document_id=document_id,
                     )
-                    doc_result = await session.execute(doc_stmt)
-                    doc_row = doc_result.fetchone()
-                    if doc_row:
-                        workspace_id = str(doc_row[0])
-                        user_id = await repo.get_workspace_owner_id(
-                            session, workspace_id=workspace_id
-                        )
                 except Exception as exc:  # noqa: BLE001
                     logger.warning(
-                        "Failed to resolve workspace/user for stale parse_job",
+                        "Failed to mark document parse error for stale parse_job",
                         extra={"job_id": job_id, "document_id": document_id, "error": str(exc)},
                     )
 
-                if workspace_id and user_id:
-                    try:
-                        await event_bus.publish(
-                            user_id,
-                            "job.status_updated",
-                            {
-                                "job_id": job_id,
-                                "job_type": "parse",
-                                "workspace_id": workspace_id,
-                                "document_id": document_id,
-                                "status": new_status,
-                                "retry_count": new_retry,
-                                "error_message": "stale-running",
-                            },
-                        )
-                        if final_failure:
-                            await event_bus.publish(
-                                user_id,
-                                "document.status_updated",
-                                {
-                                    "workspace_id": workspace_id,
-                                    "document_id": document_id,
-                                    "status": DOCUMENT_STATUS_ERROR,
-                                },
-                            )
-                    except Exception as exc:  # noqa: BLE001
-                        logger.warning(
-                            "Failed to publish realtime events for stale parse_job",
-                            extra={"job_id": job_id, "error": str(exc)},
-                        )
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Failed to heal stale parse_jobs on startup", extra={"error": str(exc)})
+            # Best-effort realtime: job.status_updated (+ document.status_updated nếu final_failure).
+            workspace_id: str | None = None
+            user_id: str | None = None
+            try:
+                doc_stmt = (
+                    sa.select(models.documents.c.workspace_id)
+                    .where(models.documents.c.id == document_id)
+                    .limit(1)
+                )
+                doc_result = await session.execute(doc_stmt)
+                doc_row = doc_result.fetchone()
+                if doc_row:
+                    workspace_id = str(doc_row[0])
+                    user_id = await repo.get_workspace_owner_id(session, workspace_id=workspace_id)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(
+                    "Failed to resolve workspace/user for stale parse_job",
+                    extra={"job_id": job_id, "document_id": document_id, "error": str(exc)},
+                )
+
+        if workspace_id and user_id:
+            try:
+                await event_bus.publish(
+                    user_id,
+                    "job.status_updated",
+                    {
+                        "job_id": job_id,
+                        "job_type": "parse",
+                        "workspace_id": workspace_id,
+                        "document_id": document_id,
+                        "status": new_status,
+                        "retry_count": new_retry,
+                        "error_message": job.get("error_message"),
+                    },
+                )
+                if final_failure:
+                    await event_bus.publish(
+                        user_id,
+                        "document.status_updated",
+                        {
+                            "workspace_id": workspace_id,
+                            "document_id": document_id,
+                            "status": DOCUMENT_STATUS_ERROR,
+                        },
+                    )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(
+                    "Failed to publish realtime events for stale parse_job",
+                    extra={"job_id": job_id, "error": str(exc)},
+                )
+
+    return len(jobs)
+
+
+async def run_parse_job_reaper(interval_seconds: float, legacy_stale_seconds: int) -> None:
+    """Background task: periodically reap parse_jobs with an expired lease."""
+    logger = get_logger(__name__)
+    while True:
+        try:
+            await reap_expired_parse_jobs_once(legacy_stale_seconds=legacy_stale_seconds)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to reap expired parse_jobs", extra={"error": str(exc)})
+        await asyncio.sleep(interval_seconds)
+
+
+async def run_worker_loop() -> None:
+    """Main worker loop for processing parse_jobs."""
+    setup_logging()
+    logger = get_logger(__name__)
+    settings = get_settings()
+    worker_settings = settings.parse_worker
+    concurrency = max(1, int(worker_settings.concurrency or 1))
+    logger.info(
+        "Starting parse worker",
+        extra={"db_url": settings.database.db_url, "concurrency": concurrency},
+    )
+
+    docai_client = DocumentAIClient()
+    pipeline = ParserPipelineService(
+        session_factory=async_session,
+        docai_client=docai_client,
+        max_concurrency=concurrency,
+        lease_seconds=worker_settings.lease_seconds,
+        max_retries=worker_settings.max_retries,
+        retry_base_seconds=worker_settings.retry_base_seconds,
+        retry_max_seconds=worker_settings.retry_max_seconds,
+    )
+    logger.info("Parse worker lease owner", extra={"lease_owner": pipeline.lease_owner})
+
+    idle_sleep_seconds = worker_settings.idle_sleep_seconds
+    busy_sleep_seconds = worker_settings.busy_sleep_seconds
+
+    # Continuously reap jobs whose lease expired (crashed / partitioned workers)
+    # so they can be retried, or marked failed with full realtime events.
+    asyncio.create_task(
+        run_parse_job_reaper(
+            interval_seconds=worker_settings.reaper_interval_seconds,
+            legacy_stale_seconds=worker_settings.legacy_stale_seconds,
+        )
+    )
 
     # Start background listener for NOTIFY wakeups.
     wakeup_event: asyncio.Event = asyncio.Event()
     asyncio.create_task(listen_parse_jobs_notifications(wakeup_event))
 
     while True:
+        if concurrency > 1:
+            try:
+                dispatched = await pipeline.dispatch_next_jobs()
+                if dispatched == 0 or pipeline.free_slots == 0:
+                    # Pool is full or the queue is empty: wait for a job to
+                    # finish, a Redis wake-up, or the idle timeout.
+                    await pipeline.wait_for_progress(wakeup_event, timeout=idle_sleep_seconds)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Unexpected error in parse worker loop", extra={"error": str(exc)})
+                await asyncio.sleep(idle_sleep_seconds)
+            continue
+
         try:
             processed = await pipeline.fetch_and_process_next_jobs(batch_size=1)
             if processed == 0:
@@ -190,7 +227,10 @@ async def run_worker_loop() -> None:
 
 
 def main() -> None:
-    asyncio.run(run_worker_loop())
+    try:
+        asyncio.run(run_worker_loop())
+    finally:
+        shutdown_postprocess_executor()
 
 
 if __name__ == "__main__":